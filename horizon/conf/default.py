@@ -28,6 +28,9 @@ HORIZON_CONFIG = {
     'ajax_queue_limit': 10,
     'ajax_poll_interval': 2500,
 
+    # Maximum number of threads preloading the data of tabs concurrently.
+    'tab_load_workers': 1,
+
     # URL for additional help with this site.
     'help_url': None,
 
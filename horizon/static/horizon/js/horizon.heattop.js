@@ -177,25 +177,42 @@ function build_reverse_links(node){
 
 function ajax_poll(poll_time){
   setTimeout(function() {
-    $.getJSON(ajax_url, function(json) {
-      //update d3 data element
-      $("#d3_data").attr("data-d3_data", JSON.stringify(json));
-
-      //update stack
-      $("#stack_box").html(json.stack.info_box);
-      set_in_progress(json.stack, json.nodes);
+    //Only ask for the changes since the last poll, an unchanged topology
+    //is answered with 304 Not Modified
+    var headers = {};
+    var params = {};
+    if (etag) {
+      headers['If-None-Match'] = etag;
+      params.since = etag.replace(/"/g, '');
+    }
+    $.ajax({url: ajax_url, dataType: 'json', cache: false, data: params,
+            headers: headers}).done(function(json, status, xhr) {
+      if (xhr.status === 304) { return; }
+      etag = xhr.getResponseHeader('ETag');
+      var changed_nodes = json.nodes;
       needs_update = false;
 
-      //Check Remove nodes
-      remove_nodes(nodes, json.nodes);
+      if (json.since) {
+        changed_nodes = json.changed.nodes;
+        json.removed.nodes.forEach(function(name){
+          if (findNode(name)) { removeNode(name); }
+        });
+      } else {
+        //update d3 data element
+        $("#d3_data").attr("data-d3_data", JSON.stringify(json));
+
+        //Check Remove nodes
+        remove_nodes(nodes, json.nodes);
+      }
 
       //Check for updates and new nodes
-      json.nodes.forEach(function(d){
+      changed_nodes.forEach(function(d){
         current_node = findNode(d.name);
         //Check if node already exists
         if (current_node) {
           //Node already exists, just update it
           current_node.status = d.status;
+          current_node.in_progress = d.in_progress;
 
           //Status has changed, image should be updated
           if (current_node.image !== d.image){
@@ -231,6 +248,11 @@ function ajax_poll(poll_time){
         }
       });
 
+      //update stack
+      $("#stack_box").html(json.stack.info_box);
+      in_progress = false;
+      set_in_progress(json.stack, nodes);
+
       //if any updates needed, do update now
       if (needs_update === true){
         update();
@@ -248,6 +270,7 @@ if ($(container).length){
     height = 500,
     stack_id = $("#stack_id").data("stack_id"),
     ajax_url = '/project/stacks/get_d3_data/' + stack_id + '/',
+    etag = null,
     graph = $("#d3_data").data("d3_data"),
     force = d3.layout.force()
       .nodes(graph.nodes)
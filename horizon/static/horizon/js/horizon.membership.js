@@ -6,6 +6,7 @@ horizon.membership = {
   roles: [],
   has_roles: [],
   default_role_id: [],
+  search_url: [],
 
   /* Parses the form field selector's ID to get either the
    * role or user id (i.e. returns "id12345" when
@@ -39,6 +40,7 @@ horizon.membership = {
   init_properties: function(step_slug) {
     horizon.membership.has_roles[step_slug] = $("." + step_slug + "_membership").data('show-roles') !== "False";
     horizon.membership.default_role_id[step_slug] = $('#id_default_' + step_slug + '_role').attr('value');
+    horizon.membership.search_url[step_slug] = $("." + step_slug + "_membership").data('search-url');
     horizon.membership.init_data_list(step_slug);
     horizon.membership.init_role_list(step_slug);
     horizon.membership.init_current_membership(step_slug);
@@ -54,6 +56,19 @@ horizon.membership = {
     });
   },
 
+  /*
+   * Adds an entry to the data list, and an option for it to the hidden
+   * role lists so that it can be selected in them.
+   **/
+  add_data: function(step_slug, data_id, display_name) {
+    var data = horizon.membership.data[step_slug];
+    if (!data.hasOwnProperty(data_id)) {
+      data[data_id] = display_name;
+      this.get_role_element(step_slug, "").append(
+        $("<option>").attr("value", data_id).text(display_name));
+    }
+  },
+
   /*
    * Initializes an associative array mapping role ids to role names.
    **/
@@ -278,8 +293,80 @@ horizon.membership = {
       horizon.membership.list_filtering(step_slug);
       horizon.membership.detect_no_results(step_slug);
 
-      // remove input filters
-      $("input." + step_slug + "_filter").val("");
+      // remove input filters, but keep the search of the available list
+      horizon.membership.get_filter_inputs(step_slug).val("");
+    });
+  },
+
+  /*
+   * Returns the filter inputs of the lists which are filtered in the
+   * browser, i.e. not the available list when it's searched on the server.
+   **/
+  get_filter_inputs: function(step_slug) {
+    var inputs = $("input." + step_slug + "_filter");
+    if (horizon.membership.search_url[step_slug]) {
+      inputs = inputs.not("#available_" + step_slug);
+    }
+    return inputs;
+  },
+
+  /*
+   * Fills the available list with the results of a search on the server,
+   * from the given offset on. The results which are already members are
+   * left out, and a link to get more of them is added if there are.
+   **/
+  search: function(step_slug, query, offset) {
+    var $available = $(".available_" + step_slug);
+    if (offset === 0) {
+      $available.empty();
+    }
+    $available.children(".more_results").remove();
+    if (!query) {
+      horizon.membership.detect_no_results(step_slug);
+      return;
+    }
+    $.getJSON(horizon.membership.search_url[step_slug],
+              {query: query, offset: offset}, function (data) {
+      // Drop the results of outdated searches.
+      if ($("input[id='available_" + step_slug + "']").val() !== query) {
+        return;
+      }
+      $.each(data.items, function (index, item) {
+        if (horizon.membership.get_member_roles(step_slug, item.id).length > 0) {
+          return;
+        }
+        horizon.membership.add_data(step_slug, item.id, item.name);
+        if (!$available.find("li[data-" + step_slug + "-id='id_" + step_slug +
+                             "_" + item.id + "']").length) {
+          $available.append(horizon.membership.generate_member_element(
+            step_slug, item.name, item.id, [], "+"));
+        }
+      });
+      $available.find(".role_options").hide();
+      if (data.more) {
+        $("<ul class='nav nav-pills more_results'><li><a href='#'></a></li></ul>")
+          .find("a").text(gettext("More")).click(function (evt) {
+            evt.preventDefault();
+            horizon.membership.search(step_slug, query,
+                                      offset + data.items.length);
+          }).end().appendTo($available);
+      }
+      horizon.membership.detect_no_results(step_slug);
+      horizon.membership.fix_stripes(step_slug);
+    });
+  },
+
+  /*
+   * Searches the available members on the server as the user types.
+   **/
+  init_search: function(step_slug) {
+    var timer;
+    var $input = $("input[id='available_" + step_slug + "']");
+    $input.on('keyup', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        horizon.membership.search(step_slug, $input.val(), 0);
+      }, 300);
     });
   },
 
@@ -296,7 +383,10 @@ horizon.membership = {
 
       if (!$('.' + filter).children('ul').length) {
         $('#no_' + filter).show();
-        $("input[id='" + filter + "']").attr('disabled', 'disabled');
+        if (filter !== "available_" + step_slug ||
+            !horizon.membership.search_url[step_slug]) {
+          $("input[id='" + filter + "']").attr('disabled', 'disabled');
+        }
       }
       else {
         $('#no_' + filter).hide();
@@ -341,8 +431,7 @@ horizon.membership = {
       $("." + step_slug + "_members").append(horizon.membership.generate_member_element(step_slug, display_name, data_id, [default_role_id], "-"));
 
       // add the member to the hidden role lists and the data list
-      horizon.membership.data[step_slug][data_id] = display_name;
-      $("select[multiple='multiple']").append("<option value='" + data_id + "'>" + horizon.membership.data[step_slug][data_id] + "</option>");
+      horizon.membership.add_data(step_slug, data_id, display_name);
       horizon.membership.add_member_to_role(step_slug, data_id, default_role_id);
 
       // remove option from hidden select
@@ -397,7 +486,7 @@ horizon.membership = {
    **/
   list_filtering: function (step_slug) {
     // remove previous lists' quicksearch events
-    $('input.' + step_slug + '_filter').unbind();
+    horizon.membership.get_filter_inputs(step_slug).unbind();
 
     // set up quicksearch to filter on input
     $('.' + step_slug + '_filterable').each(function () {
@@ -405,6 +494,10 @@ horizon.membership = {
       // Example value: members step_slug_members
       // Pick the class name that contains the step_slug
       var filter = $.grep(css_class.split(' '), function(val){ return val.indexOf(step_slug) !== -1; })[0];
+      if (filter === "available_" + step_slug &&
+          horizon.membership.search_url[step_slug]) {
+        return; // searched on the server
+      }
 
       var input = $("input[id='" + filter +"']");
       input.quicksearch('ul.' + filter + ' ul li span.display_name', {
@@ -456,7 +549,9 @@ horizon.membership = {
       horizon.membership.update_membership(step_slug);
       horizon.membership.select_member_role(step_slug);
       horizon.membership.add_new_member(step_slug);
-
+      if (horizon.membership.search_url[step_slug]) {
+        horizon.membership.init_search(step_slug);
+      }
 
       // initially hide role dropdowns for available member list
       $form.find(".available_" +  step_slug + " .role_options").hide();
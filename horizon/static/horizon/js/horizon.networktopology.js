@@ -2,6 +2,7 @@
 
 horizon.network_topology = {
   model: null,
+  etag: null,
   svg:'#topology_canvas',
   svg_container:'#topologyCanvasContainer',
   post_messages:'#topologyMessages',
@@ -120,15 +121,57 @@ horizon.network_topology = {
     if($('#networktopology').length === 0) {
       return;
     }
-    $.getJSON($('#networktopology').data('networktopology') + '?' + $.now(),
-      function(data) {
-        self.model = data;
-        self.data_convert();
+    // Once the topology is loaded, only its changes are asked for and an
+    // unchanged topology is answered with 304 Not Modified.
+    var headers = {};
+    var params = {};
+    if (self.model && self.etag) {
+      headers['If-None-Match'] = self.etag;
+      params.since = self.etag.replace(/"/g, '');
+    }
+    $.ajax({
+      url: $('#networktopology').data('networktopology'),
+      dataType: 'json',
+      cache: false,
+      data: params,
+      headers: headers,
+      success: function(data, status, xhr) {
+        if (xhr.status !== 304) {
+          self.etag = xhr.getResponseHeader('ETag');
+          self.model = (data.since) ? self.merge_changes(data) : data;
+          self.data_convert();
+        }
         setTimeout(function(){
           self.load_network_info();
         }, self.reload_duration);
       }
-    );
+    });
+  },
+  merge_changes:function(data) {
+    var self = this;
+    $.each(['servers', 'networks', 'ports', 'routers'], function(i, name) {
+      var removed = data.removed[name];
+      var changed = {};
+      $.each(data.changed[name], function(j, node) {
+        changed[node.id] = node;
+      });
+      var nodes = $.grep(self.model[name], function(node) {
+        return $.inArray(node.id, removed) === -1;
+      });
+      $.each(nodes, function(j, node) {
+        if (changed[node.id]) {
+          nodes[j] = changed[node.id];
+          delete changed[node.id];
+        }
+      });
+      $.each(data.changed[name], function(j, node) {
+        if (changed[node.id]) {
+          nodes.push(node);
+        }
+      });
+      self.model[name] = nodes;
+    });
+    return self.model;
   },
   select_draw_mode:function() {
     var self = this;
@@ -5,7 +5,8 @@ horizon.datatables = {
     if ($rows_to_update.length) {
       var interval = $rows_to_update.attr('data-update-interval'),
         $table = $rows_to_update.closest('table'),
-        decay_constant = $table.attr('decay_constant');
+        decay_constant = $table.attr('decay_constant'),
+        batches = {};
 
       // Do not update this row if the action column is expanded
       if ($rows_to_update.find('.actions_column .btn-group.open').length) {
@@ -15,98 +16,156 @@ horizon.datatables = {
         $table.removeAttr('decay_constant');
         return;
       }
-      // Trigger the update handlers.
+
+      var complete = function (jqXHR, textStatus) {
+        // Revalidate the button check for the updated table
+        horizon.datatables.validate_button();
+
+        // Set interval decay to this table, and increase if it already exist
+        if(decay_constant === undefined) {
+          decay_constant = 1;
+        } else {
+          decay_constant++;
+        }
+        $table.attr('decay_constant', decay_constant);
+        // Poll until there are no rows in an "unknown" state on the page.
+        next_poll = interval * decay_constant;
+        // Limit the interval to 30 secs
+        if(next_poll > 30 * 1000) { next_poll = 30 * 1000; }
+        setTimeout(horizon.datatables.update, next_poll);
+      };
+
+      // Rows of the same table are updated with a single request, rows
+      // rendered without a batch update URL are updated one at a time.
       $rows_to_update.each(function(index, row) {
         var $row = $(this),
-          $table = $row.closest('table.datatable');
-        horizon.ajax.queue({
-          url: $row.attr('data-update-url'),
-          error: function (jqXHR, textStatus, errorThrown) {
-            switch (jqXHR.status) {
-              // A 404 indicates the object is gone, and should be removed from the table
-              case 404:
-                // Update the footer count and reset to default empty row if needed
-                var $footer, row_count, footer_text, colspan, template, params, $empty_row;
-
-                // existing count minus one for the row we're removing
-                row_count = horizon.datatables.update_footer_count($table, -1);
-
-                if(row_count === 0) {
-                  colspan = $table.find('th[colspan]').attr('colspan');
-                  template = horizon.templates.compiled_templates["#empty_row_template"];
-                  params = {
-                      "colspan": colspan,
-                      no_items_label: gettext("No items to display.")
-                  };
-                  empty_row = template.render(params);
-                  $row.replaceWith(empty_row);
-                } else {
-                  $row.remove();
-                }
-                // Reset tablesorter's data cache.
-                $table.trigger("update");
-                // Enable launch action if quota is not exceeded
-                horizon.datatables.update_actions();
-                break;
-              default:
-                horizon.utils.log(gettext("An error occurred while updating."));
-                $row.removeClass("ajax-update");
-                $row.find("i.ajax-updating").remove();
-                break;
-            }
-          },
-          success: function (data, textStatus, jqXHR) {
-            var $new_row = $(data);
-
-            if ($new_row.hasClass('status_unknown')) {
-              var spinner_elm = $new_row.find("td.status_unknown:last");
-              var imagePath = $new_row.find('.btn-action-required').length > 0 ?
-                "dashboard/img/action_required.png":
-                "dashboard/img/loading.gif";
-              imagePath = STATIC_URL + imagePath;
-              spinner_elm.prepend(
-                $("<div>")
-                  .addClass("loading_gif")
-                  .append($("<img>").attr("src", imagePath)));
-            }
-
-            // Only replace row if the html content has changed
-            if($new_row.html() !== $row.html()) {
-              if($row.find('.table-row-multi-select:checkbox').is(':checked')) {
-                // Preserve the checkbox if it's already clicked
-                $new_row.find('.table-row-multi-select:checkbox').prop('checked', true);
-              }
-              $row.replaceWith($new_row);
-              // Reset tablesorter's data cache.
-              $table.trigger("update");
-              // Reset decay constant.
-              $table.removeAttr('decay_constant');
-              // Check that quicksearch is enabled for this table
-              // Reset quicksearch's data cache.
-              if ($table.attr('id') in horizon.datatables.qs) {
-                horizon.datatables.qs[$table.attr('id')].cache();
-              }
-            }
-          },
-          complete: function (jqXHR, textStatus) {
-            // Revalidate the button check for the updated table
-            horizon.datatables.validate_button();
-
-            // Set interval decay to this table, and increase if it already exist
-            if(decay_constant === undefined) {
-              decay_constant = 1;
-            } else {
-              decay_constant++;
-            }
-            $table.attr('decay_constant', decay_constant);
-            // Poll until there are no rows in an "unknown" state on the page.
-            next_poll = interval * decay_constant;
-            // Limit the interval to 30 secs
-            if(next_poll > 30 * 1000) { next_poll = 30 * 1000; }
-            setTimeout(horizon.datatables.update, next_poll);
+          url = $row.attr('data-batch-update-url');
+        if (url) {
+          batches[url] = batches[url] || [];
+          batches[url].push($row);
+        } else {
+          horizon.datatables.update_row($row, complete);
+        }
+      });
+      $.each(batches, function (url, $rows) {
+        horizon.datatables.update_rows(url, $rows, complete);
+      });
+    }
+  },
+
+  update_row: function ($row, complete) {
+    var $table = $row.closest('table.datatable');
+    horizon.ajax.queue({
+      url: $row.attr('data-update-url'),
+      error: function (jqXHR, textStatus, errorThrown) {
+        switch (jqXHR.status) {
+          // A 404 indicates the object is gone, and should be removed from the table
+          case 404:
+            horizon.datatables.remove_row($table, $row);
+            break;
+          default:
+            horizon.datatables.stop_row_update($row);
+            break;
+        }
+      },
+      success: function (data, textStatus, jqXHR) {
+        horizon.datatables.replace_row($table, $row, data);
+      },
+      complete: complete
+    });
+  },
+
+  update_rows: function (url, $rows, complete) {
+    var $table = $rows[0].closest('table.datatable');
+    horizon.ajax.queue({
+      url: url,
+      data: {obj_id: $.map($rows, function ($row) {
+        return $row.attr('data-object-id');
+      })},
+      traditional: true,
+      error: function (jqXHR, textStatus, errorThrown) {
+        $.each($rows, function (index, $row) {
+          horizon.datatables.stop_row_update($row);
+        });
+      },
+      success: function (data, textStatus, jqXHR) {
+        $.each($rows, function (index, $row) {
+          var obj_id = $row.attr('data-object-id');
+          if (data.rows.hasOwnProperty(obj_id)) {
+            horizon.datatables.replace_row($table, $row, data.rows[obj_id]);
+          } else if ($.inArray(obj_id, data.deleted) > -1) {
+            horizon.datatables.remove_row($table, $row);
+          } else {
+            horizon.datatables.stop_row_update($row);
           }
         });
-      });
+      },
+      complete: complete
+    });
+  },
+
+  remove_row: function ($table, $row) {
+    // Update the footer count and reset to default empty row if needed
+    var row_count, colspan, template, params, empty_row;
+
+    // existing count minus one for the row we're removing
+    row_count = horizon.datatables.update_footer_count($table, -1);
+
+    if(row_count === 0) {
+      colspan = $table.find('th[colspan]').attr('colspan');
+      template = horizon.templates.compiled_templates["#empty_row_template"];
+      params = {
+          "colspan": colspan,
+          no_items_label: gettext("No items to display.")
+      };
+      empty_row = template.render(params);
+      $row.replaceWith(empty_row);
+    } else {
+      $row.remove();
+    }
+    // Reset tablesorter's data cache.
+    $table.trigger("update");
+    // Enable launch action if quota is not exceeded
+    horizon.datatables.update_actions();
+  },
+
+  stop_row_update: function ($row) {
+    horizon.utils.log(gettext("An error occurred while updating."));
+    $row.removeClass("ajax-update");
+    $row.find("i.ajax-updating").remove();
+  },
+
+  replace_row: function ($table, $row, data) {
+    var $new_row = $(data);
+
+    if ($new_row.hasClass('status_unknown')) {
+      var spinner_elm = $new_row.find("td.status_unknown:last");
+      var imagePath = $new_row.find('.btn-action-required').length > 0 ?
+        "dashboard/img/action_required.png":
+        "dashboard/img/loading.gif";
+      imagePath = STATIC_URL + imagePath;
+      spinner_elm.prepend(
+        $("<div>")
+          .addClass("loading_gif")
+          .append($("<img>").attr("src", imagePath)));
+    }
+
+    // Only replace row if the html content has changed
+    if($new_row.html() !== $row.html()) {
+      if($row.find('.table-row-multi-select:checkbox').is(':checked')) {
+        // Preserve the checkbox if it's already clicked
+        $new_row.find('.table-row-multi-select:checkbox').prop('checked', true);
+      }
+      $row.replaceWith($new_row);
+      // Reset tablesorter's data cache.
+      $table.trigger("update");
+      // Reset decay constant.
+      $table.removeAttr('decay_constant');
+      // Check that quicksearch is enabled for this table
+      // Reset quicksearch's data cache.
+      if ($table.attr('id') in horizon.datatables.qs) {
+        horizon.datatables.qs[$table.attr('id')].cache();
+      }
     }
   },
 
@@ -460,6 +460,11 @@ class Row(html.HTMLElement):
     object appropriate for consumption by the table (effectively the "get"
     lookup versus the table's "list" lookup).
 
+    All the rows of a table awaiting an update are polled with a single
+    request, whose data is fetched by ``get_data_many``. By default it calls
+    ``get_data`` for each row; subclasses can override it to fetch the data
+    of all the rows with a single API call instead.
+
     The automatic update interval is configurable by setting the key
     ``ajax_poll_interval`` in the ``HORIZON_CONFIG`` dictionary.
     Default: ``2500`` (measured in milliseconds).
@@ -508,10 +513,18 @@ class Row(html.HTMLElement):
         updates of cell. Generally you won't need to change this value.
         It is also used for inline edit of the cell.
         Default: ``"cell_update"``.
+
+    .. attribute:: ajax_batch_action_name
+
+        String that is used for the query parameter key to request AJAX
+        updates of several rows at once. Generally you won't need to change
+        this value.
+        Default: ``"rows_update"``.
     """
     ajax = False
     ajax_action_name = "row_update"
     ajax_cell_action_name = "cell_update"
+    ajax_batch_action_name = "rows_update"
 
     def __init__(self, table, datum=None):
         super(Row, self).__init__()
@@ -553,6 +566,8 @@ class Row(html.HTMLElement):
             interval = conf.HORIZON_CONFIG['ajax_poll_interval']
             self.attrs['data-update-interval'] = interval
             self.attrs['data-update-url'] = self.get_ajax_update_url()
+            self.attrs['data-batch-update-url'] = \
+                self.get_ajax_batch_update_url()
             self.classes.append("ajax-update")
 
         self.attrs['data-object-id'] = table.get_object_id(datum)
@@ -609,6 +624,14 @@ class Row(html.HTMLElement):
         ]))
         return "%s?%s" % (table_url, params)
 
+    def get_ajax_batch_update_url(self):
+        table_url = self.table.get_absolute_url()
+        params = urlencode(SortedDict([
+            ("action", self.ajax_batch_action_name),
+            ("table", self.table.name)
+        ]))
+        return "%s?%s" % (table_url, params)
+
     def can_be_selected(self, datum):
         """By default if multiselect enabled return True. You can remove the
         checkbox after an ajax update here if required.
@@ -621,6 +644,23 @@ class Row(html.HTMLElement):
         """
         return {}
 
+    def get_data_many(self, request, obj_ids):
+        """Fetches the updated data for several rows at once.
+
+        Returns a dict mapping the object ids passed in to the data of the
+        rows. The ids of objects which no longer exist are left out, and
+        ``None`` is returned for objects whose data couldn't be fetched.
+        """
+        data = {}
+        for obj_id in obj_ids:
+            try:
+                data[obj_id] = self.get_data(request, obj_id)
+            except Exception:
+                error = exceptions.handle(request, ignore=True)
+                if error is not exceptions.NotFound:
+                    data[obj_id] = None
+        return data
+
 
 class Cell(html.HTMLElement):
     """Represents a single cell in the table."""
@@ -1493,6 +1533,10 @@ class DataTable(object):
                         return HttpResponse(new_row.render())
                     else:
                         return HttpResponse(status=error.status_code)
+            elif (new_row.ajax and
+                  new_row.ajax_batch_action_name == action_name):
+                if request.is_ajax():
+                    return self.rows_update_handle(request, new_row)
             elif new_row.ajax_cell_action_name == action_name:
                 # inline edit of the cell actions
                 return self.inline_edit_handle(request, table_name,
@@ -1509,6 +1553,39 @@ class DataTable(object):
                             return handled
         return None
 
+    def rows_update_handle(self, request, new_row):
+        """AJAX update of several rows at once.
+
+        Responds with a JSON object holding the rendered ``rows`` by object
+        id, the ids of the objects ``deleted`` since and the ids of the
+        objects whose update ``failed``.
+        """
+        obj_ids = request.GET.getlist('obj_id')
+        try:
+            data = new_row.get_data_many(request, obj_ids)
+        except Exception:
+            error = exceptions.handle(request, ignore=True)
+            return HttpResponse(status=error.status_code)
+        rows = {}
+        deleted = []
+        failed = []
+        for obj_id in obj_ids:
+            if obj_id not in data:
+                deleted.append(obj_id)
+            elif data[obj_id] is None:
+                failed.append(obj_id)
+            else:
+                row = self._meta.row_class(self)
+                if self.get_object_id(data[obj_id]) == self.current_item_id:
+                    self.selected = True
+                    row.classes.append('current_selected')
+                row.load_cells(data[obj_id])
+                rows[obj_id] = row.render()
+        return HttpResponse(json.dumps({'rows': rows,
+                                        'deleted': deleted,
+                                        'failed': failed}),
+                            content_type='application/json')
+
     def inline_edit_handle(self, request, table_name, action_name, obj_id,
                            new_row):
         """Inline edit handler.
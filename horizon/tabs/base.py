@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import sys
 
 import six
@@ -20,7 +21,9 @@ from django.template.loader import render_to_string
 from django.template import TemplateSyntaxError  # noqa
 from django.utils.datastructures import SortedDict
 
+from horizon import conf
 from horizon import exceptions
+from horizon.utils import concurrency
 from horizon.utils import html
 
 SEPARATOR = "__"
@@ -72,11 +75,19 @@ class TabGroup(html.HTMLElement):
         Read-only property which is set to the value of the current active tab.
         This may not be the same as the value of ``selected`` if no
         specific tab was requested via the ``GET`` parameter.
+
+    .. attribute:: load_workers
+
+        The maximum number of threads used to preload the data of the tabs
+        (and of the tables of each :class:`~horizon.tabs.TableTab`)
+        concurrently. ``1`` loads them one after another. Default: ``None``,
+        which uses the ``tab_load_workers`` key of ``HORIZON_CONFIG``.
     """
     slug = None
     template_name = "horizon/common/_tab_group.html"
     param_name = 'tab'
     sticky = False
+    load_workers = None
     _selected = None
     _active = None
 
@@ -111,15 +122,39 @@ class TabGroup(html.HTMLElement):
     def __repr__(self):
         return "<%s: %s>" % (self.__class__.__name__, self.slug)
 
+    def get_load_workers(self):
+        """Returns the maximum number of threads used to preload data, see
+        :attr:`~horizon.tabs.TabGroup.load_workers`.
+        """
+        if self.load_workers is not None:
+            return self.load_workers
+        return conf.HORIZON_CONFIG['tab_load_workers'] or 1
+
     def load_tab_data(self):
         """Preload all data that for the tabs that will be displayed."""
-        for tab in self._tabs.values():
-            if tab.load and not tab.data_loaded:
+        tabs = [tab for tab in self._tabs.values()
+                if tab.load and not tab.data_loaded]
+        max_workers = self.get_load_workers()
+        if max_workers <= 1:
+            for tab in tabs:
                 try:
                     tab._data = tab.get_context_data(self.request)
                 except Exception:
                     tab._data = False
                     exceptions.handle(self.request)
+            return
+        futures = concurrency.run_concurrently(
+            [functools.partial(tab.get_context_data, self.request)
+             for tab in tabs],
+            max_workers=max_workers)
+        # Errors are handled in the order of the tabs, as if they had been
+        # loaded one after another.
+        for tab, future in zip(tabs, futures):
+            try:
+                tab._data = future.result()
+            except Exception:
+                tab._data = False
+                exceptions.handle(self.request)
 
     def get_id(self):
         """Returns the id for this tab group. Defaults to the value of the tab
@@ -431,6 +466,7 @@ class TableTab(Tab):
         """
         # We only want the data to be loaded once, so we track if we have...
         if not self._table_data_loaded:
+            data_funcs = []
             for table_name, table in self._tables.items():
                 # Fetch the data function.
                 func_name = "get_%s_data" % table_name
@@ -439,8 +475,17 @@ class TableTab(Tab):
                     cls_name = self.__class__.__name__
                     raise NotImplementedError("You must define a %s method "
                                               "on %s." % (func_name, cls_name))
-                # Load the data.
-                table.data = data_func()
+                data_funcs.append(data_func)
+            # Load the data, concurrently if the tab group allows it.
+            max_workers = self.tab_group.get_load_workers()
+            if max_workers <= 1:
+                data = [func() for func in data_funcs]
+            else:
+                futures = concurrency.run_concurrently(data_funcs,
+                                                       max_workers=max_workers)
+                data = [future.result() for future in futures]
+            for table, table_data in zip(self._tables.values(), data):
+                table.data = table_data
                 table._meta.has_prev_data = self.has_prev_data(table)
                 table._meta.has_more_data = self.has_more_data(table)
             # Mark our data as loaded so we don't run the loaders again.
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 from django.core.urlresolvers import reverse
 from django import forms
 from django import http
@@ -580,6 +582,8 @@ class DataTableTests(test.TestCase):
         self.assertContains(resp, 'id="my_table__row__3"', 1)
         update_string = "action=row_update&amp;table=my_table&amp;obj_id="
         self.assertContains(resp, update_string, 3)
+        batch_update_string = 'action=rows_update&amp;table=my_table"'
+        self.assertContains(resp, batch_update_string, 3)
         self.assertContains(resp, "data-update-interval", 3)
         # Verify our XSS protection
         self.assertContains(resp, '<a href="http://example.com/" '
@@ -963,6 +967,42 @@ class DataTableTests(test.TestCase):
                                   '<FakeObject: object_2>',
                                   '<FakeObject: object_3>'])
 
+    def test_table_rows_update(self):
+        params = {"table": "my_table", "action": "rows_update",
+                  "obj_id": ["1", "2"]}
+        req = self.factory.get('/my_url/',
+                               params,
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.table = MyTable(req)
+        resp = self.table.maybe_preempt()
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.content)
+        # By default the data of each row is fetched by Row.get_data.
+        self.assertEqual(["1", "2"], sorted(data['rows']))
+        self.assertIn("status_down", data['rows']['1'])
+        self.assertEqual([], data['deleted'])
+        self.assertEqual([], data['failed'])
+
+    def test_table_rows_update_get_data_many(self):
+        self.mox.StubOutWithMock(MyRow, 'get_data_many')
+        MyRow.get_data_many(IsA(http.HttpRequest), ["1", "2", "3"]) \
+            .AndReturn({"1": TEST_DATA_2[0], "2": None})
+        self.mox.ReplayAll()
+
+        params = {"table": "my_table", "action": "rows_update",
+                  "obj_id": ["1", "2", "3"]}
+        req = self.factory.get('/my_url/',
+                               params,
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.table = MyTable(req)
+        resp = self.table.maybe_preempt()
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.content)
+        self.assertEqual(["1"], list(data['rows']))
+        self.assertIn("my_table__row__1", data['rows']['1'])
+        self.assertEqual(["3"], data['deleted'])
+        self.assertEqual(["2"], data['failed'])
+
     def test_inline_edit_update_action_get_non_ajax(self):
         # Non ajax inline edit request should return None.
         url = ('/my_url/?action=cell_update'
@@ -13,6 +13,7 @@
 #    under the License.
 
 import copy
+import threading
 
 from django import http
 
@@ -91,6 +92,33 @@ class RecoverableErrorTab(horizon_tabs.Tab):
         raise exc
 
 
+class TabWaiting(BaseTestTab):
+    slug = "tab_waiting"
+    name = "Waiting Tab"
+    template_name = "_tab.html"
+    ready = threading.Event()
+
+    def get_context_data(self, request):
+        # Only returns True if TabSignalling runs at the same time.
+        return {"signalled": self.ready.wait(5)}
+
+
+class TabSignalling(BaseTestTab):
+    slug = "tab_signalling"
+    name = "Signalling Tab"
+    template_name = "_tab.html"
+
+    def get_context_data(self, request):
+        TabWaiting.ready.set()
+        return {"signalled": True}
+
+
+class ConcurrentGroup(horizon_tabs.TabGroup):
+    slug = "tab_group"
+    tabs = (TabWaiting, RecoverableErrorTab, TabSignalling)
+    load_workers = 3
+
+
 class TableTabGroup(horizon_tabs.TabGroup):
     slug = "tab_group"
     tabs = [TabWithTable]
@@ -259,6 +287,22 @@ class TabTests(test.TestCase):
         # Since we only had one table we should get the shortcut name too.
         self.assertEqual(table, context['table'])
 
+    def test_load_tab_data_concurrently(self):
+        TabWaiting.ready.clear()
+        tg = ConcurrentGroup(self.factory.get("/"))
+        tg.load_tab_data()
+        tabs = tg.get_tabs()
+        self.assertEqual(["tab_waiting", "recoverable_error_tab",
+                          "tab_signalling"], [tab.slug for tab in tabs])
+        self.assertEqual({"signalled": True}, tabs[0]._data)
+        # The failing tab doesn't affect the others.
+        self.assertFalse(tabs[1]._data)
+        self.assertEqual({"signalled": True}, tabs[2]._data)
+
+    def test_load_workers_default(self):
+        self.assertEqual(1, TableTabGroup(self.request).get_load_workers())
+        self.assertEqual(3, ConcurrentGroup(self.request).get_load_workers())
+
     def test_tabbed_table_view(self):
         view = TabWithTableView.as_view()
 
@@ -14,13 +14,17 @@
 
 import datetime
 import os
+import threading
+import time
 
 from django.core.exceptions import ValidationError  # noqa
 import django.template
 from django.template import defaultfilters
+from django.utils import translation
 
 from horizon import forms
 from horizon.test import helpers as test
+from horizon.utils import concurrency
 from horizon.utils import filters
 # we have to import the filter in order to register it
 from horizon.utils.filters import parse_isotime  # noqa
@@ -353,6 +357,150 @@ class MemoizedTests(test.TestCase):
             cache_calls(1)
         self.assertEqual(1, len(values_list))
 
+    def test_memoized_cache_info(self):
+        @memoized.memoized
+        def cache_calls(value):
+            return value
+
+        cache_calls(1)
+        cache_calls(1)
+        cache_calls(2)
+        self.assertEqual((1, 2, 0, memoized.DEFAULT_MAX_SIZE, 2),
+                         cache_calls.cache_info())
+        cache_calls.cache_clear()
+        self.assertEqual((0, 0, 0, memoized.DEFAULT_MAX_SIZE, 0),
+                         cache_calls.cache_info())
+
+    def test_memoized_max_size_evicts_least_recently_used(self):
+        values_list = []
+
+        @memoized.memoized(max_size=2)
+        def cache_calls(value):
+            values_list.append(value)
+            return value
+
+        cache_calls(1)
+        cache_calls(2)
+        cache_calls(1)
+        # Evicts 2, which is now the least recently used value.
+        cache_calls(3)
+        cache_calls(1)
+        cache_calls(2)
+        self.assertEqual([1, 2, 3, 2], values_list)
+        info = cache_calls.cache_info()
+        self.assertEqual(2, info.size)
+        self.assertEqual(2, info.evictions)
+
+    def test_memoized_timeout(self):
+        values_list = []
+
+        @memoized.memoized(timeout=60)
+        def cache_calls(value):
+            values_list.append(value)
+            return value
+
+        now = time.time()
+        self.mox.StubOutWithMock(time, 'time')
+        time.time().AndReturn(now)
+        time.time().AndReturn(now + 30)
+        time.time().AndReturn(now + 90)
+        time.time().AndReturn(now + 90)
+        self.mox.ReplayAll()
+
+        for x in range(0, 3):
+            cache_calls(1)
+        self.assertEqual([1, 1], values_list)
+        self.assertEqual(1, cache_calls.cache_info().evictions)
+
+    def test_memoized_weakref_removal(self):
+        class Arg(object):
+            pass
+
+        @memoized.memoized
+        def cache_calls(value):
+            return True
+
+        arg = Arg()
+        cache_calls(arg)
+        self.assertEqual(1, cache_calls.cache_info().size)
+        del arg
+        # The removal is queued, and made on the next use of the cache.
+        cache_calls(2)
+        self.assertEqual(1, cache_calls.cache_info().size)
+
+
+class ConcurrencyTests(test.TestCase):
+    def test_results_keep_call_order(self):
+        funcs = [lambda x=x: x * 2 for x in range(10)]
+        futures = concurrency.run_concurrently(funcs, max_workers=3)
+        self.assertEqual(range(0, 20, 2), [f.result() for f in futures])
+
+    def test_calls_run_in_parallel(self):
+        barrier = threading.Event()
+        futures = concurrency.run_concurrently([lambda: barrier.wait(5),
+                                                barrier.set])
+        # The first call can only succeed if the second one runs meanwhile.
+        self.assertTrue(futures[0].result())
+
+    def test_exception_reraised_by_result(self):
+        def fail():
+            raise ValueError("boom")
+
+        ok, failed = concurrency.run_concurrently([lambda: 1, fail])
+        self.assertEqual(1, ok.result())
+        self.assertRaises(ValueError, failed.result)
+
+    def test_single_worker_runs_in_calling_thread(self):
+        thread = threading.current_thread()
+        futures = concurrency.run_concurrently(
+            [threading.current_thread, threading.current_thread],
+            max_workers=1)
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual([thread, thread], [f.result() for f in futures])
+
+    def test_workers_inherit_language(self):
+        with translation.override('fr'):
+            futures = concurrency.run_concurrently(
+                [translation.get_language, translation.get_language])
+        self.assertEqual(['fr', 'fr'], [f.result() for f in futures])
+
+    def test_as_completed(self):
+        barrier = threading.Event()
+        first, second = concurrency.run_concurrently(
+            [lambda: barrier.wait(5), lambda: 2])
+        completed = concurrency.as_completed([first, second])
+        self.assertIs(second, next(completed))
+        barrier.set()
+        self.assertIs(first, next(completed))
+        self.assertRaises(StopIteration, next, completed)
+
+    def test_as_completed_timeout(self):
+        barrier = threading.Event()
+        futures = concurrency.run_concurrently([lambda: barrier.wait(5),
+                                                lambda: 2])
+        completed = concurrency.as_completed(futures, timeout=0.1)
+        self.assertIs(futures[1], next(completed))
+        self.assertRaises(concurrency.TimeoutError, next, completed)
+        self.assertRaises(concurrency.TimeoutError, futures[0].result, 0)
+        barrier.set()
+        self.assertTrue(futures[0].result())
+
+    def test_cancel_pending_call(self):
+        barrier = threading.Event()
+        calls = []
+        futures = concurrency.run_concurrently(
+            [lambda: barrier.wait(5), lambda: barrier.wait(5),
+             lambda: calls.append(1)],
+            max_workers=2)
+        # Both workers are busy, so the last call hasn't started yet.
+        self.assertTrue(futures[2].cancel())
+        barrier.set()
+        self.assertTrue(all(f.result() for f in futures[:2]))
+        self.assertFalse(futures[0].cancel())
+        self.assertTrue(futures[2].cancelled())
+        self.assertRaises(concurrency.CancelledError, futures[2].result)
+        self.assertEqual([], calls)
+
 
 class GetPageSizeTests(test.TestCase):
     def test_bad_session_value(self):
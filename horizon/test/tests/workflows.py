@@ -163,6 +163,50 @@ class WorkflowsTests(test.TestCase):
         self.assertEqual([local_callback_func, other_callback_func],
                          step_two._handlers["project_id"])
 
+    def test_step_handlers_resolved_once(self):
+        class MethodStep(TestStepTwo):
+            connections = {"project_id": ("self.handler",
+                "horizon.test.tests.workflows.other_callback_func")}
+
+            def handler(self, request, context):
+                return self
+
+        workflow = TestWorkflow(self.request)
+        step_a = MethodStep(workflow)
+        specs = MethodStep._handler_specs
+        step_b = MethodStep(workflow)
+        self.assertIs(specs, MethodStep._handler_specs)
+        # Handlers on the step are bound to each instance.
+        self.assertEqual(step_a, step_a._handlers["project_id"][0](None, {}))
+        self.assertEqual(step_b, step_b._handlers["project_id"][0](None, {}))
+        self.assertEqual(other_callback_func,
+                         step_b._handlers["project_id"][1])
+
+        class MissingMethodStep(TestStepTwo):
+            connections = {"project_id": ("self.missing",)}
+
+        with self.assertRaises(AttributeError):
+            MissingMethodStep(workflow)
+
+    def test_workflow_step_order_cached(self):
+        TestWorkflow._step_orders = {}
+        TestWorkflow.register(TestExtraStep)
+        flow = TestWorkflow(self.request)
+        self.assertEqual(1, len(TestWorkflow._step_orders))
+        TestWorkflow(self.request)
+        self.assertEqual(1, len(TestWorkflow._step_orders))
+
+        # Registering another step changes the order.
+        TestWorkflow.register(AdminStep)
+        flow = TestWorkflow(self.request)
+        self.assertEqual(2, len(TestWorkflow._step_orders))
+        self.assertQuerysetEqual(flow.steps,
+                                 ['<TestStepOne: test_action_one>',
+                                  '<TestExtraStep: test_action_three>',
+                                  '<TestStepTwo: test_action_two>'])
+        self.assertEqual(set(['project_id', 'instance_id', 'extra_data',
+                              'user_id']), flow.contributions)
+
     def test_step_invalid_connections_handlers_not_list_or_tuple(self):
         class InvalidStepA(TestStepTwo):
             connections = {'project_id': {}}
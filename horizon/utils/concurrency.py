@@ -0,0 +1,172 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sys
+import threading
+import time
+
+from django.utils import translation
+import six
+from six.moves import queue
+
+
+class TimeoutError(Exception):
+    """Raised when calls started by :func:`run_concurrently` don't finish in
+    the given time.
+    """
+    pass
+
+
+class CancelledError(Exception):
+    """Raised when getting the result of a cancelled call."""
+    pass
+
+
+class Future(object):
+    """The pending result of a call started by :func:`run_concurrently`."""
+
+    def __init__(self, func):
+        self._func = func
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._started = False
+        self._cancelled = False
+        self._value = None
+        self._exc_info = None
+        self._waiters = []
+
+    def _run(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._started = True
+        try:
+            self._value = self._func()
+        except Exception:
+            self._exc_info = sys.exc_info()
+        finally:
+            self._set_done()
+
+    def _set_done(self):
+        with self._lock:
+            self._done.set()
+            waiters = self._waiters
+            self._waiters = []
+        for waiter in waiters:
+            waiter.put(self)
+
+    def _add_waiter(self, waiter):
+        with self._lock:
+            if not self._done.is_set():
+                self._waiters.append(waiter)
+                return
+        waiter.put(self)
+
+    def cancel(self):
+        """Cancels the call unless it has already started.
+
+        Returns ``True`` if the call won't be made.
+        """
+        with self._lock:
+            if self._started:
+                return False
+            if not self._cancelled:
+                self._cancelled = True
+                self._exc_info = (CancelledError, CancelledError(), None)
+        self._set_done()
+        return True
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Waits for the call to finish and returns its value.
+
+        If the call raised an exception, the same exception (with its
+        original traceback) is raised again in the calling thread, so the
+        usual ``try``/``except``/:func:`horizon.exceptions.handle` blocks
+        work unchanged around it. :class:`TimeoutError` is raised if the
+        call doesn't finish within ``timeout`` seconds.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError()
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._value
+
+
+def as_completed(futures, timeout=None):
+    """Yields the given futures as their calls finish.
+
+    :class:`TimeoutError` is raised if they haven't all finished within
+    ``timeout`` seconds; the remaining calls are not cancelled.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    finished = queue.Queue()
+    for future in futures:
+        future._add_waiter(finished)
+    for i in range(len(futures)):
+        wait = None
+        if deadline is not None:
+            wait = max(deadline - time.time(), 0)
+        try:
+            yield finished.get(timeout=wait)
+        except queue.Empty:
+            raise TimeoutError()
+
+
+def run_concurrently(funcs, max_workers=None):
+    """Starts each of the given callables and returns a list of futures.
+
+    The callables take no arguments (use ``functools.partial`` to bind
+    them) and are started at once on up to ``max_workers`` short-lived
+    threads, which inherit the active language of the calling thread. The
+    returned :class:`Future` objects are in the same order as ``funcs``.
+
+    When ``max_workers`` is ``1`` or there is only one callable, the calls
+    are made synchronously in the calling thread.
+    """
+    futures = [Future(func) for func in funcs]
+    workers = len(futures)
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    if workers <= 1:
+        for future in futures:
+            future._run()
+        return futures
+
+    pending = queue.Queue()
+    for future in futures:
+        pending.put(future)
+    language = translation.get_language()
+
+    def worker():
+        if language:
+            translation.activate(language)
+        try:
+            while True:
+                try:
+                    future = pending.get_nowait()
+                except queue.Empty:
+                    return
+                future._run()
+        finally:
+            translation.deactivate()
+
+    for i in range(workers):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+    return futures
@@ -12,7 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
+import threading
+import time
 import warnings
 import weakref
 
@@ -46,7 +49,13 @@ def _get_key(args, kwargs, remove_callback):
     return weak_args, weak_kwargs
 
 
-def memoized(func):
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'max_size', 'size'])
+
+DEFAULT_MAX_SIZE = 1000
+
+
+def memoized(func=None, max_size=DEFAULT_MAX_SIZE, timeout=None):
     """Decorator that caches function calls.
 
     Caches the decorated function's return value the first time it is called
@@ -55,11 +64,38 @@ def memoized(func):
 
     The cache uses weak references to the passed arguments, so it doesn't keep
     them alive in memory forever.
+
+    It can also be used with arguments, e.g. ``@memoized(max_size=100,
+    timeout=60)``. At most ``max_size`` values are kept (``None`` means no
+    limit); when it's reached the least recently used value is evicted.
+    Values older than ``timeout`` seconds, if given, are evicted as well.
+
+    The decorated function gets a ``cache_info()`` method returning the
+    number of cache hits, misses and evictions along with the maximum and
+    current size of the cache, and a ``cache_clear()`` method.
     """
+    if func is None:
+        return functools.partial(memoized, max_size=max_size, timeout=timeout)
+
     # The dictionary in which all the data will be cached. This is a separate
     # instance for every decorated function, and it's stored in a closure of
-    # the wrapped function.
-    cache = {}
+    # the wrapped function. It's ordered from the least to the most recently
+    # used value, and the values are (value, expiry time) pairs.
+    cache = collections.OrderedDict()
+    lock = threading.Lock()
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    # The keys whose weakly referenced arguments are gone. The weak reference
+    # callbacks may be called by the garbage collector at any point, even in
+    # the middle of an operation on the cache by the same thread, so they
+    # only queue the keys, which are removed on the next use of the cache.
+    dead_keys = collections.deque()
+
+    def purge():
+        # Must be called with the lock held.
+        while dead_keys:
+            # Some other weak reference might have already removed that
+            # key -- in that case we don't need to do anything.
+            cache.pop(dead_keys.popleft(), None)
 
     @functools.wraps(func)
     def wrapped(*args, **kwargs):
@@ -70,24 +106,31 @@ def memoized(func):
 
         def remove(ref):
             """A callback to remove outdated items from cache."""
-            try:
-                # The key here is from closure, and is calculated later.
-                del cache[key]
-            except KeyError:
-                # Some other weak reference might have already removed that
-                # key -- in that case we don't need to do anything.
-                pass
+            # The key here is from closure, and is calculated later.
+            dead_keys.append(key)
 
         key = _get_key(args, kwargs, remove)
         try:
-            # We want cache hit to be as fast as possible, and don't really
-            # care much about the speed of a cache miss, because it will only
-            # happen once and likely calls some external API, database, or
-            # some other slow thing. That's why the hit is in straightforward
-            # code, and the miss is in an exception.
-            value = cache[key]
+            with lock:
+                purge()
+                # Moving the key to the end marks it as the most recently
+                # used one.
+                value, expires = cache.pop(key)
+                if expires is not None and expires < time.time():
+                    stats['evictions'] += 1
+                    raise KeyError(key)
+                cache[key] = (value, expires)
+                stats['hits'] += 1
         except KeyError:
-            value = cache[key] = func(*args, **kwargs)
+            value = func(*args, **kwargs)
+            expires = time.time() + timeout if timeout is not None else None
+            with lock:
+                purge()
+                stats['misses'] += 1
+                cache[key] = (value, expires)
+                while max_size is not None and len(cache) > max_size:
+                    cache.popitem(last=False)
+                    stats['evictions'] += 1
         except TypeError:
             # The calculated key may be unhashable when an unhashable object,
             # such as a list, is passed as one of the arguments. In that case,
@@ -96,8 +139,24 @@ def memoized(func):
             warnings.warn(
                 "The key %r is not hashable and cannot be memoized." % key,
                 UnhashableKeyWarning, 2)
+            with lock:
+                stats['misses'] += 1
             value = func(*args, **kwargs)
         return value
+
+    def cache_info():
+        with lock:
+            purge()
+            return CacheInfo(max_size=max_size, size=len(cache), **stats)
+
+    def cache_clear():
+        with lock:
+            dead_keys.clear()
+            cache.clear()
+            stats.update(hits=0, misses=0, evictions=0)
+
+    wrapped.cache_info = cache_info
+    wrapped.cache_clear = cache_clear
     return wrapped
 
 # We can use @memoized for methods now too, because it uses weakref and so
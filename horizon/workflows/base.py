@@ -188,6 +188,19 @@ class MembershipAction(Action):
     def get_member_field_name(self, role_id):
         return self.slug + "_role_" + role_id
 
+    def get_submitted_members(self, role_ids):
+        """Returns the IDs of the members given for the roles in the
+        submitted data, which may not be among the choices of the fields
+        when the available members are searched for (see
+        :attr:`UpdateMembersStep.search_url`).
+        """
+        members = set()
+        if self.is_bound:
+            for role_id in role_ids:
+                field_name = self.get_member_field_name(role_id)
+                members.update(self.data.getlist(field_name))
+        return members
+
 
 class Step(object):
     """A step is a wrapper around an action which defines its context in a
@@ -299,45 +312,70 @@ class Step(object):
         self.name = self.action_class.name
         self.permissions = self.action_class.permissions
         self.has_errors = False
-        self._handlers = {}
+
+        # Gather our connection handlers and make sure they exist. Those
+        # declared on the class are only resolved once, the ones on the step
+        # itself are looked up here.
+        if "connections" in self.__dict__:
+            specs = self._compile_handlers(self.connections)
+        else:
+            specs = self._get_handler_specs()
 
         if self.connections is None:
             # We want a dict, but don't want to declare a mutable type on the
             # class directly.
             self.connections = {}
 
-        # Gather our connection handlers and make sure they exist.
-        for key, handlers in self.connections.items():
-            self._handlers[key] = []
+        self._handlers = {}
+        for key, handlers in specs:
+            self._handlers[key] = [self._bind_handler(handler)
+                                   for handler in handlers]
+
+    @classmethod
+    def _get_handler_specs(cls):
+        """Returns the connection handlers of the step class, compiled by
+        :meth:`_compile_handlers` the first time they're needed.
+        """
+        specs = cls.__dict__.get("_handler_specs")
+        if specs is None:
+            specs = cls._compile_handlers(cls.connections)
+            cls._handler_specs = specs
+        return specs
+
+    @classmethod
+    def _compile_handlers(cls, connections):
+        """Resolves connection handlers, checking that they all exist.
+
+        Returns a list of ``(key, handlers)`` pairs, where each handler is
+        either a callable or, for those beginning with ``"self"``, the tuple
+        of attribute names to look up on the step instance.
+        """
+        name = cls.__name__
+        specs = []
+        for key, handlers in (connections or {}).items():
+            compiled = []
             # TODO(gabriel): This is a poor substitute for broader handling
             if not isinstance(handlers, (list, tuple)):
                 raise TypeError("The connection handlers for %s must be a "
-                                "list or tuple." % cls)
+                                "list or tuple." % name)
             for possible_handler in handlers:
                 if callable(possible_handler):
                     # If it's callable we know the function exists and is valid
-                    self._handlers[key].append(possible_handler)
+                    compiled.append(possible_handler)
                     continue
                 elif not isinstance(possible_handler, basestring):
                     raise TypeError("Connection handlers must be either "
                                     "callables or strings.")
                 bits = possible_handler.split(".")
                 if bits[0] == "self":
-                    root = self
-                    for bit in bits[1:]:
-                        try:
-                            root = getattr(root, bit)
-                        except AttributeError:
-                            raise AttributeError("The connection handler %s "
-                                                 "could not be found on %s."
-                                                 % (possible_handler, cls))
-                    handler = root
+                    # Looked up on the instance, see _bind_handler.
+                    handler = tuple(bits[1:])
                 elif len(bits) == 1:
                     # Import by name from local module not supported
                     raise ValueError("Importing a local function as a string "
                                      "is not supported for the connection "
                                      "handler %s on %s."
-                                     % (possible_handler, cls))
+                                     % (possible_handler, name))
                 else:
                     # Try a general import
                     module_name = ".".join(bits[:-1])
@@ -348,13 +386,29 @@ class Step(object):
                         raise ImportError("Could not import %s from the "
                                           "module %s as a connection "
                                              "handler on %s."
-                                             % (bits[-1], module_name, cls))
+                                             % (bits[-1], module_name, name))
                     except AttributeError:
                         raise AttributeError("Could not import %s from the "
                                              "module %s as a connection "
                                              "handler on %s."
-                                             % (bits[-1], module_name, cls))
-                self._handlers[key].append(handler)
+                                             % (bits[-1], module_name, name))
+                compiled.append(handler)
+            specs.append((key, compiled))
+        return specs
+
+    def _bind_handler(self, handler):
+        if not isinstance(handler, tuple):
+            return handler
+        root = self
+        for bit in handler:
+            try:
+                root = getattr(root, bit)
+            except AttributeError:
+                raise AttributeError("The connection handler %s could not be "
+                                     "found on %s."
+                                     % (".".join(("self",) + handler),
+                                        self.__class__.__name__))
+        return root
 
     @property
     def action(self):
@@ -469,9 +523,20 @@ class UpdateMembersStep(Step):
 
         The placeholder text used when the members list is empty.
 
+    .. attribute:: search_url
+
+        If set, the available list isn't filled from the choices of the
+        fields. Instead, it's filled as the user types in its filter with
+        the results of ``GET <search_url>?query=<text>&offset=<n>``, which
+        must be a JSON object with the ``items`` found (each an object with
+        an ``id`` and a ``name``) and whether there are ``more`` of them.
+        This way only the current members have to be given as choices.
+        Defaults to ``None``.
+
     """
     template_name = "horizon/common/_workflow_step_update_members.html"
     show_roles = True
+    search_url = None
     available_list_title = _("All available")
     members_list_title = _("Members")
     no_available_text = _("None available.")
@@ -628,9 +693,10 @@ class Workflow(html.HTMLElement):
         self._gather_steps()
 
         # Determine all the context data we need to end up with.
-        for step in self.steps:
-            self.depends_on = self.depends_on | set(step.depends_on)
-            self.contributions = self.contributions | set(step.contributes)
+        depends_on, contributions = self._get_context_keys(
+            tuple(step.__class__ for step in self.steps))
+        self.depends_on = set(depends_on)
+        self.contributions = set(contributions)
 
         # Initialize our context. For ease we can preseed it with a
         # regular dictionary. This should happen after steps have been
@@ -675,7 +741,43 @@ class Workflow(html.HTMLElement):
                                if has_permissions(self.request.user,
                                           self._registry[step_class])]
 
+    @classmethod
+    def _get_context_keys(cls, step_classes):
+        """Returns the roll-up of the ``depends_on`` and ``contributes``
+        values of the given step classes, computed once per set of steps.
+        """
+        cache = cls._get_class_cache("_context_keys")
+        keys = cache.get(step_classes)
+        if keys is None:
+            depends_on = set([])
+            contributions = set([])
+            for step_class in step_classes:
+                depends_on |= set(step_class.depends_on)
+                contributions |= set(step_class.contributes)
+            keys = (frozenset(depends_on), frozenset(contributions))
+            cache[step_classes] = keys
+        return keys
+
+    @classmethod
+    def _get_class_cache(cls, name):
+        # The caches of each workflow class are kept apart from those of its
+        # parents and children, whose steps may differ.
+        if name not in cls.__dict__:
+            setattr(cls, name, {})
+        return cls.__dict__[name]
+
     def _order_steps(self):
+        # The order only depends on the default steps and the other steps
+        # registered, so it's only worked out once for each combination.
+        key = (tuple(self.default_steps), frozenset(self._registry))
+        cache = self._get_class_cache("_step_orders")
+        steps = cache.get(key)
+        if steps is None:
+            steps = self._compute_step_order()
+            cache[key] = tuple(steps)
+        return list(steps)
+
+    def _compute_step_order(self):
         steps = list(copy.copy(self.default_steps))
         additional = self._registry.keys()
         for step in additional:
@@ -16,16 +16,33 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 from collections import Sequence  # noqa
+import copy
+import functools
+import hashlib
+import inspect
 import logging
+import threading
+import uuid
 
 from django.conf import settings
+from django.core.cache.backends import locmem
+from django.core.cache import get_cache  # noqa
+from django import http
+from requests import adapters
+from requests import sessions
+import six
+from six.moves.urllib import parse as urlparse
 
 from horizon import exceptions
+from horizon.utils import concurrency
 
 
 __all__ = ('APIResourceWrapper', 'APIDictWrapper',
-           'get_service_from_catalog', 'url_for',)
+           'get_service_from_catalog', 'url_for', 'gather',
+           'shared_memoized', 'request_memoized', 'invalidates',
+           'connection_pools',)
 
 
 LOG = logging.getLogger(__name__)
@@ -233,32 +250,69 @@ ENDPOINT_TYPE_TO_INTERFACE = {
 }
 
 
-def get_url_for_service(service, region, endpoint_type):
-    identity_version = get_version_from_service(service)
-    available_endpoints = [endpoint for endpoint in service['endpoints']
-                           if region == endpoint['region']]
-    """if we are dealing with the identity service and there is no endpoint
-    in the current region, it is okay to use the first endpoint for any
-    identity service endpoints and we can assume that it is global
+def _index_service(service):
+    """Returns the URLs of a catalog entry's endpoints by region and type.
+
+    V2 endpoints are indexed by endpoint type (e.g. ``publicURL``) and V3
+    endpoints by interface (e.g. ``public``). When several endpoints of the
+    same region provide the same type, the first one wins.
+    """
+    version = get_version_from_service(service)
+    regions = {}
+    any_region = {}
+    for endpoint in service['endpoints']:
+        region_urls = regions.setdefault(endpoint['region'], {})
+        for urls in (region_urls, any_region):
+            if version < 3:
+                for endpoint_type, url in endpoint.items():
+                    urls.setdefault(endpoint_type, url)
+            elif 'interface' in endpoint and 'url' in endpoint:
+                urls.setdefault(endpoint['interface'], endpoint['url'])
+    return {'service': service,
+            'version': version,
+            'regions': regions,
+            'any_region': any_region}
+
+
+def _url_from_index(entry, region, endpoint_type):
+    urls = entry['regions'].get(region)
+    if urls is None:
+        # If we are dealing with the identity service and there is no
+        # endpoint in the current region, it is okay to use the first
+        # endpoint for any region and we can assume that it is global.
+        if entry['service']['type'] != 'identity':
+            return None
+        urls = entry['any_region']
+    if entry['version'] >= 3:
+        endpoint_type = ENDPOINT_TYPE_TO_INTERFACE.get(endpoint_type, '')
+    return urls.get(endpoint_type)
+
+
+def get_catalog_index(user):
+    """Returns the indexed service catalog of the given user.
+
+    The index maps each service type to its (first) catalog entry and the
+    URLs of its endpoints by region and endpoint type. It is built once per
+    token and kept on the user object, so looking up an endpoint doesn't
+    involve scanning the whole catalog.
     """
-    if service['type'] == 'identity' and not available_endpoints:
-        available_endpoints = [endpoint for endpoint in service['endpoints']]
+    catalog = user.service_catalog
+    token_id = getattr(getattr(user, 'token', None), 'id', None)
+    # The catalog is also checked for changes in place, since it's a
+    # plain list that can be modified after the index has been built.
+    key = (token_id, id(catalog), len(catalog or ()))
+    cached = getattr(user, '_catalog_index', None)
+    if cached is None or cached[0] != key:
+        index = {}
+        for service in catalog or ():
+            if service['type'] not in index:
+                index[service['type']] = _index_service(service)
+        cached = user._catalog_index = (key, index)
+    return cached[1]
 
-    for endpoint in available_endpoints:
-        try:
-            if identity_version < 3:
-                return endpoint[endpoint_type]
-            else:
-                interface = \
-                    ENDPOINT_TYPE_TO_INTERFACE.get(endpoint_type, '')
-                if endpoint['interface'] == interface:
-                    return endpoint['url']
-        except (IndexError, KeyError):
-            """it could be that the current endpoint just doesn't match the
-            type, continue trying the next one
-            """
-            pass
-    return None
+
+def get_url_for_service(service, region, endpoint_type):
+    return _url_from_index(_index_service(service), region, endpoint_type)
 
 
 def url_for(request, service_type, endpoint_type=None, region=None):
@@ -267,34 +321,485 @@ def url_for(request, service_type, endpoint_type=None, region=None):
                                              'publicURL')
     fallback_endpoint_type = getattr(settings, 'SECONDARY_ENDPOINT_TYPE', None)
 
-    catalog = request.user.service_catalog
-    service = get_service_from_catalog(catalog, service_type)
-    if service:
+    entry = get_catalog_index(request.user).get(service_type)
+    if entry:
         if not region:
             region = request.user.services_region
-        url = get_url_for_service(service,
-                                  region,
-                                  endpoint_type)
+        url = _url_from_index(entry, region, endpoint_type)
         if not url and fallback_endpoint_type:
-            url = get_url_for_service(service,
-                                      region,
-                                      fallback_endpoint_type)
+            url = _url_from_index(entry, region, fallback_endpoint_type)
         if url:
             return url
     raise exceptions.ServiceCatalogException(service_type)
 
 
 def is_service_enabled(request, service_type, service_name=None):
-    service = get_service_from_catalog(request.user.service_catalog,
-                                       service_type)
-    if service:
-        region = request.user.services_region
-        for endpoint in service['endpoints']:
-            # ignore region for identity
-            if service['type'] == 'identity' or \
-               endpoint['region'] == region:
-                if service_name:
-                    return service['name'] == service_name
-                else:
-                    return True
+    entry = get_catalog_index(request.user).get(service_type)
+    if entry:
+        # ignore region for identity
+        if ((service_type == 'identity' and entry['service']['endpoints']) or
+                request.user.services_region in entry['regions']):
+            if service_name:
+                return entry['service']['name'] == service_name
+            else:
+                return True
     return False
+
+
+def gather(*calls):
+    """Runs independent API calls concurrently.
+
+    Each argument is a callable taking no arguments, usually a
+    ``functools.partial`` of an ``openstack_dashboard.api`` function. All of
+    them are started at once and a list of futures, in the same order as the
+    calls, is returned. Calling ``result()`` on a future waits for that call
+    and either returns its value or re-raises its exception in the calling
+    thread, so the existing per-call error handling is kept::
+
+        servers, flavors = api.base.gather(
+            functools.partial(api.nova.server_list, request),
+            functools.partial(api.nova.flavor_list, request))
+        try:
+            instances, has_more = servers.result()
+        except Exception:
+            exceptions.handle(request, _('Unable to retrieve instances.'))
+
+    The number of threads used is limited by the ``API_MAX_WORKERS``
+    setting; setting it to ``1`` makes all calls sequentially.
+    """
+    max_workers = getattr(settings, 'API_MAX_WORKERS', 8)
+    return concurrency.run_concurrently(calls, max_workers=max_workers)
+
+
+def _copy_list(items):
+    # Wrappers are copied so that attributes set on them stay with the
+    # caller; the wrapped client objects are still shared.
+    return [copy.copy(item)
+            if isinstance(item, (APIResourceWrapper, APIDictWrapper))
+            else item for item in items]
+
+
+def _copy_result(value):
+    """Returns a copy of a kept result if it's a list, or a tuple holding
+    lists such as ``(images, has_more, has_prev)``.
+    """
+    if isinstance(value, list):
+        return _copy_list(value)
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):
+        return tuple(_copy_list(item) if isinstance(item, list) else item
+                     for item in value)
+    return value
+
+
+class RequestResultStore(object):
+    """The results of the API calls made while handling a request.
+
+    Each result is kept under a key made of the name of the API call and its
+    arguments. Identical calls made afterwards get the same result, and
+    identical calls made concurrently (e.g. by :func:`gather`) wait for the
+    first one instead of calling the API again. Failed calls aren't kept.
+
+    Lists, including those inside a returned tuple, are handed out as
+    copies holding copies of the API wrappers in them, so callers can
+    reorder or extend them and set attributes on their items freely. The
+    client objects and dicts wrapped by those items are shared by all
+    callers and must not be modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.duplicates = collections.Counter()
+
+    def get(self, key, func):
+        """Returns the result kept under ``key``, calling ``func`` to get it
+        if there's none yet.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = concurrency.Future(func)
+                owner = True
+            else:
+                self.duplicates[key] += 1
+                owner = False
+        if owner:
+            future._run()
+            if future._exc_info is not None:
+                with self._lock:
+                    if self._futures.get(key) is future:
+                        del self._futures[key]
+        return _copy_result(future.result())
+
+    def invalidate(self, name):
+        """Drops the results of the API call named ``name``."""
+        with self._lock:
+            for key in list(self._futures):
+                if key[0] == name:
+                    del self._futures[key]
+
+    def summary(self):
+        """Returns a list of ``(name, arguments, count)`` tuples for the
+        calls which were made more than once, with the number of API calls
+        saved, most saved first.
+        """
+        return [key + (count,) for key, count
+                in self.duplicates.most_common()]
+
+
+def get_request_store(request):
+    """Returns the :class:`RequestResultStore` of the given request."""
+    return request.__dict__.setdefault('_api_results', RequestResultStore())
+
+
+def _call_name(func):
+    return "%s.%s" % (func.__module__.rsplit('.', 1)[-1], func.__name__)
+
+
+def _normalize(value):
+    # Turns call arguments into a value with a stable repr.
+    if isinstance(value, dict):
+        return tuple(sorted((_normalize(k), _normalize(v))
+                            for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, six.binary_type):
+        return value.decode('utf-8', 'replace')
+    if isinstance(value, (APIResourceWrapper, APIDictWrapper)):
+        # The repr of a wrapper shows only some of its attributes.
+        obj_id = getattr(value, 'id', None)
+        if obj_id is not None:
+            return (value.__class__.__name__, _normalize(obj_id))
+    return value
+
+
+def request_memoized(func):
+    """Decorator that collapses identical API calls made while handling a
+    request.
+
+    The first argument of the decorated function must be the request. The
+    results are kept in the request's :class:`RequestResultStore`, keyed by
+    the name of the function and the rest of its arguments, with defaults
+    filled in so that e.g. ``volume_list(request)`` and
+    ``volume_list(request, search_opts=None)`` share a result. Lists are
+    returned as copies, but the objects they wrap are shared; see
+    :class:`RequestResultStore`.
+
+    The decorated function gets an ``invalidate(request=None)`` method which
+    drops its results kept on ``request``; see :func:`invalidates`.
+    """
+    name = _call_name(func)
+    request_arg = inspect.getargspec(func).args[0]
+
+    @functools.wraps(func)
+    def wrapped(request, *args, **kwargs):
+        if not isinstance(request, http.HttpRequest):
+            return func(request, *args, **kwargs)
+        callargs = inspect.getcallargs(func, request, *args, **kwargs)
+        del callargs[request_arg]
+        key = (name, repr(_normalize(callargs)))
+        return get_request_store(request).get(
+            key, functools.partial(func, request, *args, **kwargs))
+
+    def invalidate(request=None):
+        if request is not None:
+            get_request_store(request).invalidate(name)
+
+    wrapped.invalidate = invalidate
+    return wrapped
+
+
+def invalidates(*funcs):
+    """Decorator for API calls which change data, dropping the results of
+    ``funcs`` (functions decorated with :func:`request_memoized` or
+    :func:`shared_memoized`) once the call has been made. The first
+    argument of the decorated function must be the request.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapped(request, *args, **kwargs):
+            try:
+                return func(request, *args, **kwargs)
+            finally:
+                for memoized_func in funcs:
+                    memoized_func.invalidate(request)
+        return wrapped
+    return decorator
+
+
+class RequestResultStoreMiddleware(object):
+    """Logs the API calls saved by the :class:`RequestResultStore` of each
+    request, at the debug level.
+    """
+
+    def process_response(self, request, response):
+        store = getattr(request, '_api_results', None)
+        if store is not None and store.duplicates:
+            LOG.debug('API calls saved while handling %s: %s' % (
+                request.path,
+                ', '.join('%s(%s) x%d' % call for call in store.summary())))
+        return response
+
+
+_shared_caches = {}
+
+
+def _get_shared_cache():
+    alias = getattr(settings, 'API_CACHE_BACKEND', 'default')
+    if alias not in _shared_caches:
+        cache = get_cache(alias)
+        if isinstance(cache, locmem.LocMemCache):
+            LOG.warning('The API cache "%s" is local to each process, so '
+                        'cached API results are only invalidated in the '
+                        'process which changed them. Use a shared cache '
+                        'such as memcached with several processes.', alias)
+        _shared_caches[alias] = cache
+    return _shared_caches[alias]
+
+
+def _cache_scope(request):
+    """Returns what makes a cached API result valid for this request's token.
+
+    Results are shared between requests (and users) made with tokens for the
+    same Keystone endpoint, region, project or domain and set of roles.
+    """
+    user = request.user
+    roles = sorted(role['name'] for role in getattr(user, 'roles', []))
+    return (getattr(user, 'endpoint', None),
+            getattr(user, 'services_region', None),
+            getattr(user, 'project_id', None),
+            getattr(user, 'domain_id', None),
+            roles)
+
+
+# How long the generations of the results of shared_memoized functions are
+# kept. It's given explicitly, because a timeout of None means the default
+# timeout of the backend before Django 1.6 (and 30 days is the longest one
+# memcached accepts).
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def shared_memoized(timeout=300, prepare=None, restore=None,
+                    scoped_invalidation=False):
+    """Decorator that caches API call results across requests.
+
+    Unlike :func:`horizon.utils.memoized.memoized`, the results are kept in
+    the Django cache named by the ``API_CACHE_BACKEND`` setting for
+    ``timeout`` seconds, so they are shared by all requests (and, with a
+    shared backend such as memcached, all processes) made with an equivalent
+    token; see :func:`_cache_scope`. Within a single request the value is
+    also kept on the request, so repeated calls don't hit the cache backend.
+
+    The timeout of each function can be overridden through the
+    ``API_CACHE_TIMEOUTS`` setting, e.g. ``{'nova.flavor_list': 600}``; a
+    timeout of ``0`` disables the shared cache for that function.
+
+    Values stored in the cache must be picklable. Client resource objects
+    usually hold a reference to their client, so ``prepare`` can be used to
+    turn the result into plain data before it's stored and ``restore`` (which
+    is passed the request and that data) to rebuild it on a cache hit.
+
+    The decorated function gets an ``invalidate(request=None)`` method which
+    drops the cached results for all scopes (and those kept on ``request``,
+    if given), to be called by API calls that change the underlying data.
+    With ``scoped_invalidation``, for results which only depend on the
+    project (such as its quota usages), ``invalidate(request)`` only drops
+    the results cached for the scope of ``request``.
+    """
+    def decorator(func):
+        name = _call_name(func)
+        generation_key = "horizon:api:%s:generation" % name
+
+        def scope_generation_key(request):
+            scope = repr(_normalize(_cache_scope(request))).encode('utf-8')
+            return "%s:%s" % (generation_key, hashlib.md5(scope).hexdigest())
+
+        def get_generation(cache, key):
+            generation = cache.get(key)
+            if generation is None:
+                # The generation key may have been evicted, in which case all
+                # existing entries are considered stale.
+                cache.add(key, uuid.uuid4().hex, GENERATION_TIMEOUT)
+                generation = cache.get(key)
+            return generation
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            requests = [arg for arg in args + tuple(kwargs.values())
+                        if isinstance(arg, http.HttpRequest)]
+            if not requests or not hasattr(requests[0], 'user'):
+                return func(*args, **kwargs)
+            request = requests[0]
+
+            call = repr(_normalize((
+                [arg for arg in args if arg is not request],
+                dict((k, v) for k, v in kwargs.items() if v is not request),
+                _cache_scope(request))))
+
+            def get_value():
+                ttl = getattr(settings, 'API_CACHE_TIMEOUTS', {}).get(name,
+                                                                      timeout)
+                if not ttl:
+                    return func(*args, **kwargs)
+
+                cache = _get_shared_cache()
+                generation = get_generation(cache, generation_key)
+                if scoped_invalidation:
+                    generation += get_generation(
+                        cache, scope_generation_key(request))
+                key = "horizon:api:%s:%s:%s" % (
+                    name, generation,
+                    hashlib.md5(call.encode('utf-8')).hexdigest())
+                data = cache.get(key)
+                if data is None:
+                    value = func(*args, **kwargs)
+                    cache.set(key, prepare(value) if prepare else value, ttl)
+                elif restore:
+                    value = restore(request, data)
+                else:
+                    value = data
+                return value
+
+            # Within a request, the value is kept in its result store.
+            return get_request_store(request).get((name, call), get_value)
+
+        def invalidate(request=None):
+            key = generation_key
+            if (scoped_invalidation and request is not None
+                    and hasattr(request, 'user')):
+                key = scope_generation_key(request)
+            _get_shared_cache().set(key, uuid.uuid4().hex, GENERATION_TIMEOUT)
+            if request is not None:
+                get_request_store(request).invalidate(name)
+
+        wrapped.invalidate = invalidate
+        return wrapped
+    return decorator
+
+
+class ConnectionPoolRegistry(object):
+    """Process-wide registry of HTTP connection pools for API clients.
+
+    Clients are still created for every request, with the request's token,
+    but they borrow their connections from here, so keep-alive connections
+    (and their TLS sessions) to each endpoint are reused across requests.
+    There's one pool per endpoint (scheme, host and port) and TLS settings,
+    each holding at most ``API_CONNECTION_POOL_SIZE`` idle connections.
+    """
+
+    def __init__(self):
+        self._adapters = {}
+        self._lock = threading.Lock()
+
+    def get_adapter(self, url, insecure=False, cacert=None):
+        """Returns the ``requests`` transport adapter for the given endpoint.
+        """
+        scheme, netloc = urlparse.urlsplit(url)[:2]
+        key = ("%s://%s" % (scheme, netloc), insecure, cacert)
+        with self._lock:
+            if key not in self._adapters:
+                size = getattr(settings, 'API_CONNECTION_POOL_SIZE', 10)
+                self._adapters[key] = adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=size)
+            return self._adapters[key]
+
+    def for_client(self, insecure=False, cacert=None):
+        """Returns a view of the registry for clients with the given TLS
+        settings, implementing the ``get(url)`` interface novaclient
+        expects from its ``connection_pool``.
+
+        Each call to ``get(url)`` returns a new adapter for the client's
+        own session, sending its requests through the shared pool. Closing
+        the session (which novaclient does whenever the endpoint changes)
+        leaves the shared pool open.
+        """
+        return _ClientConnectionPool(self, insecure, cacert)
+
+    def session(self, insecure=False, cacert=None):
+        """Returns a new ``requests`` session for clients with the given TLS
+        settings, sending its requests through the shared pools.
+
+        Closing the session leaves the shared pools open.
+        """
+        return _PooledSession(self, insecure, cacert)
+
+    def stats(self):
+        """Returns a list of dicts describing the usage of each pool.
+
+        ``connections`` is the number of connections opened so far,
+        ``requests`` the number of requests made through them and ``idle``
+        the number of connections currently kept open for reuse.
+        """
+        with self._lock:
+            items = sorted(self._adapters.items())
+        stats = []
+        for (endpoint, insecure, cacert), adapter in items:
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                stats.append({'endpoint': endpoint,
+                              'insecure': insecure,
+                              'cacert': cacert,
+                              'connections': pool.num_connections,
+                              'requests': pool.num_requests,
+                              'idle': pool.pool.qsize() if pool.pool else 0,
+                              'max_size': adapter._pool_maxsize})
+        return stats
+
+    def clear(self):
+        with self._lock:
+            adapters = self._adapters.values()
+            self._adapters = {}
+        for adapter in adapters:
+            adapter.close()
+
+
+class _ClientConnectionPool(object):
+    def __init__(self, registry, insecure, cacert):
+        self.registry = registry
+        self.insecure = insecure
+        self.cacert = cacert
+
+    def get(self, url):
+        return _SharedAdapter(self.registry.get_adapter(url, self.insecure,
+                                                        self.cacert))
+
+
+class _SharedAdapter(adapters.BaseAdapter):
+    """Transport adapter of a single session sending its requests through a
+    shared adapter, which it doesn't close.
+    """
+
+    def __init__(self, adapter):
+        super(_SharedAdapter, self).__init__()
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        return self.adapter.send(request, **kwargs)
+
+    def close(self):
+        # The shared adapter is only closed by ConnectionPoolRegistry.clear().
+        pass
+
+
+class _PooledSession(sessions.Session):
+    """Session getting the transport adapter for each URL from a
+    ConnectionPoolRegistry instead of mounting its own.
+    """
+
+    def __init__(self, registry, insecure, cacert):
+        super(_PooledSession, self).__init__()
+        # Don't keep the default adapters, so that close() doesn't close
+        # anything; the shared ones are only closed by the registry.
+        self.adapters.clear()
+        self.registry = registry
+        self.insecure = insecure
+        self.cacert = cacert
+
+    def get_adapter(self, url):
+        return self.registry.get_adapter(url, self.insecure, self.cacert)
+
+
+connection_pools = ConnectionPoolRegistry()
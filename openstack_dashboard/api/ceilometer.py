@@ -10,15 +10,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
 import logging
-import threading
 
 from ceilometerclient import client as ceilometer_client
+from ceilometerclient import exc as ceilometer_exc
+from ceilometerclient.v2 import meters as ceilometer_meters
 from django.conf import settings
 from django.utils import datastructures
+from django.utils import encoding
+from django.utils import translation
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon.utils import concurrency
 from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
@@ -27,6 +32,10 @@ from openstack_dashboard.api import nova
 
 LOG = logging.getLogger(__name__)
 
+# When more users (or tenants) than this have to be looked up, all of them
+# are listed with one request rather than fetched one at a time.
+BULK_LOOKUP_THRESHOLD = 20
+
 
 def get_flavor_names(request):
     # TODO(lsmola) The flavors can be set per project,
@@ -131,8 +140,8 @@ class Resource(base.APIResourceWrapper):
         # Meters with statistics data
         self._meters = {}
 
-        # TODO(lsmola) make parallel obtaining of tenant and user
-        # make the threading here, thread join into resource_list
+        # The users and tenants of a whole resource list are looked up at
+        # once by resource_list, these calls hit the cache.
         if ceilometer_usage and self.project_id:
             self._tenant = ceilometer_usage.get_tenant(self.project_id)
         else:
@@ -261,12 +270,24 @@ class Sample(base.APIResourceWrapper):
         return name or display_name or ""
 
 
+class IdentityName(object):
+    """The id and name of a Keystone user or tenant.
+
+    Used instead of the whole user or tenant when only its name has been
+    looked up.
+    """
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
 class Statistic(base.APIResourceWrapper):
     """Represents one Ceilometer statistic."""
 
     _attrs = ['period', 'period_start', 'period_end',
               'count', 'min', 'max', 'sum', 'avg',
-              'duration', 'duration_start', 'duration_end']
+              'duration', 'duration_start', 'duration_end', 'groupby']
 
 
 @memoized
@@ -281,16 +302,79 @@ def ceilometerclient(request):
     return ceilometer_client.Client('2', endpoint,
                                     token=(lambda: request.user.token.id),
                                     insecure=insecure,
-                                    ca_file=cacert)
+                                    ca_file=cacert,
+                                    timeout=getattr(settings,
+                                                    'CEILOMETER_API_TIMEOUT',
+                                                    60))
 
 
 def resource_list(request, query=None, ceilometer_usage_object=None):
-    """List the resources."""
+    """List the resources.
+
+    If ``ceilometer_usage_object`` is given, the users and tenants of all
+    the resources are looked up at once before the resources are wrapped.
+    """
     resources = ceilometerclient(request).\
         resources.list(q=query)
+    if ceilometer_usage_object:
+        ceilometer_usage_object.preload_users_and_tenants(
+            user_ids=[getattr(r, 'user_id', None) for r in resources],
+            tenant_ids=[getattr(r, 'project_id', None) for r in resources])
     return [Resource(r, ceilometer_usage_object) for r in resources]
 
 
+@base.shared_memoized(timeout=600)
+def user_name(request, user_id):
+    """Returns the name of a user, kept in the shared API cache."""
+    return keystone.user_get(request, user_id).name
+
+
+@base.shared_memoized(timeout=600)
+def user_names(request):
+    """Returns a dict mapping the ids of all users to their names."""
+    return dict((user.id, user.name) for user in keystone.user_list(request))
+
+
+@base.shared_memoized(timeout=600)
+def tenant_name(request, tenant_id):
+    """Returns the name of a tenant, kept in the shared API cache."""
+    return keystone.tenant_get(request, tenant_id).name
+
+
+@base.shared_memoized(timeout=600)
+def tenant_names(request):
+    """Returns a dict mapping the ids of all tenants to their names."""
+    tenants, more = keystone.tenant_list(request)
+    return dict((tenant.id, tenant.name) for tenant in tenants)
+
+
+def _lookup_names(request, ids, get_name, get_all_names):
+    """Returns a dict mapping the given ids to names.
+
+    Above ``BULK_LOOKUP_THRESHOLD`` ids all the names are listed at once by
+    ``get_all_names``, otherwise each name is fetched by ``get_name`` and
+    those calls are made concurrently. Ids whose name can't be retrieved are
+    left out.
+    """
+    if len(ids) > BULK_LOOKUP_THRESHOLD:
+        try:
+            names = get_all_names(request)
+            return dict((id, names[id]) for id in ids if id in names)
+        except Exception:
+            LOG.debug('Unable to list the names, looking them up one at a '
+                      'time.', exc_info=True)
+    futures = base.gather(*[functools.partial(get_name, request, id)
+                            for id in ids])
+    names = {}
+    for id, future in zip(ids, futures):
+        try:
+            names[id] = future.result()
+        except Exception:
+            LOG.debug('Unable to retrieve the name of %s.', id,
+                      exc_info=True)
+    return names
+
+
 def sample_list(request, meter_name, query=None):
     """List the samples for this meters."""
     samples = ceilometerclient(request).samples.list(meter_name=meter_name,
@@ -298,36 +382,58 @@ def sample_list(request, meter_name, query=None):
     return [Sample(s) for s in samples]
 
 
+def _meters_from_info(request, infos):
+    return [Meter(ceilometer_meters.Meter(None, info, loaded=True))
+            for info in infos]
+
+
+@base.shared_memoized(timeout=60,
+                      prepare=lambda meters: [m._apiresource._info
+                                              for m in meters],
+                      restore=_meters_from_info)
 def meter_list(request, query=None):
     """List the user's meters."""
     meters = ceilometerclient(request).meters.list(query)
     return [Meter(m) for m in meters]
 
 
-def statistic_list(request, meter_name, query=None, period=None):
-    """List of statistics."""
+def statistic_list(request, meter_name, query=None, period=None,
+                   groupby=None):
+    """List of statistics.
+
+    If ``groupby`` (a list of field names, e.g. ``['project_id']``) is
+    given, the statistics are computed separately for each group, whose
+    field values are in the ``groupby`` attribute of each statistic.
+    """
+    kwargs = {'groupby': groupby} if groupby else {}
     statistics = ceilometerclient(request).\
-        statistics.list(meter_name=meter_name, q=query, period=period)
+        statistics.list(meter_name=meter_name, q=query, period=period,
+                        **kwargs)
     return [Statistic(s) for s in statistics]
 
 
-class ThreadedUpdateResourceWithStatistics(threading.Thread):
+class ThreadedUpdateResourceWithStatistics(object):
     """Multithread wrapper for update_with_statistics method of
     resource_usage.
 
-    A join logic is placed in process_list class method. All resources
-    will have its statistics attribute filled in separate threads.
+    The statistics of each resource are fetched by a pool of at most
+    ``max_workers`` threads (``CEILOMETER_MAX_WORKERS`` by default), so a
+    report on thousands of resources doesn't start thousands of threads
+    and concurrent requests to the Ceilometer API.
+
+    The Ceilometer API returns the statistics of a single meter per request,
+    so the meters of one resource are fetched one after another by the same
+    thread. Each of these requests times out after
+    ``CEILOMETER_API_TIMEOUT`` seconds.
 
     The resource_usage object is shared between threads. Each thread is
-    updating one Resource.
+    updating one Resource at a time.
 
     :Parameters:
-      - `resource`: Resource or ResourceAggregate object, that will
-                    be filled by statistic data.
-      - `resources`: List of Resource or ResourceAggregate object,
-                     that will be filled by statistic data.
       - `resource_usage`: Wrapping resource usage object, that holds
                           all statistics data.
+      - `resources`: List of Resource or ResourceAggregate object,
+                     that will be filled by statistic data.
       - `meter_names`: List of meter names of the statistics we want.
       - `period`: In seconds. If no period is given, only one aggregate
                   statistic is returned. If given, a faceted result will be
@@ -338,44 +444,62 @@ class ThreadedUpdateResourceWithStatistics(threading.Thread):
                       statistic object is returned,
       - `additional_query`: Additional query for the statistics.
                             E.g. timespan, etc.
+      - `max_workers`: The maximum number of concurrent requests.
+      - `deadline`: In seconds. Resources whose statistics haven't been
+                    fetched by then are given up on (their meters are left
+                    empty). Defaults to ``CEILOMETER_STATISTICS_DEADLINE``,
+                    if set.
     """
     # TODO(lsmola) Can be removed once Ceilometer supports sample-api
     # and group-by, so all of this optimization will not be necessary.
     # It is planned somewhere to I.
 
-    def __init__(self, resource_usage, resource, meter_names=None,
-                 period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        super(ThreadedUpdateResourceWithStatistics, self).__init__()
-        self.resource_usage = resource_usage
-        self.resource = resource
-        self.meter_names = meter_names
-        self.period = period
-        self.stats_attr = stats_attr
-        self.additional_query = additional_query
-
-    def run(self):
-        # Run the job
-        self.resource_usage.update_with_statistics(self.resource,
-            meter_names=self.meter_names, period=self.period,
-            stats_attr=self.stats_attr, additional_query=self.additional_query)
+    @classmethod
+    def iter_list(cls, resource_usage, resources, meter_names=None,
+                  period=None, filter_func=None, stats_attr=None,
+                  additional_query=None, max_workers=None, deadline=None):
+        """Yields the resources as their statistics are filled in."""
+        if max_workers is None:
+            max_workers = getattr(settings, 'CEILOMETER_MAX_WORKERS', 10)
+        if deadline is None:
+            deadline = getattr(settings, 'CEILOMETER_STATISTICS_DEADLINE',
+                               None)
+        futures = concurrency.run_concurrently(
+            [functools.partial(resource_usage.update_with_statistics,
+                               resource, meter_names=meter_names,
+                               period=period, stats_attr=stats_attr,
+                               additional_query=additional_query)
+             for resource in resources],
+            max_workers=max_workers)
+        try:
+            for future in concurrency.as_completed(futures, timeout=deadline):
+                try:
+                    yield future.result()
+                except Exception:
+                    LOG.exception("Unable to retrieve the statistics of a "
+                                  "resource.")
+        except concurrency.TimeoutError:
+            LOG.warning("Giving up on the statistics of %d resources after "
+                        "%s seconds." % (len([f for f in futures
+                                              if not f.done()]), deadline))
+        finally:
+            # Don't start calls whose results nobody is waiting for.
+            for future in futures:
+                future.cancel()
 
     @classmethod
     def process_list(cls, resource_usage, resources, meter_names=None,
                  period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        threads = []
-
-        for resource in resources:
-            # add statistics data into resource
-            thread = cls(resource_usage, resource, meter_names=meter_names,
-                period=period, stats_attr=stats_attr,
-                additional_query=additional_query)
-            thread.start()
-            threads.append(thread)
-
-        for thread in threads:
-            thread.join()
+                 additional_query=None, max_workers=None, deadline=None):
+        """Fills in the statistics of the resources and returns those
+        which have been updated, in the order they were completed.
+        """
+        return list(cls.iter_list(resource_usage, resources,
+                                  meter_names=meter_names, period=period,
+                                  stats_attr=stats_attr,
+                                  additional_query=additional_query,
+                                  max_workers=max_workers,
+                                  deadline=deadline))
 
 
 class CeilometerUsage(object):
@@ -454,6 +578,36 @@ class CeilometerUsage(object):
         for t in tenants:
             self._tenants[t.id] = t
 
+    def preload_users_and_tenants(self, user_ids=None, tenant_ids=None):
+        """Looks up the given users and tenants at once.
+
+        Only the ids which aren't cached yet are looked up, the users and
+        the tenants concurrently. Depending on how many there are, either
+        all users (or tenants) are listed with one request or the missing
+        ones are fetched in parallel; see :func:`_lookup_names`. The names
+        are also kept in the shared API cache, as they rarely change.
+
+        Users and tenants which can't be retrieved are left to
+        :meth:`get_user` and :meth:`get_tenant`.
+        """
+        user_ids = list(set(id for id in user_ids or []
+                            if id and id not in self._users))
+        tenant_ids = list(set(id for id in tenant_ids or []
+                              if id and id not in self._tenants))
+        calls = []
+        if user_ids:
+            calls.append((self._users, functools.partial(
+                _lookup_names, self._request, user_ids, user_name,
+                user_names)))
+        if tenant_ids:
+            calls.append((self._tenants, functools.partial(
+                _lookup_names, self._request, tenant_ids, tenant_name,
+                tenant_names)))
+        futures = base.gather(*[call for cache, call in calls])
+        for (cache, call), future in zip(calls, futures):
+            for id, name in future.result().items():
+                cache[id] = IdentityName(id, name)
+
     def global_data_get(self, used_cls=None, query=None,
                         with_statistics=False, additional_query=None,
                         with_users_and_tenants=True):
@@ -569,29 +723,29 @@ class CeilometerUsage(object):
                                  " conditions. See the docs for format.")
             query = query + additional_query
 
-        # TODO(lsmola) thread for each meter will be probably overkill
-        # but I should test lets say thread pool with 100 of threads
-        # and apply it only to this code.
-        # Though I do expect Ceilometer will support bulk requests,
-        # so all of this optimization will not be necessary.
+        # TODO(lsmola) I do expect Ceilometer will support bulk requests,
+        # so the statistics of all the meters can be fetched at once.
         for meter in meter_names:
             statistics = statistic_list(self._request, meter,
                                         query=query, period=period)
-            meter = meter.replace(".", "_")
-            if statistics:
-                if stats_attr:
-                    # I want to load only a specific attribute
-                    resource.set_meter(
-                        meter,
-                        getattr(statistics[0], stats_attr, None))
-                else:
-                    # I want a dictionary of all statistics
-                    resource.set_meter(meter, statistics)
-            else:
-                resource.set_meter(meter, None)
+            self._set_statistics(resource, meter, statistics, stats_attr)
 
         return resource
 
+    @staticmethod
+    def _set_statistics(resource, meter, statistics, stats_attr=None):
+        meter = meter.replace(".", "_")
+        if statistics:
+            if stats_attr:
+                # I want to load only a specific attribute
+                resource.set_meter(meter,
+                                   getattr(statistics[0], stats_attr, None))
+            else:
+                # I want a dictionary of all statistics
+                resource.set_meter(meter, statistics)
+        else:
+            resource.set_meter(meter, None)
+
     def resources(self, query=None, filter_func=None,
                   with_users_and_tenants=False):
         """Obtaining resources with the query or filter_func.
@@ -701,6 +855,66 @@ class CeilometerUsage(object):
 
         return resource_aggregates
 
+    def project_aggregates_with_statistics(self, projects=None,
+            meter_names=None, period=None, stats_attr=None,
+            additional_query=None):
+        """Obtaining a resource aggregate with statistics data inside for
+        each of the given projects.
+
+        The statistics of all the projects are fetched with a single
+        ``groupby=project_id`` request per meter. If the Ceilometer API (or
+        its storage driver) doesn't support group-by, they are fetched with
+        a request per project and meter instead, like
+        :meth:`resource_aggregates_with_statistics` does.
+
+        :Parameters:
+          - `projects`: Dictionary mapping the identifiers of the resource
+                        aggregates to project ids.
+          - `meter_names`: List of meter names of which we want the
+                           statistics.
+          - `period`: In seconds. If no period is given, only one aggregate
+                      statistic is returned. If given, a faceted result will
+                      be returned, divided into given periods. Periods with
+                      no data are ignored.
+          - `stats_attr`: String representing the specific name of the stats.
+                          E.g. (avg, max, min...) If defined, meter attribute
+                          will contain just the one value. If None is given,
+                          meter attribute will contain the whole Statistic
+                          object.
+          - `additional_query`: Additional query for the statistics.
+                                E.g. timespan, etc.
+        """
+        queries = dict((identifier, make_query(tenant_id=project_id))
+                       for identifier, project_id in projects.items())
+        grouped = {}
+        try:
+            for meter in meter_names:
+                grouped[meter] = {}
+                for statistic in statistic_list(self._request, meter,
+                                                query=additional_query,
+                                                period=period,
+                                                groupby=['project_id']):
+                    groups = getattr(statistic, 'groupby', None) or {}
+                    project_id = groups.get('project_id')
+                    grouped[meter].setdefault(project_id,
+                                              []).append(statistic)
+        except (ceilometer_exc.HTTPBadRequest,
+                ceilometer_exc.HTTPNotImplemented):
+            LOG.info("The statistics can't be grouped by project, fetching "
+                     "them for each project separately.")
+            return self.resource_aggregates_with_statistics(
+                queries, meter_names, period=period, stats_attr=stats_attr,
+                additional_query=additional_query)
+
+        resource_aggregates = self.resource_aggregates(queries)
+        for aggregate in resource_aggregates:
+            project_id = projects[aggregate.id]
+            for meter in meter_names:
+                self._set_statistics(aggregate, meter,
+                                     grouped[meter].get(project_id),
+                                     stats_attr)
+        return resource_aggregates
+
 
 def diff_lists(a, b):
     if not a:
@@ -711,6 +925,10 @@ def diff_lists(a, b):
         return list(set(a) - set(b))
 
 
+# The static info of the meters for each language, see Meters._get_catalog.
+_METERS_CATALOGS = {}
+
+
 class Meters(object):
     """Class for listing of available meters
 
@@ -738,24 +956,26 @@ class Meters(object):
                                   _('Unable to retrieve Ceilometer meter'
                                     'list.'))
 
-        # Storing the meters info categorized by their services.
-        self._nova_meters_info = self._get_nova_meters_info()
-        self._neutron_meters_info = self._get_neutron_meters_info()
-        self._glance_meters_info = self._get_glance_meters_info()
-        self._cinder_meters_info = self._get_cinder_meters_info()
-        self._swift_meters_info = self._get_swift_meters_info()
-        self._kwapi_meters_info = self._get_kwapi_meters_info()
+        # The Ceilometer meters by name, the first one of each name is used.
+        self._ceilometer_meters = {}
+        for meter in self._ceilometer_meter_list:
+            self._ceilometer_meters.setdefault(meter.name, meter)
+
+        # Storing the meters info categorized by their services. Apart from
+        # the flavor based meters, it doesn't depend on the request.
+        catalog = self._get_catalog()
+        flavor_meters_info = self._get_flavor_meters_info(catalog['nova'])
+        self._nova_meters_info = datastructures.SortedDict(catalog['nova'])
+        self._nova_meters_info.update(flavor_meters_info)
+        self._neutron_meters_info = catalog['neutron']
+        self._glance_meters_info = catalog['glance']
+        self._cinder_meters_info = catalog['cinder']
+        self._swift_meters_info = catalog['swift']
+        self._kwapi_meters_info = catalog['kwapi']
 
         # Storing the meters info of all services together.
-        all_services_meters = (self._nova_meters_info,
-            self._neutron_meters_info, self._glance_meters_info,
-            self._cinder_meters_info, self._swift_meters_info,
-            self._kwapi_meters_info)
-        self._all_meters_info = {}
-        for service_meters in all_services_meters:
-            self._all_meters_info.update(dict([(meter_name, meter_info)
-                for meter_name,
-                    meter_info in service_meters.items()]))
+        self._all_meters_info = dict(catalog['all'])
+        self._all_meters_info.update(flavor_meters_info)
 
         # Here will be the cached Meter objects, that will be reused for
         # repeated listing.
@@ -878,10 +1098,9 @@ class Meters(object):
         """
         meter = self._cached_meters.get(meter_name, None)
         if not meter:
-            meter_candidates = [m for m in self._ceilometer_meter_list
-                                if m.name == meter_name]
+            meter = self._ceilometer_meters.get(meter_name, None)
 
-            if meter_candidates:
+            if meter:
                 meter_info = self._all_meters_info.get(meter_name, None)
                 if meter_info:
                     label = meter_info["label"]
@@ -889,14 +1108,61 @@ class Meters(object):
                 else:
                     label = ""
                     description = ""
-                meter = meter_candidates[0]
                 meter.augment(label=label, description=description)
 
                 self._cached_meters[meter_name] = meter
 
         return meter
 
-    def _get_nova_meters_info(self):
+    @classmethod
+    def _get_catalog(cls):
+        """Returns the static info of the meters of each service.
+
+        The info is built and translated the first time it's needed in
+        each language, then shared by all the Meters objects of the
+        process. The ``all`` key holds the info of all services together.
+        """
+        language = translation.get_language()
+        catalog = _METERS_CATALOGS.get(language, None)
+        if catalog is None:
+            catalog = {}
+            for service, get_info in (
+                    ('nova', cls._get_nova_meters_info),
+                    ('neutron', cls._get_neutron_meters_info),
+                    ('glance', cls._get_glance_meters_info),
+                    ('cinder', cls._get_cinder_meters_info),
+                    ('swift', cls._get_swift_meters_info),
+                    ('kwapi', cls._get_kwapi_meters_info)):
+                catalog[service] = datastructures.SortedDict(
+                    (meter_name, {
+                        'label': encoding.force_text(info['label']),
+                        'description': encoding.force_text(
+                            info['description']),
+                    }) for meter_name, info in get_info().items())
+            catalog['all'] = {}
+            for service_meters in catalog.values():
+                catalog['all'].update(service_meters)
+            # Building the same catalog concurrently is harmless.
+            _METERS_CATALOGS[language] = catalog
+        return catalog
+
+    def _get_flavor_meters_info(self, nova_meters_info):
+        """Returns additional info for the flavor based meters."""
+
+        # TODO(lsmola) this kind of meter will be probably deprecated
+        # https://bugs.launchpad.net/ceilometer/+bug/1208365 . Delete it then.
+        meters_info = datastructures.SortedDict()
+        for flavor in get_flavor_names(self._request):
+            name = 'instance:%s' % flavor
+            meters_info[name] = dict(nova_meters_info["instance:<type>"])
+
+            meters_info[name]['description'] = (
+                _('Duration of instance type %s (openstack flavor)') %
+                flavor)
+        return meters_info
+
+    @staticmethod
+    def _get_nova_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter.
@@ -978,22 +1244,12 @@ class Meters(object):
                                  "packets for a VM interface"),
             })
         ])
-        # Adding flavor based meters into meters_info dict
-        # TODO(lsmola) this kind of meter will be probably deprecated
-        # https://bugs.launchpad.net/ceilometer/+bug/1208365 . Delete it then.
-        for flavor in get_flavor_names(self._request):
-            name = 'instance:%s' % flavor
-            meters_info[name] = dict(meters_info["instance:<type>"])
-
-            meters_info[name]['description'] = (
-                _('Duration of instance type %s (openstack flavor)') %
-                flavor)
-
         # TODO(lsmola) allow to set specific in local_settings. For all meters
         # because users can have their own agents and meters.
         return meters_info
 
-    def _get_neutron_meters_info(self):
+    @staticmethod
+    def _get_neutron_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter
@@ -1066,7 +1322,8 @@ class Meters(object):
             }),
         ])
 
-    def _get_glance_meters_info(self):
+    @staticmethod
+    def _get_glance_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter
@@ -1107,7 +1364,8 @@ class Meters(object):
             }),
         ])
 
-    def _get_cinder_meters_info(self):
+    @staticmethod
+    def _get_cinder_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter
@@ -1128,7 +1386,8 @@ class Meters(object):
             }),
         ])
 
-    def _get_swift_meters_info(self):
+    @staticmethod
+    def _get_swift_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter
@@ -1165,7 +1424,8 @@ class Meters(object):
             }),
         ])
 
-    def _get_kwapi_meters_info(self):
+    @staticmethod
+    def _get_kwapi_meters_info():
         """Returns additional info for each meter
 
         That will be used for augmenting the Ceilometer meter
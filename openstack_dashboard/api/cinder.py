@@ -20,15 +20,20 @@
 
 from __future__ import absolute_import
 
+import functools
+import json
 import logging
 
 from django.conf import settings
 from django.utils.translation import pgettext_lazy
 from django.utils.translation import ugettext_lazy as _
 
+from cinderclient import client as cinder_client
+from cinderclient import exceptions as cinder_exceptions
 from cinderclient.v1.contrib import list_extensions as cinder_list_extensions
 
 from horizon import exceptions
+from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
@@ -136,6 +141,47 @@ class QosSpec(object):
         self.value = val
 
 
+class _PooledHTTPClient(cinder_client.HTTPClient):
+    """Cinder HTTP client sending its requests through the shared
+    connection pools (see ``base.connection_pools``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_PooledHTTPClient, self).__init__(*args, **kwargs)
+        self.session = base.connection_pools.session(
+            kwargs.get('insecure', False), kwargs.get('cacert'))
+
+    def request(self, url, method, **kwargs):
+        # Same as cinder_client.HTTPClient.request, which sends the request
+        # with requests.request() and so opens a new connection every time.
+        kwargs.setdefault('headers', kwargs.get('headers', {}))
+        kwargs['headers']['User-Agent'] = self.USER_AGENT
+        kwargs['headers']['Accept'] = 'application/json'
+        if 'body' in kwargs:
+            kwargs['headers']['Content-Type'] = 'application/json'
+            kwargs['data'] = json.dumps(kwargs['body'])
+            del kwargs['body']
+
+        if self.timeout:
+            kwargs.setdefault('timeout', self.timeout)
+        self.http_log_req((url, method,), kwargs)
+        resp = self.session.request(method, url, verify=self.verify_cert,
+                                    **kwargs)
+        self.http_log_resp(resp)
+
+        body = None
+        if resp.text:
+            try:
+                body = json.loads(resp.text)
+            except ValueError:
+                pass
+
+        if resp.status_code >= 400:
+            raise cinder_exceptions.from_response(resp, body)
+
+        return resp, body
+
+
 @memoized
 def cinderclient(request):
     api_version = VERSIONS.get_active_version()
@@ -169,6 +215,14 @@ def cinderclient(request):
                                      insecure=insecure,
                                      cacert=cacert,
                                      http_log_debug=settings.DEBUG)
+    c.client = _PooledHTTPClient(request.user.username,
+                                 request.user.token.id,
+                                 request.user.tenant_id,
+                                 auth_url=cinder_url,
+                                 insecure=insecure,
+                                 cacert=cacert,
+                                 service_type=c.client.service_type,
+                                 http_log_debug=settings.DEBUG)
     c.client.auth_token = request.user.token.id
     c.client.management_url = cinder_url
     return c
@@ -188,6 +242,20 @@ def version_get():
     return api_version['version']
 
 
+@base.request_memoized
+def tenant_absolute_limits(request):
+    limits = cinderclient(request).limits.get().absolute
+    limits_dict = {}
+    for limit in limits:
+        # -1 is used to represent unlimited quotas
+        if limit.value == -1:
+            limits_dict[limit.name] = float("inf")
+        else:
+            limits_dict[limit.name] = limit.value
+    return limits_dict
+
+
+@base.request_memoized
 def volume_list(request, search_opts=None):
     """To see all volumes in the cloud as an admin you can pass in a special
     search option: {'all_tenants': 1}
@@ -198,21 +266,127 @@ def volume_list(request, search_opts=None):
     return [Volume(v) for v in c_client.volumes.list(search_opts=search_opts)]
 
 
+def volume_list_paged(request, search_opts=None, marker=None, paginate=False,
+                      sort_dir="desc"):
+    """Returns a ``(volumes, has_more_data, has_prev_data)`` tuple.
+
+    When ``paginate`` is set only the page of volumes following ``marker``
+    is returned (the page before it when ``sort_dir`` is ``"asc"``, in
+    ascending order). The v2 API pages on the server; the v1 API doesn't
+    support paging, so the page is cut out of the full volume list instead.
+    """
+    if not paginate:
+        return volume_list(request, search_opts=search_opts), False, False
+    c_client = cinderclient(request)
+    if c_client is None:
+        return [], False, False
+    page_size = utils.get_page_size(request)
+    if VERSIONS.active < 2:
+        volumes = _page_of(volume_list(request, search_opts=search_opts),
+                           marker, page_size + 1, sort_dir)
+    else:
+        volumes = [Volume(v) for v in c_client.volumes.list(
+            search_opts=search_opts, marker=marker, limit=page_size + 1,
+            sort_key='created_at', sort_dir=sort_dir)]
+    return _update_pagination(volumes, page_size, marker, sort_dir)
+
+
+def _page_of(items, marker, limit, sort_dir):
+    # Cuts a page of at most ``limit`` items out of a full listing, which
+    # the API returns newest first, for APIs that can't page by themselves.
+    if sort_dir == 'asc':
+        items = items[::-1]
+    start = 0
+    if marker is not None:
+        for i, item in enumerate(items):
+            if item.id == marker:
+                start = i + 1
+                break
+    return items[start:start + limit]
+
+
+def _update_pagination(items, page_size, marker, sort_dir):
+    has_more_data = has_prev_data = False
+    # first and middle page condition
+    if len(items) > page_size:
+        items.pop(-1)
+        has_more_data = True
+        # middle page condition
+        if marker is not None:
+            has_prev_data = True
+    # first page condition when reached via prev back
+    elif sort_dir == 'asc' and marker is not None:
+        has_more_data = True
+    # last page condition
+    elif marker is not None:
+        has_prev_data = True
+    return items, has_more_data, has_prev_data
+
+
 def volume_get(request, volume_id):
-    volume_data = cinderclient(request).volumes.get(volume_id)
+    volume = Volume(cinderclient(request).volumes.get(volume_id))
+    volumes_update_attachment_names(request, [volume])
+    return volume
 
-    for attachment in volume_data.attachments:
-        if "server_id" in attachment:
-            instance = nova.server_get(request, attachment['server_id'])
-            attachment['instance_name'] = instance.name
-        else:
-            # Nova volume can occasionally send back error'd attachments
-            # the lack a server_id property; to work around that we'll
-            # give the attached instance a generic name.
-            attachment['instance_name'] = _("Unknown instance")
-    return Volume(volume_data)
+
+def _volume_get(request, volume_id):
+    return Volume(cinderclient(request).volumes.get(volume_id))
 
 
+def volumes_get(request, volume_ids):
+    """Returns a dict mapping the given volume ids to the volumes.
+
+    The volumes are retrieved concurrently and, unlike :func:`volume_get`,
+    without the names of their attachments. Volumes which can't be retrieved
+    are left out.
+    """
+    volume_ids = list(set(volume_ids))
+    futures = base.gather(*[functools.partial(_volume_get, request, id)
+                            for id in volume_ids])
+    volumes = {}
+    for volume_id, future in zip(volume_ids, futures):
+        try:
+            volumes[volume_id] = future.result()
+        except Exception:
+            LOG.debug('Unable to retrieve volume %s.', volume_id,
+                      exc_info=True)
+    return volumes
+
+
+def volumes_update_attachment_names(request, volumes):
+    """Sets the ``instance_name`` of the attachments of the given volumes.
+
+    The servers of all the attachments are looked up at once with
+    :func:`nova.server_names` rather than one ``server_get`` per
+    attachment. Attachments which already have a name are left alone.
+    Returns the ids of the servers which couldn't be retrieved.
+    """
+    attachments = [att for volume in volumes for att in volume.attachments
+                   if att and 'instance_name' not in att]
+    server_ids = set(att['server_id'] for att in attachments
+                     if "server_id" in att)
+    names = nova.server_names(request, server_ids)
+    for volume in volumes:
+        # The attachments are replaced rather than updated, as the volume
+        # may wrap a client object shared with other callers.
+        volume.attachments = [_name_attachment(att, names)
+                              for att in volume.attachments]
+    return server_ids.difference(names)
+
+
+def _name_attachment(attachment, names):
+    if not attachment or 'instance_name' in attachment:
+        return attachment
+    attachment = dict(attachment)
+    # Nova volume can occasionally send back error'd attachments
+    # the lack a server_id property; to work around that we'll
+    # give the attached instance a generic name.
+    attachment['instance_name'] = names.get(attachment.get('server_id'),
+                                            _("Unknown instance"))
+    return attachment
+
+
+@base.invalidates(volume_list, tenant_absolute_limits)
 def volume_create(request, size, name, description, volume_type,
                   snapshot_id=None, metadata=None, image_id=None,
                   availability_zone=None, source_volid=None):
@@ -230,14 +404,17 @@ def volume_create(request, size, name, description, volume_type,
     return Volume(volume)
 
 
+@base.invalidates(volume_list, tenant_absolute_limits)
 def volume_extend(request, volume_id, new_size):
     return cinderclient(request).volumes.extend(volume_id, new_size)
 
 
+@base.invalidates(volume_list, tenant_absolute_limits)
 def volume_delete(request, volume_id):
     return cinderclient(request).volumes.delete(volume_id)
 
 
+@base.invalidates(volume_list)
 def volume_retype(request, volume_id, new_type, migration_policy):
 
     if not retype_supported():
@@ -248,6 +425,7 @@ def volume_retype(request, volume_id, new_type, migration_policy):
                                                 migration_policy)
 
 
+@base.invalidates(volume_list)
 def volume_update(request, volume_id, name, description):
     vol_data = {'name': name,
                 'description': description}
@@ -256,10 +434,12 @@ def volume_update(request, volume_id, name, description):
                                                 **vol_data)
 
 
+@base.invalidates(volume_list)
 def volume_reset_state(request, volume_id, state):
     return cinderclient(request).volumes.reset_state(volume_id, state)
 
 
+@base.invalidates(volume_list)
 def volume_upload_to_image(request, volume_id, force, image_name,
                            container_format, disk_format):
     return cinderclient(request).volumes.upload_to_image(volume_id,
@@ -274,6 +454,7 @@ def volume_snapshot_get(request, snapshot_id):
     return VolumeSnapshot(snapshot)
 
 
+@base.request_memoized
 def volume_snapshot_list(request, search_opts=None):
     c_client = cinderclient(request)
     if c_client is None:
@@ -282,6 +463,23 @@ def volume_snapshot_list(request, search_opts=None):
         search_opts=search_opts)]
 
 
+def volume_snapshot_list_paged(request, search_opts=None, marker=None,
+                               paginate=False, sort_dir="desc"):
+    """Returns a ``(snapshots, has_more_data, has_prev_data)`` tuple.
+
+    The snapshots API can't page, so the page is cut out of the full
+    snapshot list; see :func:`volume_list_paged`.
+    """
+    snapshots = volume_snapshot_list(request, search_opts=search_opts)
+    if not paginate:
+        return snapshots, False, False
+    page_size = utils.get_page_size(request)
+    snapshots = _page_of(snapshots, marker, page_size + 1, sort_dir)
+    return _update_pagination(snapshots, page_size, marker, sort_dir)
+
+
+@base.invalidates(volume_snapshot_list, volume_list,
+                  tenant_absolute_limits)
 def volume_snapshot_create(request, volume_id, name,
                            description=None, force=False):
     data = {'name': name,
@@ -293,10 +491,12 @@ def volume_snapshot_create(request, volume_id, name,
         volume_id, **data))
 
 
+@base.invalidates(volume_snapshot_list, tenant_absolute_limits)
 def volume_snapshot_delete(request, snapshot_id):
     return cinderclient(request).volume_snapshots.delete(snapshot_id)
 
 
+@base.invalidates(volume_snapshot_list)
 def volume_snapshot_update(request, snapshot_id, name, description):
     snapshot_data = {'name': name,
                      'description': description}
@@ -305,6 +505,7 @@ def volume_snapshot_update(request, snapshot_id, name, description):
                                                          **snapshot_data)
 
 
+@base.invalidates(volume_snapshot_list)
 def volume_snapshot_reset_state(request, snapshot_id, state):
     return cinderclient(request).volume_snapshots.reset_state(
         snapshot_id, state)
@@ -327,6 +528,7 @@ def volume_backup_get(request, backup_id):
     return VolumeBackup(backup)
 
 
+@base.request_memoized
 def volume_backup_list(request):
     c_client = cinderclient(request)
     if c_client is None:
@@ -334,6 +536,22 @@ def volume_backup_list(request):
     return [VolumeBackup(b) for b in c_client.backups.list()]
 
 
+def volume_backup_list_paged(request, marker=None, paginate=False,
+                             sort_dir="desc"):
+    """Returns a ``(backups, has_more_data, has_prev_data)`` tuple.
+
+    The backups API can't page, so the page is cut out of the full backup
+    list; see :func:`volume_list_paged`.
+    """
+    backups = volume_backup_list(request)
+    if not paginate:
+        return backups, False, False
+    page_size = utils.get_page_size(request)
+    backups = _page_of(backups, marker, page_size + 1, sort_dir)
+    return _update_pagination(backups, page_size, marker, sort_dir)
+
+
+@base.invalidates(volume_backup_list, volume_list)
 def volume_backup_create(request,
                          volume_id,
                          container_name,
@@ -347,10 +565,13 @@ def volume_backup_create(request,
     return VolumeBackup(backup)
 
 
+@base.invalidates(volume_backup_list)
 def volume_backup_delete(request, backup_id):
     return cinderclient(request).backups.delete(backup_id)
 
 
+@base.invalidates(volume_backup_list, volume_list,
+                  tenant_absolute_limits)
 def volume_backup_restore(request, backup_id, volume_id):
     return cinderclient(request).restores.restore(backup_id=backup_id,
                                                   volume_id=volume_id)
@@ -363,6 +584,7 @@ def tenant_quota_get(request, tenant_id):
     return base.QuotaSet(c_client.quotas.get(tenant_id))
 
 
+@base.invalidates(tenant_absolute_limits)
 def tenant_quota_update(request, tenant_id, **kwargs):
     return cinderclient(request).quotas.update(tenant_id, **kwargs)
 
@@ -475,19 +697,6 @@ def qos_spec_get_associations(request, qos_spec_id):
     return cinderclient(request).qos_specs.get_associations(qos_spec_id)
 
 
-@memoized
-def tenant_absolute_limits(request):
-    limits = cinderclient(request).limits.get().absolute
-    limits_dict = {}
-    for limit in limits:
-        # -1 is used to represent unlimited quotas
-        if limit.value == -1:
-            limits_dict[limit.name] = float("inf")
-        else:
-            limits_dict[limit.name] = limit.value
-    return limits_dict
-
-
 def service_list(request):
     return cinderclient(request).services.list()
 
@@ -496,7 +705,14 @@ def availability_zone_list(request, detailed=False):
     return cinderclient(request).availability_zones.list(detailed=detailed)
 
 
-@memoized
+def _extensions_from_info(request, infos):
+    return [cinder_list_extensions.ListExtResource(None, info, loaded=True)
+            for info in infos]
+
+
+@base.shared_memoized(timeout=3600,
+                      prepare=lambda exts: [ext._info for ext in exts],
+                      restore=_extensions_from_info)
 def list_extensions(request):
     return cinder_list_extensions.ListExtManager(cinderclient(request))\
         .show_all()
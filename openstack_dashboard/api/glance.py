@@ -47,10 +47,6 @@ def glanceclient(request, version='1'):
                                 insecure=insecure, cacert=cacert)
 
 
-def image_delete(request, image_id):
-    return glanceclient(request).images.delete(image_id)
-
-
 def image_get(request, image_id):
     """Returns an Image object populated with metadata for image
     with supplied identifier.
@@ -61,6 +57,7 @@ def image_get(request, image_id):
     return image
 
 
+@base.request_memoized
 def image_list_detailed(request, marker=None, sort_dir='desc',
                         sort_key='created_at', filters=None, paginate=False):
     limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
@@ -102,10 +99,17 @@ def image_list_detailed(request, marker=None, sort_dir='desc',
     return (images, has_more_data, has_prev_data)
 
 
+@base.invalidates(image_list_detailed)
+def image_delete(request, image_id):
+    return glanceclient(request).images.delete(image_id)
+
+
+@base.invalidates(image_list_detailed)
 def image_update(request, image_id, **kwargs):
     return glanceclient(request).images.update(image_id, **kwargs)
 
 
+@base.invalidates(image_list_detailed)
 def image_create(request, **kwargs):
     copy_from = kwargs.pop('copy_from', None)
     data = kwargs.pop('data', None)
@@ -126,6 +130,7 @@ def image_create(request, **kwargs):
     return image
 
 
+@base.invalidates(image_list_detailed)
 def image_update_properties(request, image_id, remove_props=None, **kwargs):
     """Add or update a custom property of an image."""
     return glanceclient(request, '2').images.update(image_id,
@@ -133,6 +138,7 @@ def image_update_properties(request, image_id, remove_props=None, **kwargs):
                                                     **kwargs)
 
 
+@base.invalidates(image_list_detailed)
 def image_delete_properties(request, image_id, keys):
     """Delete custom properties for an image."""
     return glanceclient(request, '2').images.update(image_id, keys)
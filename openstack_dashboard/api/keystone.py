@@ -18,6 +18,7 @@
 #    under the License.
 
 import collections
+import functools
 import logging
 
 from django.conf import settings
@@ -296,6 +297,62 @@ def user_list(request, project=None, domain=None, group=None):
     return [VERSIONS.upgrade_v2_user(user) for user in users]
 
 
+def _get_many(request, get, ids):
+    # Fetches the objects with the given IDs concurrently, leaving out the
+    # ones which don't exist (anymore).
+    futures = base.gather(*[functools.partial(get, request, id)
+                            for id in ids])
+    objects = []
+    for future in futures:
+        try:
+            objects.append(future.result())
+        except keystone_exceptions.NotFound:
+            pass
+    return objects
+
+
+def _startswith(objects, prefix):
+    prefix = prefix.lower()
+    return sorted([obj for obj in objects
+                   if obj.name.lower().startswith(prefix)],
+                  key=lambda obj: obj.name.lower())
+
+
+def user_list_by_ids(request, user_ids):
+    """Returns the users with the given IDs, fetched concurrently."""
+    return _get_many(request, user_get, user_ids)
+
+
+_UserName = collections.namedtuple('_UserName', ('id', 'name'))
+
+
+@base.shared_memoized(timeout=60)
+def _user_names_v2(request):
+    return [_UserName(user.id, user.name) for user in user_list(request)]
+
+
+def user_search(request, prefix, domain=None):
+    """Returns the users whose names start with ``prefix``, ignoring case,
+    sorted by name.
+
+    With the v3 API the prefix is passed on to Keystone, so that only the
+    matching users are listed. The v2 API can't filter users by name, so all
+    of them are listed and only their ids and names are returned. That list
+    is kept in the shared API cache for a minute, so that searching as the
+    user types doesn't list all users for every keystroke. The list is
+    stored as a single cache entry, which memcached refuses when it's larger
+    than its item size limit (1 MB by default, or around 10,000 users), in
+    which case every search lists all users again.
+    """
+    if VERSIONS.active < 3:
+        users = _user_names_v2(request)
+    else:
+        manager = keystoneclient(request, admin=True).users
+        users = manager.list(domain=domain, name__istartswith=prefix)
+    return _startswith(users, prefix)
+
+
+@base.invalidates(_user_names_v2)
 def user_create(request, name=None, email=None, password=None, project=None,
                 enabled=None, domain=None):
     manager = keystoneclient(request, admin=True).users
@@ -307,6 +364,7 @@ def user_create(request, name=None, email=None, password=None, project=None,
                               project=project, enabled=enabled, domain=domain)
 
 
+@base.invalidates(_user_names_v2)
 def user_delete(request, user_id):
     return keystoneclient(request, admin=True).users.delete(user_id)
 
@@ -316,6 +374,7 @@ def user_get(request, user_id, admin=True):
     return VERSIONS.upgrade_v2_user(user)
 
 
+@base.invalidates(_user_names_v2)
 def user_update(request, user, **data):
     manager = keystoneclient(request, admin=True).users
     error = None
@@ -444,6 +503,21 @@ def group_list(request, domain=None, project=None, user=None):
     return groups
 
 
+def group_list_by_ids(request, group_ids):
+    """Returns the groups with the given IDs, fetched concurrently."""
+    return _get_many(request, group_get, group_ids)
+
+
+def group_search(request, prefix, domain=None):
+    """Returns the groups whose names start with ``prefix``, ignoring case,
+    sorted by name. The prefix is passed on to Keystone, so that only the
+    matching groups are listed.
+    """
+    manager = keystoneclient(request, admin=True).groups
+    return _startswith(manager.list(domain=domain, name__istartswith=prefix),
+                       prefix)
+
+
 def group_update(request, group_id, name=None, description=None):
     manager = keystoneclient(request, admin=True).groups
     return manager.update(group=group_id,
@@ -471,6 +545,25 @@ def role_assignments_list(request, project=None, user=None, role=None,
                         domain=domain, effective=effective)
 
 
+@base.request_memoized
+def get_project_members_roles(request, project):
+    """Returns the roles of the users and of the groups on a project, as
+    two dicts mapping the IDs of the users and groups to lists of role IDs.
+
+    Both are made from a single listing of the role assignments of the
+    project, which is kept for the rest of the request.
+    """
+    users_roles = collections.defaultdict(list)
+    groups_roles = collections.defaultdict(list)
+    for role_assignment in role_assignments_list(request, project=project):
+        role_id = role_assignment.role['id']
+        if hasattr(role_assignment, 'user'):
+            users_roles[role_assignment.user['id']].append(role_id)
+        elif hasattr(role_assignment, 'group'):
+            groups_roles[role_assignment.group['id']].append(role_id)
+    return users_roles, groups_roles
+
+
 def role_create(request, name):
     manager = keystoneclient(request, admin=True).roles
     return manager.create(name)
@@ -534,23 +627,25 @@ def get_project_users_roles(request, project):
     users_roles = collections.defaultdict(list)
     if VERSIONS.active < 3:
         project_users = user_list(request, project=project)
-
-        for user in project_users:
-            roles = roles_for_user(request, user.id, project)
-            roles_ids = [role.id for role in roles]
-            users_roles[user.id].extend(roles_ids)
+        # Keystone v2 can't list role assignments, so the roles of the users
+        # are retrieved concurrently.
+        futures = base.gather(*[
+            functools.partial(roles_for_user, request, user.id, project)
+            for user in project_users])
+        for user, future in zip(project_users, futures):
+            users_roles[user.id].extend(role.id for role in future.result())
     else:
-        project_role_assignments = role_assignments_list(request,
-                                                         project=project)
-        for role_assignment in project_role_assignments:
-            if not hasattr(role_assignment, 'user'):
-                continue
-            user_id = role_assignment.user['id']
-            role_id = role_assignment.role['id']
-            users_roles[user_id].append(role_id)
+        users_roles.update(get_project_members_roles(request, project)[0])
     return users_roles
 
 
+def get_project_groups_roles(request, project):
+    groups_roles = collections.defaultdict(list)
+    groups_roles.update(get_project_members_roles(request, project)[1])
+    return groups_roles
+
+
+@base.invalidates(get_project_members_roles)
 def add_tenant_user_role(request, project=None, user=None, role=None,
                          group=None, domain=None):
     """Adds a role for a user on a tenant."""
@@ -562,6 +657,7 @@ def add_tenant_user_role(request, project=None, user=None, role=None,
                              group=group, domain=domain)
 
 
+@base.invalidates(get_project_members_roles)
 def remove_tenant_user_role(request, project=None, user=None, role=None,
                             group=None, domain=None):
     """Removes a given single role for a user from a tenant."""
@@ -587,6 +683,7 @@ def roles_for_group(request, group, domain=None, project=None):
     return manager.list(group=group, domain=domain, project=project)
 
 
+@base.invalidates(get_project_members_roles)
 def add_group_role(request, role, group, domain=None, project=None):
     """Adds a role for a group on a domain or project."""
     manager = keystoneclient(request, admin=True).roles
@@ -594,6 +691,7 @@ def add_group_role(request, role, group, domain=None, project=None):
                          project=project)
 
 
+@base.invalidates(get_project_members_roles)
 def remove_group_role(request, role, group, domain=None, project=None):
     """Removes a given single role for a group from a domain or project."""
     manager = keystoneclient(request, admin=True).roles
@@ -159,7 +159,8 @@ def pool_list(request, **kwargs):
 
 
 def _pool_list(request, expand_subnet=False, expand_vip=False, **kwargs):
-    pools = neutronclient(request).list_pools(**kwargs).get('pools')
+    pools = neutron._list_by_ids(neutronclient(request).list_pools, 'pools',
+                                 **kwargs)
     if expand_subnet:
         subnets = neutron.subnet_list(request)
         subnet_dict = SortedDict((s.id, s) for s in subnets)
@@ -20,6 +20,7 @@
 from __future__ import absolute_import
 
 import collections
+import functools
 import logging
 
 import netaddr
@@ -27,7 +28,9 @@ import netaddr
 from django.conf import settings
 from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
+from neutronclient import client as neutron_http_client
 from neutronclient.v2_0 import client as neutron_client
+import six
 
 from horizon import messages
 from horizon.utils.memoized import memoized  # noqa
@@ -44,6 +47,12 @@ IP_VERSION_DICT = {4: 'IPv4', 6: 'IPv6'}
 OFF_STATE = 'OFF'
 ON_STATE = 'ON'
 
+# The IDs given as filters to the list calls are sent in the URL, whose
+# length is limited to 8192 characters by the Neutron client (and often to
+# less by the proxies in front of Neutron). Longer lists of IDs are split
+# into chunks so that all the filters take at most this many characters.
+ID_FILTER_MAX_LENGTH = 4000
+
 
 class NeutronAPIDictWrapper(base.APIDictWrapper):
 
@@ -219,8 +228,9 @@ class SecurityGroupManager(network_base.SecurityGroupManager):
         self.client = neutronclient(request)
 
     def _list(self, **filters):
-        secgroups = self.client.list_security_groups(**filters)
-        return [SecurityGroup(sg) for sg in secgroups.get('security_groups')]
+        secgroups = _list_by_ids(self.client.list_security_groups,
+                                 'security_groups', **filters)
+        return [SecurityGroup(sg) for sg in secgroups]
 
     def list(self):
         tenant_id = self.request.user.tenant_id
@@ -230,9 +240,9 @@ class SecurityGroupManager(network_base.SecurityGroupManager):
         """Create a mapping dict from secgroup id to its name."""
         related_ids = set([sg_id])
         related_ids |= set(filter(None, [r['remote_group_id'] for r in rules]))
-        related_sgs = self.client.list_security_groups(id=related_ids,
-                                                       fields=['id', 'name'])
-        related_sgs = related_sgs.get('security_groups')
+        related_sgs = _list_by_ids(self.client.list_security_groups,
+                                   'security_groups', id=related_ids,
+                                   fields=['id', 'name'])
         return dict((sg['id'], sg['name']) for sg in related_sgs)
 
     def get(self, sg_id):
@@ -353,22 +363,33 @@ class FloatingIpManager(network_base.FloatingIpManager):
             fip['instance_id'] = None
             fip['instance_type'] = None
 
-    def list(self, all_tenants=False, **search_opts):
+    def list(self, all_tenants=False, ports=None, **search_opts):
+        """Fetches a list of floating IPs.
+
+        ``ports`` can map the IDs of the ports the floating IPs may be
+        associated with to the ports, if the caller already has them.
+        The other ports are fetched, with only the attributes needed.
+        """
         if not all_tenants:
             tenant_id = self.request.user.tenant_id
             # In Neutron, list_floatingips returns Floating IPs from
             # all tenants when the API is called with admin role, so
             # we need to filter them with tenant_id.
             search_opts['tenant_id'] = tenant_id
-            port_search_opts = {'tenant_id': tenant_id}
-        else:
-            port_search_opts = {}
-        fips = self.client.list_floatingips(**search_opts)
-        fips = fips.get('floatingips')
-        # Get port list to add instance_id to floating IP list
+        fips = _list_by_ids(self.client.list_floatingips, 'floatingips',
+                            **search_opts)
+        # Get the associated ports to add instance_id to floating IP list
         # instance_id is stored in device_id attribute
-        ports = port_list(self.request, **port_search_opts)
-        port_dict = SortedDict([(p['id'], p) for p in ports])
+        port_dict = dict(ports or {})
+        port_ids = [fip['port_id'] for fip in fips
+                    if fip['port_id'] and fip['port_id'] not in port_dict]
+        if port_ids:
+            port_dict.update(
+                (p['id'], NeutronAPIDictWrapper(p))
+                for p in _list_by_ids(self.client.list_ports, 'ports',
+                                      id=port_ids,
+                                      fields=['id', 'device_id',
+                                              'device_owner']))
         for fip in fips:
             self._set_instance_info(fip, port_dict.get(fip['port_id']))
         return [FloatingIp(fip) for fip in fips]
@@ -403,9 +424,9 @@ class FloatingIpManager(network_base.FloatingIpManager):
 
     def list_targets(self):
         tenant_id = self.request.user.tenant_id
-        ports = port_list(self.request, tenant_id=tenant_id)
-        servers, has_more = nova.server_list(self.request)
-        server_dict = SortedDict([(s.id, s.name) for s in servers])
+        ports = port_iter(self.request, tenant_id=tenant_id)
+        server_dict = SortedDict([(s.id, s.name)
+                                  for s in nova.server_iter(self.request)])
         targets = []
         for p in ports:
             # Remove network ports from Floating IP targets
@@ -459,6 +480,28 @@ def get_ipver_str(ip_version):
     return IP_VERSION_DICT.get(ip_version, '')
 
 
+class _PooledHTTPClient(neutron_http_client.HTTPClient):
+    """Neutron HTTP client sending its requests through the shared
+    connection pools (see ``base.connection_pools``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_PooledHTTPClient, self).__init__(*args, **kwargs)
+        self.session = base.connection_pools.session(
+            kwargs.get('insecure', False), kwargs.get('ca_cert'))
+
+    def _request(self, url, method, body=None, headers=None, **kwargs):
+        # Same as neutron_http_client.HTTPClient._request, which sends the
+        # request with requests.request() and so opens a new connection
+        # every time.
+        headers = headers or {}
+        headers['User-Agent'] = self.USER_AGENT
+        resp = self.session.request(method, url, data=body, headers=headers,
+                                    verify=self.verify_cert,
+                                    timeout=self.timeout, **kwargs)
+        return resp, resp.text
+
+
 @memoized
 def neutronclient(request):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
@@ -467,16 +510,96 @@ def neutronclient(request):
               % (request.user.token.id, base.url_for(request, 'network')))
     LOG.debug('user_id=%(user)s, tenant_id=%(tenant)s' %
               {'user': request.user.id, 'tenant': request.user.tenant_id})
-    c = neutron_client.Client(token=request.user.token.id,
-                              auth_url=base.url_for(request, 'identity'),
-                              endpoint_url=base.url_for(request, 'network'),
-                              insecure=insecure, ca_cert=cacert)
+    kwargs = {'token': request.user.token.id,
+              'auth_url': base.url_for(request, 'identity'),
+              'endpoint_url': base.url_for(request, 'network'),
+              'insecure': insecure,
+              'ca_cert': cacert}
+    c = neutron_client.Client(**kwargs)
+    c.httpclient = _PooledHTTPClient(**kwargs)
     return c
 
 
+def _is_id_filter(name, value):
+    return ((name == 'id' or name.endswith('_id')) and
+            isinstance(value, (list, tuple, set, frozenset)))
+
+
+def _filter_length(name, value):
+    """Returns the number of characters taken by the ``name=<value>`` query
+    parameters of a filter in a URL.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(len(name) + len(six.text_type(v)) + 2 for v in value)
+    return len(name) + len(six.text_type(value)) + 2
+
+
+def _chunk_ids(name, ids, max_length=ID_FILTER_MAX_LENGTH):
+    """Splits ``ids`` into lists whose ``name=<id>`` query parameters take
+    at most ``max_length`` characters together, leaving out duplicates.
+    """
+    chunks = []
+    chunk = []
+    length = 0
+    for id in collections.OrderedDict.fromkeys(ids):
+        id_length = _filter_length(name, id)
+        if chunk and length + id_length > max_length:
+            chunks.append(chunk)
+            chunk = []
+            length = 0
+        chunk.append(id)
+        length += id_length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _list_by_ids(list_func, collection, **params):
+    """Returns the ``collection`` listed by ``list_func``, a list method of
+    the Neutron client, with the filters given as ``params``.
+
+    The filters given a list of IDs (e.g. ``device_id=[...]``) are sent
+    without duplicates. An empty list of IDs matches nothing, so no call is
+    made. If all the filters don't fit in one URL, the longest list of IDs
+    is split into chunks, which are listed concurrently with the other
+    filters, and the results are merged. Only one list of IDs can be split:
+    a ``ValueError`` is raised if the other filters take more than half of
+    the URL.
+    """
+    id_filters = [name for name, value in params.items()
+                  if _is_id_filter(name, value)]
+    if not id_filters:
+        return list_func(**params).get(collection)
+    for name in id_filters:
+        params[name] = list(collections.OrderedDict.fromkeys(params[name]))
+        if not params[name]:
+            return []
+    if sum(_filter_length(name, value)
+           for name, value in params.items()) <= ID_FILTER_MAX_LENGTH:
+        return list_func(**params).get(collection)
+
+    name = max(id_filters, key=lambda name: _filter_length(name,
+                                                           params[name]))
+    max_length = ID_FILTER_MAX_LENGTH - sum(
+        _filter_length(other, value) for other, value in params.items()
+        if other != name)
+    if max_length < ID_FILTER_MAX_LENGTH // 2:
+        raise ValueError("The filters other than %s are too long to list %s "
+                         "in chunks." % (name, collection))
+    futures = base.gather(*[functools.partial(list_func,
+                                              **dict(params, **{name: chunk}))
+                            for chunk in _chunk_ids(name, params[name],
+                                                    max_length)])
+    results = []
+    for future in futures:
+        results.extend(future.result().get(collection))
+    return results
+
+
 def network_list(request, **params):
     LOG.debug("network_list(): params=%s", params)
-    networks = neutronclient(request).list_networks(**params).get('networks')
+    networks = _list_by_ids(neutronclient(request).list_networks, 'networks',
+                            **params)
     # Get subnet list to expand subnet info in network list.
     subnets = subnet_list(request)
     subnet_dict = dict([(s['id'], s) for s in subnets])
@@ -556,7 +679,8 @@ def network_delete(request, network_id):
 
 def subnet_list(request, **params):
     LOG.debug("subnet_list(): params=%s" % (params))
-    subnets = neutronclient(request).list_subnets(**params).get('subnets')
+    subnets = _list_by_ids(neutronclient(request).list_subnets, 'subnets',
+                           **params)
     return [Subnet(s) for s in subnets]
 
 
@@ -605,10 +729,25 @@ def subnet_delete(request, subnet_id):
 
 def port_list(request, **params):
     LOG.debug("port_list(): params=%s" % (params))
-    ports = neutronclient(request).list_ports(**params).get('ports')
+    ports = _list_by_ids(neutronclient(request).list_ports, 'ports', **params)
     return [Port(p) for p in ports]
 
 
+def port_iter(request, **params):
+    """Yields all the ports matching ``params``.
+
+    When pagination is enabled in Neutron the ports are fetched
+    ``API_RESULT_LIMIT`` at a time, following the links to the next page
+    as they are consumed.
+    """
+    LOG.debug("port_iter(): params=%s" % (params))
+    params.setdefault('limit', getattr(settings, 'API_RESULT_LIMIT', 1000))
+    pages = neutronclient(request).list_ports(retrieve_all=False, **params)
+    for page in pages:
+        for p in page.get('ports'):
+            yield Port(p)
+
+
 def port_get(request, port_id, **params):
     LOG.debug("port_get(): portid=%s, params=%s" % (port_id, params))
     port = neutronclient(request).show_port(port_id, **params).get('port')
@@ -729,7 +868,8 @@ def router_get(request, router_id, **params):
 
 
 def router_list(request, **params):
-    routers = neutronclient(request).list_routers(**params).get('routers')
+    routers = _list_by_ids(neutronclient(request).list_routers, 'routers',
+                           **params)
     return [Router(r) for r in routers]
 
 
@@ -785,11 +925,50 @@ def list_dhcp_agent_hosting_networks(request, network, **params):
     return [Agent(a) for a in agents['agents']]
 
 
+def list_networks_on_dhcp_agent(request, dhcp_agent, **params):
+    networks = neutronclient(request).list_networks_on_dhcp_agent(dhcp_agent,
+                                                                  **params)
+    return [Network(n) for n in networks['networks']]
+
+
+def _dhcp_agents_info(agents_by_network):
+    return dict((network_id, [agent._apidict for agent in agents])
+                for network_id, agents in agents_by_network.items())
+
+
+def _dhcp_agents_from_info(request, info):
+    return dict((network_id, [Agent(agent) for agent in agents])
+                for network_id, agents in info.items())
+
+
+@base.shared_memoized(timeout=30, prepare=_dhcp_agents_info,
+                      restore=_dhcp_agents_from_info)
+def dhcp_agents_by_network(request):
+    """Returns the DHCP agents hosting each network, keyed by network ID.
+
+    There are usually far fewer DHCP agents than networks, so rather than
+    asking for the agents of each network this lists the DHCP agents once
+    and then the networks of each agent, concurrently. Networks which
+    aren't hosted by any agent are left out.
+    """
+    agents = agent_list(request, agent_type='DHCP agent')
+    futures = base.gather(*[functools.partial(list_networks_on_dhcp_agent,
+                                              request, agent.id)
+                            for agent in agents])
+    agents_by_network = collections.defaultdict(list)
+    for agent, future in zip(agents, futures):
+        for network in future.result():
+            agents_by_network[network.id].append(agent)
+    return dict(agents_by_network)
+
+
+@base.invalidates(dhcp_agents_by_network)
 def add_network_to_dhcp_agent(request, dhcp_agent, network_id):
     body = {'network_id': network_id}
     return neutronclient(request).add_network_to_dhcp_agent(dhcp_agent, body)
 
 
+@base.invalidates(dhcp_agents_by_network)
 def remove_network_from_dhcp_agent(request, dhcp_agent, network_id):
     return neutronclient(request).remove_network_from_dhcp_agent(dhcp_agent,
                                                                  network_id)
@@ -814,7 +993,9 @@ def servers_update_addresses(request, servers, all_tenants=False):
         fips = FloatingIpManager(request)
         if fips.is_supported():
             floating_ips = fips.list(all_tenants=all_tenants,
-                                     port_id=[port.id for port in ports])
+                                     port_id=[port.id for port in ports],
+                                     ports=dict((port.id, port)
+                                                for port in ports))
         else:
             floating_ips = []
         networks = network_list(request,
@@ -886,7 +1067,7 @@ def _server_get_addresses(request, server, ports, floating_ips, network_names):
     return dict(addresses)
 
 
-@memoized
+@base.shared_memoized(timeout=3600)
 def list_extensions(request):
     extensions_list = neutronclient(request).list_extensions()
     if 'extensions' in extensions_list:
@@ -895,7 +1076,7 @@ def list_extensions(request):
         return {}
 
 
-@memoized
+@base.shared_memoized(timeout=3600)
 def is_extension_supported(request, extension_alias):
     extensions = list_extensions(request)
 
@@ -20,6 +20,7 @@
 
 from __future__ import absolute_import
 
+import functools
 import logging
 
 from django.conf import settings
@@ -30,6 +31,7 @@ from novaclient import exceptions as nova_exceptions
 from novaclient.v1_1 import client as nova_client
 from novaclient.v1_1.contrib import instance_action as nova_instance_action
 from novaclient.v1_1.contrib import list_extensions as nova_list_extensions
+from novaclient.v1_1 import flavors as nova_flavors
 from novaclient.v1_1 import security_group_rules as nova_rules
 from novaclient.v1_1 import security_groups as nova_security_groups
 from novaclient.v1_1 import servers as nova_servers
@@ -427,7 +429,12 @@ def novaclient(request):
                            auth_url=base.url_for(request, 'compute'),
                            insecure=insecure,
                            cacert=cacert,
-                           http_log_debug=settings.DEBUG)
+                           http_log_debug=settings.DEBUG,
+                           connection_pool=True)
+    # Share the connections to the compute endpoint with other requests
+    # instead of the per-client pool novaclient creates.
+    c.client._connection_pool = base.connection_pools.for_client(insecure,
+                                                                 cacert)
     c.client.auth_token = request.user.token.id
     c.client.management_url = base.url_for(request, 'compute')
     return c
@@ -454,6 +461,7 @@ def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
                                                 flavorid=flavorid,
                                                 ephemeral=ephemeral,
                                                 swap=swap, is_public=is_public)
+    flavor_list.invalidate(request)
     if (metadata):
         flavor_extra_set(request, flavor.id, metadata)
     return flavor
@@ -461,13 +469,21 @@ def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
 
 def flavor_delete(request, flavor_id):
     novaclient(request).flavors.delete(flavor_id)
+    flavor_list.invalidate(request)
 
 
 def flavor_get(request, flavor_id):
     return novaclient(request).flavors.get(flavor_id)
 
 
-@memoized
+def _flavors_from_info(request, infos):
+    manager = novaclient(request).flavors
+    return [nova_flavors.Flavor(manager, info, loaded=True) for info in infos]
+
+
+@base.shared_memoized(timeout=600,
+                      prepare=lambda flavors: [f._info for f in flavors],
+                      restore=_flavors_from_info)
 def flavor_list(request, is_public=True):
     """Get the list of available instance sizes (flavors)."""
     return novaclient(request).flavors.list(is_public=is_public)
@@ -481,14 +497,18 @@ def flavor_access_list(request, flavor=None):
 
 def add_tenant_to_flavor(request, flavor, tenant):
     """Add a tenant to the given flavor access list."""
-    return novaclient(request).flavor_access.add_tenant_access(
+    access = novaclient(request).flavor_access.add_tenant_access(
         flavor=flavor, tenant=tenant)
+    flavor_list.invalidate(request)
+    return access
 
 
 def remove_tenant_from_flavor(request, flavor, tenant):
     """Remove a tenant from the given flavor access list."""
-    return novaclient(request).flavor_access.remove_tenant_access(
+    access = novaclient(request).flavor_access.remove_tenant_access(
         flavor=flavor, tenant=tenant)
+    flavor_list.invalidate(request)
+    return access
 
 
 def flavor_get_extras(request, flavor_id, raw=False):
@@ -558,6 +578,35 @@ def server_get(request, instance_id):
     return Server(novaclient(request).servers.get(instance_id), request)
 
 
+@base.shared_memoized(timeout=60)
+def server_name(request, instance_id):
+    """Returns the name of a server.
+
+    Names are kept in the shared API cache for a short time, so showing what
+    volumes are attached to doesn't cost a Nova round trip per attachment.
+    """
+    return server_get(request, instance_id).name
+
+
+def server_names(request, instance_ids):
+    """Returns a dict mapping the given server ids to the servers' names.
+
+    The names which aren't cached are looked up concurrently. Servers which
+    can't be retrieved are left out.
+    """
+    instance_ids = list(set(instance_ids))
+    futures = base.gather(*[functools.partial(server_name, request, id)
+                            for id in instance_ids])
+    names = {}
+    for instance_id, future in zip(instance_ids, futures):
+        try:
+            names[instance_id] = future.result()
+        except Exception:
+            LOG.debug('Unable to retrieve the name of server %s.',
+                      instance_id, exc_info=True)
+    return names
+
+
 def server_list(request, search_opts=None, all_tenants=False):
     page_size = utils.get_page_size(request)
     c = novaclient(request)
@@ -586,6 +635,33 @@ def server_list(request, search_opts=None, all_tenants=False):
     return (servers, has_more_data)
 
 
+def server_iter(request, search_opts=None, all_tenants=False):
+    """Yields all the servers matching ``search_opts``.
+
+    Unlike :func:`server_list`, which returns at most ``API_RESULT_LIMIT``
+    servers, this follows the markers to the end of the list, fetching
+    ``API_RESULT_LIMIT`` servers at a time as they are consumed.
+    """
+    limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
+    c = novaclient(request)
+    search_opts = dict(search_opts or {})
+    if all_tenants:
+        search_opts['all_tenants'] = True
+    else:
+        search_opts['project_id'] = request.user.tenant_id
+    marker = None
+    while True:
+        servers = c.servers.list(True, search_opts, marker=marker,
+                                 limit=limit)
+        # Nova may return fewer servers than asked for (its osapi_max_limit
+        # may be lower), so only an empty page marks the end of the list.
+        if not servers:
+            return
+        for server in servers:
+            yield Server(server, request)
+        marker = servers[-1].id
+
+
 def server_console_output(request, instance_id, tail_length=None):
     """Gets console output of an instance."""
     return novaclient(request).servers.get_console_output(instance_id,
@@ -621,6 +697,7 @@ def server_rebuild(request, instance_id, image_id, password=None,
                                                password, disk_config)
 
 
+@base.invalidates(server_name)
 def server_update(request, instance_id, name):
     return novaclient(request).servers.update(instance_id, name=name)
 
@@ -821,7 +898,14 @@ def remove_host_from_aggregate(request, aggregate_id, host):
     return novaclient(request).aggregates.remove_host(aggregate_id, host)
 
 
-@memoized
+def _extensions_from_info(request, infos):
+    return [nova_list_extensions.ListExtResource(None, info, loaded=True)
+            for info in infos]
+
+
+@base.shared_memoized(timeout=3600,
+                      prepare=lambda exts: [ext._info for ext in exts],
+                      restore=_extensions_from_info)
 def list_extensions(request):
     return nova_list_extensions.ListExtManager(novaclient(request)).show_all()
 
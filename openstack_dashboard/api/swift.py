@@ -16,8 +16,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import json
 import logging
+import sys
+import threading
 
+import six
 import six.moves.urllib.parse as urlparse
 import swiftclient
 
@@ -25,6 +30,7 @@ from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon.utils import concurrency
 from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
@@ -36,6 +42,9 @@ FOLDER_DELIMITER = "/"
 # Swift ACL
 GLOBAL_READ_ACL = ".r:*"
 LIST_CONTENTS_ACL = ".rlistings"
+# Segments of large objects are kept in this container, as the swift
+# command line client does.
+SEGMENTS_CONTAINER_SUFFIX = "_segments"
 
 
 class Container(base.APIDictWrapper):
@@ -105,8 +114,47 @@ def _metadata_to_header(metadata):
     return headers
 
 
-@memoized
-def swift_api(request):
+class _SegmentReader(object):
+    """A file-like view of ``length`` bytes of ``object_file`` starting at
+    ``offset``.
+
+    Several segments are read from the same file concurrently, so every read
+    seeks to its position while holding ``lock``.
+    """
+
+    def __init__(self, object_file, lock, offset, length):
+        self._file = object_file
+        self._lock = lock
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    def read(self, size=-1):
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size <= 0:
+            return ''
+        with self._lock:
+            self._file.seek(self._offset + self._position)
+            data = self._file.read(size)
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        return self._position
+
+    def seek(self, position):
+        self._position = position
+
+
+def swift_connection(request):
+    """Returns a new Swift connection.
+
+    Use :func:`swift_api` unless the connection is used outside of the
+    thread handling the request; connections can't be shared between
+    threads.
+    """
     endpoint = base.url_for(request, 'object-store')
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
@@ -122,6 +170,11 @@ def swift_api(request):
                                          auth_version="2.0")
 
 
+@memoized
+def swift_api(request):
+    return swift_connection(request)
+
+
 def swift_container_exists(request, container_name):
     try:
         swift_api(request).head_container(container_name)
@@ -276,18 +329,117 @@ def swift_copy_object(request, orig_container_name, orig_object_name,
                                          headers=headers)
 
 
+def _swift_upload_segments(request, container_name, object_name,
+                           object_file, headers, progress=None):
+    """Uploads ``object_file`` as a static large object.
+
+    The file is split into segments of ``SWIFT_SEGMENT_SIZE`` bytes, which
+    are uploaded to the segments container by up to
+    ``SWIFT_SEGMENT_UPLOAD_WORKERS`` threads, and a manifest listing them is
+    then written as ``object_name``. Each thread uploads its segments on its
+    own connection, which is closed at the end of the upload. If any
+    segment fails, the segments already uploaded are deleted and the error
+    is raised again.
+    """
+    size = object_file.size
+    segment_size = getattr(settings, 'SWIFT_SEGMENT_SIZE', 256 * 1024 * 1024)
+    max_workers = getattr(settings, 'SWIFT_SEGMENT_UPLOAD_WORKERS', 4)
+    segments_container = container_name + SEGMENTS_CONTAINER_SUFFIX
+    # The same naming scheme as the swift command line client, so that
+    # segments of different uploads of the same object never collide.
+    prefix = '%s/%s/%s/%s/' % (object_name,
+                               timeutils.strtime(),
+                               size,
+                               segment_size)
+    swift_api(request).put_container(segments_container)
+
+    lock = threading.Lock()
+    local = threading.local()
+    connections = []
+    uploaded = [0]
+
+    def upload_segment(index, offset):
+        if not hasattr(local, 'connection'):
+            local.connection = swift_connection(request)
+            with lock:
+                connections.append(local.connection)
+        length = min(segment_size, size - offset)
+        segment_name = '%s%08d' % (prefix, index)
+        etag = local.connection.put_object(
+            segments_container,
+            segment_name,
+            _SegmentReader(object_file, lock, offset, length),
+            content_length=length)
+        with lock:
+            uploaded[0] += length
+            if progress:
+                progress(uploaded[0], size)
+        return {'path': '/%s/%s' % (segments_container, segment_name),
+                'etag': etag,
+                'size_bytes': length}
+
+    futures = concurrency.run_concurrently(
+        [functools.partial(upload_segment, index, offset)
+         for index, offset in enumerate(six.moves.range(0, size,
+                                                        segment_size))],
+        max_workers=max_workers)
+    try:
+        segments = [future.result() for future in futures]
+    except Exception:
+        exc_info = sys.exc_info()
+        for future in futures:
+            future.cancel()
+        for future in futures:
+            try:
+                segment = future.result()
+            except Exception:
+                continue
+            try:
+                swift_api(request).delete_object(
+                    segments_container,
+                    segment['path'].split('/', 2)[2])
+            except Exception:
+                LOG.warning('Unable to delete segment %s of a failed upload.'
+                            % segment['path'])
+        six.reraise(*exc_info)
+    finally:
+        for connection in connections:
+            connection.close()
+
+    return swift_api(request).put_object(container_name,
+                                         object_name,
+                                         json.dumps(segments),
+                                         headers=headers,
+                                         query_string='multipart-manifest=put')
+
+
 def swift_upload_object(request, container_name, object_name,
-                        object_file=None):
+                        object_file=None, progress=None):
+    """Uploads ``object_file`` as ``object_name``.
+
+    Files larger than ``SWIFT_SEGMENT_THRESHOLD`` bytes are uploaded in
+    segments as a static large object, which also lifts Swift's limit on the
+    size of a single object. ``progress``, if given, is called with the
+    number of bytes uploaded so far and the size of the file as each
+    segment is uploaded.
+    """
     headers = {}
     size = 0
     if object_file:
         headers['X-Object-Meta-Orig-Filename'] = object_file.name
         size = object_file.size
 
-    etag = swift_api(request).put_object(container_name,
-                                         object_name,
-                                         object_file,
-                                         headers=headers)
+    threshold = getattr(settings, 'SWIFT_SEGMENT_THRESHOLD', 1024 ** 3)
+    if object_file and size > threshold:
+        etag = _swift_upload_segments(request, container_name, object_name,
+                                      object_file, headers, progress)
+    else:
+        etag = swift_api(request).put_object(container_name,
+                                             object_name,
+                                             object_file,
+                                             headers=headers)
+        if progress and size:
+            progress(size, size)
 
     obj_info = {'name': object_name, 'bytes': size, 'etag': etag}
     return StorageObject(obj_info, container_name)
@@ -312,10 +464,26 @@ def swift_delete_object(request, container_name, object_name):
     return True
 
 
-def swift_get_object(request, container_name, object_name, with_data=True):
+def swift_get_object(request, container_name, object_name, with_data=True,
+                     resp_chunk_size=None, byte_range=None):
+    """Returns the given object, with its contents if ``with_data`` is set.
+
+    When ``resp_chunk_size`` is given, the ``data`` of the object is an
+    iterator over the contents, which are read ``resp_chunk_size`` bytes
+    at a time as it's consumed, instead of a string holding all of them.
+    ``byte_range`` is the value of an HTTP ``Range`` header (e.g.
+    ``bytes=0-99``) restricting the contents to the given range, in which
+    case ``content_range`` describes the range returned.
+    """
     if with_data:
+        kwargs = {}
+        if resp_chunk_size:
+            kwargs['resp_chunk_size'] = resp_chunk_size
+        if byte_range:
+            kwargs['headers'] = {'Range': byte_range}
         headers, data = swift_api(request).get_object(container_name,
-                                                      object_name)
+                                                      object_name,
+                                                      **kwargs)
     else:
         data = None
         headers = swift_api(request).head_object(container_name,
@@ -333,6 +501,7 @@ def swift_get_object(request, container_name, object_name, with_data=True):
         'content_type': headers.get('content-type'),
         'etag': headers.get('etag'),
         'timestamp': timestamp,
+        'content_range': headers.get('content-range'),
     }
     return StorageObject(obj_info,
                          container_name,
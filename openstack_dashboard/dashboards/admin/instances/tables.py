@@ -70,6 +70,11 @@ class AdminUpdateRow(project_tables.UpdateRow):
         instance.tenant_name = getattr(tenant, "name", None)
         return instance
 
+    def get_data_many(self, request, instance_ids):
+        # Each row also needs the name of the instance's project, which
+        # get_data looks up.
+        return tables.Row.get_data_many(self, request, instance_ids)
+
 
 class AdminInstanceFilterAction(tables.FilterAction):
     # Change default name of 'filter' to distinguish this one from the
@@ -12,6 +12,8 @@
 import json
 import uuid
 
+from ceilometerclient import exc as ceilometer_exc
+from ceilometerclient.v2 import statistics as ceilometer_statistics
 from django.core.urlresolvers import reverse
 from django import http
 from mox import IsA  # noqa
@@ -61,9 +63,16 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
         self.assertEqual(data.get('settings'), {})
 
+    def _project_statistics(self):
+        statistic = self.statistics.first()
+        return [ceilometer_statistics.Statistics(
+                ceilometer_statistics.StatisticsManager(None),
+                dict(statistic._info, groupby={'project_id': tenant.id}))
+                for tenant in self.tenants.list()]
+
     @test.create_stubs({api.keystone: ('tenant_list',)})
     def test_stats_for_line_chart(self):
-        statistics = self.statistics.list()
+        statistics = self._project_statistics()
 
         api.keystone.tenant_list(IsA(http.HttpRequest),
                                  domain=None,
@@ -72,10 +81,10 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.statistics = self.mox.CreateMockAnything()
-        # check that list is called twice for one resource and 2 meters
+        # the statistics of all the projects are fetched at once
         ceilometerclient.statistics.list(meter_name="memory",
-                                         period=IsA(int), q=IsA(list)).\
-            MultipleTimes().\
+                                         period=IsA(int), q=IsA(list),
+                                         groupby=['project_id']).\
             AndReturn(statistics)
 
         self.mox.ReplayAll()
@@ -94,7 +103,7 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
     @test.create_stubs({api.keystone: ('tenant_list',)})
     def test_stats_for_line_chart_attr_max(self):
-        statistics = self.statistics.list()
+        statistics = self._project_statistics()
 
         api.keystone.tenant_list(IsA(http.HttpRequest),
                                  domain=None,
@@ -103,10 +112,10 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.statistics = self.mox.CreateMockAnything()
-        # check that list is called twice for one resource and 2 meters
+        # the statistics of all the projects are fetched at once
         ceilometerclient.statistics.list(meter_name="memory",
-                                         period=IsA(int), q=IsA(list)).\
-            MultipleTimes().\
+                                         period=IsA(int), q=IsA(list),
+                                         groupby=['project_id']).\
             AndReturn(statistics)
 
         self.mox.ReplayAll()
@@ -123,6 +132,68 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
         self._verify_series(res._container[0], 9.0, '2012-12-21T11:00:55',
                             expected_names)
 
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_stats_for_line_chart_group_by_not_supported(self):
+        statistics = self.statistics.list()
+
+        api.keystone.tenant_list(IsA(http.HttpRequest),
+                                 domain=None,
+                                 paginate=False) \
+            .AndReturn([self.tenants.list(), False])
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        ceilometerclient.statistics.list(meter_name="memory",
+                                         period=IsA(int), q=IsA(list),
+                                         groupby=['project_id']).\
+            AndRaise(ceilometer_exc.HTTPBadRequest())
+        # fall back to one call per project
+        ceilometerclient.statistics.list(meter_name="memory",
+                                         period=IsA(int), q=IsA(list)).\
+            MultipleTimes().\
+            AndReturn(statistics)
+
+        self.mox.ReplayAll()
+
+        res = self.client.get(reverse('horizon:admin:metering:samples') +
+            "?meter=memory&group_by=project&stats_attr=avg&date_options=7")
+
+        expected_names = ['test_tenant',
+                          'disabled_tenant',
+                          u'\u4e91\u89c4\u5219']
+        self._verify_series(res._container[0], 4.55, '2012-12-21T11:00:55',
+                            expected_names)
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_stats_for_line_chart_cached(self):
+        statistics = self._project_statistics()
+
+        api.keystone.tenant_list(IsA(http.HttpRequest),
+                                 domain=None,
+                                 paginate=False) \
+            .AndReturn([self.tenants.list(), False])
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        ceilometerclient.statistics.list(meter_name="memory",
+                                         period=IsA(int), q=IsA(list),
+                                         groupby=['project_id']).\
+            AndReturn(statistics)
+
+        self.mox.ReplayAll()
+
+        # the second request for the same window uses the cached statistics
+        url = (reverse('horizon:admin:metering:samples') +
+               "?meter=memory&group_by=project&stats_attr=avg&date_options=7")
+        self.client.get(url)
+        res = self.client.get(url)
+
+        expected_names = ['test_tenant',
+                          'disabled_tenant',
+                          u'\u4e91\u89c4\u5219']
+        self._verify_series(res._container[0], 4.55, '2012-12-21T11:00:55',
+                            expected_names)
+
     def test_stats_for_line_chart_no_group_by(self):
         resources = self.resources.list()
         statistics = self.statistics.list()
@@ -164,22 +235,17 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
             MultipleTimes()\
             .AndReturn([self.tenants.list(), False])
 
-        statistics = self.statistics.list()
+        statistics = self._project_statistics()
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.statistics = self.mox.CreateMockAnything()
 
-        ceilometerclient.statistics.list(meter_name="instance",
-                                         period=IsA(int), q=IsA(list)).\
-            MultipleTimes().\
-            AndReturn(statistics)
-        ceilometerclient.statistics.list(meter_name="disk.read.bytes",
-                                         period=IsA(int), q=IsA(list)).\
-            MultipleTimes().\
-            AndReturn(statistics)
-        ceilometerclient.statistics.list(meter_name="disk.write.bytes",
-                                         period=IsA(int), q=IsA(list)).\
-            MultipleTimes().\
-            AndReturn(statistics)
+        # one call per meter
+        for meter in ("instance", "disk.read.bytes", "disk.write.bytes"):
+            ceilometerclient.statistics.list(meter_name=meter,
+                                             period=IsA(int), q=IsA(list),
+                                             groupby=['project_id']).\
+                InAnyOrder().\
+                AndReturn(statistics)
 
         self.mox.ReplayAll()
 
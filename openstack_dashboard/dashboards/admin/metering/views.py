@@ -15,6 +15,7 @@ from datetime import timedelta  # noqa
 
 import json
 
+from ceilometerclient.v2 import statistics as ceilometer_statistics
 from django.core.urlresolvers import reverse
 from django.http import HttpResponse   # noqa
 from django.utils.datastructures import SortedDict
@@ -220,14 +221,8 @@ def _calc_date_args(date_from, date_to, date_options):
     return date_from, date_to
 
 
-def query_data(request,
-               date_from,
-               date_to,
-               date_options,
-               group_by,
-               meter,
-               period=None,
-               additional_query=None):
+def _calc_query_args(date_from, date_to, date_options, period=None,
+                     additional_query=None):
     date_from, date_to = _calc_date_args(date_from,
                                          date_to,
                                          date_options)
@@ -243,7 +238,64 @@ def query_data(request,
         additional_query += [{'field': 'timestamp',
                               'op': 'le',
                               'value': date_to}]
+    return period, additional_query
+
+
+def _project_statistics_info(aggregates):
+    # The statistics are cached as plain data, see project_statistics.
+    return [(aggregate.id,
+             dict((meter, [s._apiresource._info for s in statistics]
+                   if statistics else None)
+                  for meter, statistics in aggregate.meters.items()))
+            for aggregate in aggregates]
+
+
+def _project_statistics_from_info(request, info):
+    aggregates = []
+    for identifier, meters in info:
+        aggregate = ceilometer.ResourceAggregate(identifier=identifier)
+        for meter, statistics in meters.items():
+            if statistics is not None:
+                statistics = [ceilometer.Statistic(
+                    ceilometer_statistics.Statistics(None, s, loaded=True))
+                    for s in statistics]
+            aggregate.set_meter(meter, statistics)
+        aggregates.append(aggregate)
+    return aggregates
+
+
+@api.base.shared_memoized(timeout=300,
+                          prepare=_project_statistics_info,
+                          restore=_project_statistics_from_info)
+def project_statistics(request, meter, date_from, date_to, date_options,
+                       period=None, additional_query=None):
+    """Returns a resource aggregate with the statistics of ``meter`` for
+    each project, identified by the project's name.
+
+    The results are cached by the requested window (rather than the
+    timestamps it works out to), so e.g. the usage report and its CSV
+    export share them.
+    """
+    period, additional_query = _calc_query_args(date_from, date_to,
+                                                date_options, period,
+                                                additional_query)
+    tenants, more = api.keystone.tenant_list(request,
+                                             domain=None,
+                                             paginate=False)
+    ceilometer_usage = ceilometer.CeilometerUsage(request)
+    return ceilometer_usage.project_aggregates_with_statistics(
+        dict((tenant.name, tenant.id) for tenant in tenants), [meter],
+        period=period, stats_attr=None, additional_query=additional_query)
+
 
+def query_data(request,
+               date_from,
+               date_to,
+               date_options,
+               group_by,
+               meter,
+               period=None,
+               additional_query=None):
     # TODO(lsmola) replace this by logic implemented in I1 in bugs
     # 1226479 and 1226482, this is just a quick fix for RC1
     try:
@@ -254,29 +306,19 @@ def query_data(request,
         unit = ""
     if group_by == "project":
         try:
-            tenants, more = api.keystone.tenant_list(
-                request,
-                domain=None,
-                paginate=False)
+            resources = project_statistics(request, meter, date_from,
+                                           date_to, date_options,
+                                           period=period,
+                                           additional_query=additional_query)
         except Exception:
-            tenants = []
+            resources = []
             exceptions.handle(request,
-                              _('Unable to retrieve project list.'))
-        queries = {}
-        for tenant in tenants:
-            tenant_query = [{
-                            "field": "project_id",
-                            "op": "eq",
-                            "value": tenant.id}]
-
-            queries[tenant.name] = tenant_query
-
-        ceilometer_usage = ceilometer.CeilometerUsage(request)
-        resources = ceilometer_usage.resource_aggregates_with_statistics(
-            queries, [meter], period=period, stats_attr=None,
-            additional_query=additional_query)
+                              _('Unable to retrieve statistics.'))
 
     else:
+        period, additional_query = _calc_query_args(date_from, date_to,
+                                                    date_options, period,
+                                                    additional_query)
         query = []
 
         def filter_by_meter_name(resource):
@@ -314,16 +356,17 @@ def load_report_data(request):
         _('Swift_meters'): meters.list_swift(),
         _('Kwapi'): meters.list_kwapi(),
     }
+    # The service of each meter, by meter name.
+    meter_services = {}
+    for name, m_list in services.items():
+        for meter in m_list:
+            meter_services.setdefault(meter.name, name)
     project_rows = {}
     date_options = request.GET.get('date_options', 7)
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     for meter in meters._cached_meters.values():
-        service = None
-        for name, m_list in services.items():
-            if meter in m_list:
-                service = name
-                break
+        service = meter_services.get(meter.name)
         # show detailed samples
         # samples = ceilometer.sample_list(request, meter.name)
         res, unit = query_data(request,
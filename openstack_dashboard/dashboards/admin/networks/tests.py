@@ -29,7 +29,7 @@ INDEX_URL = reverse('horizon:admin:networks:index')
 
 class NetworkTests(test.BaseAdminViewTests):
     @test.create_stubs({api.neutron: ('network_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_index(self):
@@ -38,15 +38,11 @@ class NetworkTests(test.BaseAdminViewTests):
             .AndReturn(self.networks.list())
         api.keystone.tenant_list(IsA(http.HttpRequest))\
             .AndReturn([tenants, False])
-        for network in self.networks.list():
-            api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                         network.id)\
-                .AndReturn(self.agents.list())
-            api.neutron.is_extension_supported(IsA(http.HttpRequest),
-                    'dhcp_agent_scheduler').AndReturn(True)
-
+        network = self.networks.first()
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest))\
+            .AndReturn({network.id: self.agents.list()})
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
-                'dhcp_agent_scheduler').AndReturn(True)
+                'dhcp_agent_scheduler').MultipleTimes().AndReturn(True)
         self.mox.ReplayAll()
 
         res = self.client.get(INDEX_URL)
@@ -54,6 +50,32 @@ class NetworkTests(test.BaseAdminViewTests):
         self.assertTemplateUsed(res, 'admin/networks/index.html')
         networks = res.context['networks_table'].data
         self.assertItemsEqual(networks, self.networks.list())
+        agents = dict((n.id, n.num_agents) for n in networks)
+        self.assertEqual(len(self.agents.list()), agents.pop(network.id))
+        self.assertEqual(set([0]), set(agents.values()))
+
+    @test.create_stubs({api.neutron: ('network_list',
+                                      'dhcp_agents_by_network',
+                                      'is_extension_supported'),
+                        api.keystone: ('tenant_list',)})
+    def test_index_dhcp_agents_exception(self):
+        api.neutron.network_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.networks.list())
+        api.keystone.tenant_list(IsA(http.HttpRequest))\
+            .AndReturn([self.tenants.list(), False])
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest))\
+            .AndRaise(self.exceptions.neutron)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                'dhcp_agent_scheduler').MultipleTimes().AndReturn(True)
+        self.mox.ReplayAll()
+
+        res = self.client.get(INDEX_URL)
+
+        self.assertTemplateUsed(res, 'admin/networks/index.html')
+        networks = res.context['networks_table'].data
+        self.assertEqual(set(["Unknown"]),
+                         set(n.num_agents for n in networks))
+        self.assertMessageCount(res, error=1)
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'is_extension_supported',)})
@@ -74,7 +96,7 @@ class NetworkTests(test.BaseAdminViewTests):
     @test.create_stubs({api.neutron: ('network_get',
                                       'subnet_list',
                                       'port_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported')})
     def test_network_detail(self):
         self._test_network_detail()
@@ -83,15 +105,14 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_with_mac_learning(self):
         self._test_network_detail(mac_learning=True)
 
     def _test_network_detail(self, mac_learning=False):
         network_id = self.networks.first().id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.network_get(IsA(http.HttpRequest), network_id)\
             .AndReturn(self.networks.first())
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
@@ -119,7 +140,7 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_network_exception(self):
         self._test_network_detail_network_exception()
 
@@ -127,7 +148,7 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_network_exception_with_mac_learning(self):
         self._test_network_detail_network_exception(mac_learning=True)
 
@@ -139,9 +160,8 @@ class NetworkTests(test.BaseAdminViewTests):
             .AndReturn([self.subnets.first()])
         api.neutron.port_list(IsA(http.HttpRequest), network_id=network_id)\
             .AndReturn([self.ports.first()])
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
                                            'mac-learning')\
             .AndReturn(mac_learning)
@@ -157,7 +177,7 @@ class NetworkTests(test.BaseAdminViewTests):
     @test.create_stubs({api.neutron: ('network_get',
                                       'subnet_list',
                                       'port_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported')})
     def test_network_detail_subnet_exception(self):
         self._test_network_detail_subnet_exception()
@@ -166,15 +186,14 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_subnet_exception_with_mac_learning(self):
         self._test_network_detail_subnet_exception(mac_learning=True)
 
     def _test_network_detail_subnet_exception(self, mac_learning=False):
         network_id = self.networks.first().id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.network_get(IsA(http.HttpRequest), network_id).\
             AndReturn(self.networks.first())
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id).\
@@ -202,7 +221,7 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_port_exception(self):
         self._test_network_detail_port_exception()
 
@@ -210,15 +229,14 @@ class NetworkTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_network_detail_port_exception_with_mac_learning(self):
         self._test_network_detail_port_exception(mac_learning=True)
 
     def _test_network_detail_port_exception(self, mac_learning=False):
         network_id = self.networks.first().id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.network_get(IsA(http.HttpRequest), network_id).\
             AndReturn(self.networks.first())
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id).\
@@ -575,15 +593,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network.id: self.agents.list()})
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
                 'dhcp_agent_scheduler').AndReturn(True)
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
@@ -603,15 +620,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network_exception(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network.id: self.agents.list()})
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
                 'dhcp_agent_scheduler').AndReturn(True)
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
@@ -850,7 +866,7 @@ class NetworkSubnetTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_subnet_delete(self):
         self._test_subnet_delete()
 
@@ -858,16 +874,15 @@ class NetworkSubnetTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_subnet_delete_with_mac_learning(self):
         self._test_subnet_delete(mac_learning=True)
 
     def _test_subnet_delete(self, mac_learning=False):
         subnet = self.subnets.first()
         network_id = subnet.network_id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet.id)
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
             .AndReturn([self.subnets.first()])
@@ -889,7 +904,7 @@ class NetworkSubnetTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_subnet_delete_exception(self):
         self._test_subnet_delete_exception()
 
@@ -897,16 +912,15 @@ class NetworkSubnetTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_subnet_delete_exception_with_mac_learning(self):
         self._test_subnet_delete_exception(mac_learning=True)
 
     def _test_subnet_delete_exception(self, mac_learning=False):
         subnet = self.subnets.first()
         network_id = subnet.network_id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet.id)\
             .AndRaise(self.exceptions.neutron)
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
@@ -1231,7 +1245,7 @@ class NetworkPortTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_port_delete(self):
         self._test_port_delete()
 
@@ -1239,16 +1253,15 @@ class NetworkPortTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_port_delete_with_mac_learning(self):
         self._test_port_delete(mac_learning=True)
 
     def _test_port_delete(self, mac_learning=False):
         port = self.ports.first()
         network_id = port.network_id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.port_delete(IsA(http.HttpRequest), port.id)
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
             .AndReturn([self.subnets.first()])
@@ -1270,7 +1283,7 @@ class NetworkPortTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks',)})
+                                      'dhcp_agents_by_network',)})
     def test_port_delete_exception(self):
         self._test_port_delete_exception()
 
@@ -1278,16 +1291,15 @@ class NetworkPortTests(test.BaseAdminViewTests):
                                       'subnet_list',
                                       'port_list',
                                       'is_extension_supported',
-                                      'list_dhcp_agent_hosting_networks')})
+                                      'dhcp_agents_by_network')})
     def test_port_delete_exception_with_mac_learning(self):
         self._test_port_delete_exception(mac_learning=True)
 
     def _test_port_delete_exception(self, mac_learning=False):
         port = self.ports.first()
         network_id = port.network_id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.port_delete(IsA(http.HttpRequest), port.id)\
             .AndRaise(self.exceptions.neutron)
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
@@ -1393,15 +1405,14 @@ class NetworkAgentTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('subnet_list',
                                       'port_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported',
                                       'remove_network_from_dhcp_agent',)})
     def test_agent_delete(self):
         network_id = self.networks.first().id
         agent_id = self.agents.first().id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
             .AndReturn([self.subnets.first()])
         api.neutron.port_list(IsA(http.HttpRequest), network_id=network_id)\
@@ -1422,15 +1433,14 @@ class NetworkAgentTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('subnet_list',
                                       'port_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agents_by_network',
                                       'is_extension_supported',
                                       'remove_network_from_dhcp_agent',)})
     def test_agent_delete_exception(self):
         network_id = self.networks.first().id
         agent_id = self.agents.first().id
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network_id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agents_by_network(IsA(http.HttpRequest)).\
+            AndReturn({network_id: self.agents.list()})
         api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network_id)\
             .AndReturn([self.subnets.first()])
         api.neutron.port_list(IsA(http.HttpRequest), network_id=network_id)\
@@ -52,21 +52,17 @@ class IndexView(tables.DataTableView):
         tenant_dict = SortedDict([(t.id, t) for t in tenants])
         return tenant_dict
 
-    def _get_agents_data(self, network):
-        agents = []
-        data = _("Unknown")
+    def _get_agents_data(self):
+        # Returns the DHCP agents hosting each network, or None if they
+        # cannot be retrieved.
         try:
             if api.neutron.is_extension_supported(self.request,
                                                   'dhcp_agent_scheduler'):
-                # This method is called for each network. If agent-list cannot
-                # be retrieved, we will see many pop-ups. So the error message
-                # will be popup-ed in get_data() below.
-                agents = api.neutron.list_dhcp_agent_hosting_networks(
-                    self.request, network)
-                data = len(agents)
+                return api.neutron.dhcp_agents_by_network(self.request)
         except Exception:
-            self.exception = True
-        return data
+            msg = _('Unable to list dhcp agents hosting network.')
+            exceptions.handle(self.request, msg)
+        return None
 
     def get_data(self):
         try:
@@ -76,19 +72,18 @@ class IndexView(tables.DataTableView):
             msg = _('Network list can not be retrieved.')
             exceptions.handle(self.request, msg)
         if networks:
-            self.exception = False
             tenant_dict = self._get_tenant_list()
+            agents = self._get_agents_data()
             for n in networks:
                 # Set tenant name
                 tenant = tenant_dict.get(n.tenant_id, None)
                 n.tenant_name = getattr(tenant, 'name', None)
                 # If name is empty use UUID as name
                 n.set_id_as_name_if_empty()
-                n.num_agents = self._get_agents_data(n.id)
-
-            if self.exception:
-                msg = _('Unable to list dhcp agents hosting network.')
-                exceptions.handle(self.request, msg)
+                if agents is None:
+                    n.num_agents = _("Unknown")
+                else:
+                    n.num_agents = len(agents.get(n.id, []))
         return networks
 
 
@@ -134,8 +129,8 @@ class DetailView(tables.MultiTableView):
         agents = []
         try:
             network_id = self.kwargs['network_id']
-            agents = api.neutron.list_dhcp_agent_hosting_networks(self.request,
-                                                                  network_id)
+            agents = api.neutron.dhcp_agents_by_network(
+                self.request).get(network_id, [])
         except Exception:
             msg = _('Unable to list dhcp agents hosting network.')
             exceptions.handle(self.request, msg)
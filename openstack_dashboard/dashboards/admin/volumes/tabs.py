@@ -39,8 +39,7 @@ class VolumeTab(tabs.TableTab, volumes_tabs.VolumeTableMixIn):
 
     def get_volumes_data(self):
         volumes = self._get_volumes(search_opts={'all_tenants': True})
-        instances = self._get_instances(search_opts={'all_tenants': True})
-        self._set_attachments_string(volumes, instances)
+        self._update_attachment_names(volumes)
 
         # Gather our tenants to correlate against IDs
         try:
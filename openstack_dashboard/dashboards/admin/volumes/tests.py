@@ -23,15 +23,18 @@ from openstack_dashboard.test import helpers as test
 
 
 class VolumeTests(test.BaseAdminViewTests):
-    @test.create_stubs({api.nova: ('server_list',),
-                        cinder: ('volume_list',),
+    @test.create_stubs({api.nova: ('server_get',),
+                        cinder: ('volume_list_paged',),
                         keystone: ('tenant_list',)})
     def test_index(self):
-        cinder.volume_list(IsA(http.HttpRequest), search_opts={
-            'all_tenants': True}).AndReturn(self.cinder_volumes.list())
-        api.nova.server_list(IsA(http.HttpRequest), search_opts={
-                             'all_tenants': True}) \
-                       .AndReturn([self.servers.list(), False])
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts={
+            'all_tenants': True}, marker=None, paginate=True,
+            sort_dir='desc').AndReturn([self.cinder_volumes.list(),
+                                        False, False])
+        # Only the servers the volumes are attached to are fetched.
+        for server in self.servers.list()[:2]:
+            api.nova.server_get(IsA(http.HttpRequest), server.id) \
+                .InAnyOrder().AndReturn(server)
         keystone.tenant_list(IsA(http.HttpRequest)) \
                 .AndReturn([self.tenants.list(), False])
 
@@ -45,6 +45,8 @@ class VolumesTable(volumes_tables.VolumesTable):
 
     class Meta:
         name = "volumes"
+        pagination_param = 'volume_marker'
+        prev_pagination_param = 'prev_volume_marker'
         verbose_name = _("Volumes")
         status_columns = ["status"]
         row_class = volumes_tables.UpdateRow
@@ -14,6 +14,7 @@
 
 import copy
 import datetime
+import json
 import logging
 import os
 
@@ -81,6 +82,42 @@ class TenantsViewTests(test.BaseAdminViewTests):
         self.assertItemsEqual(res.context['table'].data, domain_tenants)
         self.assertContains(res, "<em>test_domain:</em>")
 
+    @test.create_stubs({api.keystone: ('user_search',)})
+    @test.update_settings(API_RESULT_PAGE_SIZE=2)
+    def test_search_members(self):
+        users = self.users.list()
+        api.keystone.user_search(IsA(http.HttpRequest), 'user',
+                                 domain='1') \
+            .MultipleTimes().AndReturn(users)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:identity:projects:search_members',
+                      args=['users'])
+        res = self.client.get(url, {'query': 'user', 'domain': '1'})
+        data = json.loads(res.content)
+        self.assertEqual([{'id': user.id, 'name': user.name}
+                          for user in users[:2]], data['items'])
+        self.assertTrue(data['more'])
+
+        res = self.client.get(url, {'query': 'user', 'domain': '1',
+                                    'offset': len(users) - 1})
+        data = json.loads(res.content)
+        self.assertEqual([users[-1].id],
+                         [item['id'] for item in data['items']])
+        self.assertFalse(data['more'])
+
+    @test.create_stubs({api.keystone: ('group_search',)})
+    def test_search_members_error(self):
+        api.keystone.group_search(IsA(http.HttpRequest), 'group',
+                                  domain=None) \
+            .AndRaise(self.exceptions.keystone)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:identity:projects:search_members',
+                      args=['groups'])
+        res = self.client.get(url, {'query': 'group'})
+        self.assertEqual({'items': [], 'more': False}, json.loads(res.content))
+
 
 class ProjectsViewNonAdminTests(test.TestCase):
     @test.create_stubs({api.keystone: ('tenant_list',)})
@@ -142,26 +179,10 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
                                                    default_domain.name)}
         return api.base.APIDictWrapper(domain)
 
-    def _get_all_users(self, domain_id):
-        if not domain_id:
-            users = self.users.list()
-        else:
-            users = [user for user in self.users.list()
-                     if user.domain_id == domain_id]
-        return users
-
-    def _get_all_groups(self, domain_id):
-        if not domain_id:
-            groups = self.groups.list()
-        else:
-            groups = [group for group in self.groups.list()
-                      if group.domain_id == domain_id]
-        return groups
-
     @test.create_stubs({api.keystone: ('get_default_domain',
                                        'get_default_role',
-                                       'user_list',
-                                       'group_list',
+                                       'user_list_by_ids',
+                                       'group_list_by_ids',
                                        'role_list'),
                         api.base: ('is_service_enabled',),
                         api.neutron: ('is_extension_supported',),
@@ -170,9 +191,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
 
         # init
@@ -188,11 +206,11 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)).AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)).AndReturn(roles)
 
         self.mox.ReplayAll()
@@ -225,8 +243,8 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         self.test_add_project_get()
 
     @test.create_stubs({api.keystone: ('get_default_role',
-                                       'user_list',
-                                       'group_list',
+                                       'user_list_by_ids',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'domain_get'),
                         api.neutron: ('is_extension_supported',
@@ -248,12 +266,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
             .AndReturn(neutron_quotas)
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(self.roles.first())
-        api.keystone.user_list(IsA(http.HttpRequest), domain=None) \
-            .AndReturn(self.users.list())
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .AndReturn(self.roles.list())
-        api.keystone.group_list(IsA(http.HttpRequest), domain=None) \
-            .AndReturn(self.groups.list())
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .AndReturn(self.roles.list())
         self.mox.ReplayAll()
@@ -286,8 +304,8 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
     @test.create_stubs({api.keystone: ('get_default_role',
                                        'add_tenant_user_role',
                                        'tenant_create',
-                                       'user_list',
-                                       'group_list',
+                                       'user_list_by_ids',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'domain_get'),
                         quotas: ('get_default_quota_data',
@@ -299,10 +317,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         project = self.tenants.first()
         quota = self.quotas.first()
         default_role = self.roles.first()
-        default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
 
@@ -316,12 +330,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         # handle
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
@@ -394,9 +408,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
                                         **neutron_updated_quota)
         self.test_add_project_post(neutron=True)
 
-    @test.create_stubs({api.keystone: ('user_list',
+    @test.create_stubs({api.keystone: ('user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role'),
                         quotas: ('get_default_quota_data',
@@ -404,9 +418,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
     def test_add_project_quota_defaults_error(self):
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
 
         # init
@@ -419,12 +430,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         self.mox.ReplayAll()
 
@@ -441,9 +452,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         self.test_add_project_quota_defaults_error()
 
     @test.create_stubs({api.keystone: ('tenant_create',
-                                       'user_list',
+                                       'user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role'),
                         quotas: ('get_default_quota_data',
@@ -454,9 +465,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
 
@@ -469,12 +477,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         # handle
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
@@ -500,9 +508,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
                               domain_context_name=domain.name)
         self.test_add_project_tenant_create_error()
 
-    @test.create_stubs({api.keystone: ('user_list',
+    @test.create_stubs({api.keystone: ('user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role',
                                        'add_tenant_user_role'),
@@ -515,9 +523,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
         quota_usages['instances']['used'] = 5
@@ -531,12 +536,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
 
@@ -552,9 +557,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         self.assertContains(res, msg)
 
     @test.create_stubs({api.keystone: ('tenant_create',
-                                       'user_list',
+                                       'user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role',
                                        'add_tenant_user_role'),
@@ -567,9 +572,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
 
@@ -582,12 +584,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         # handle
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
@@ -640,9 +642,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         self.test_add_project_quota_update_error()
 
     @test.create_stubs({api.keystone: ('tenant_create',
-                                       'user_list',
+                                       'user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role',
                                        'add_tenant_user_role'),
@@ -656,9 +658,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
 
@@ -671,12 +670,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         # handle
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
@@ -728,9 +727,9 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
                               domain_context_name=domain.name)
         self.test_add_project_user_update_error()
 
-    @test.create_stubs({api.keystone: ('user_list',
+    @test.create_stubs({api.keystone: ('user_list_by_ids',
                                        'role_list',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'get_default_domain',
                                        'get_default_role'),
                         quotas: ('get_default_quota_data',
@@ -741,9 +740,6 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         default_domain = self._get_default_domain()
-        domain_id = default_domain.id
-        users = self._get_all_users(domain_id)
-        groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         quota_usages = self.quota_usages.first()
 
@@ -756,12 +752,12 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
 
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
@@ -796,14 +792,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             quota_data[field] = int(neutron_quota.get(field).limit)
         return quota_data
 
-    def _get_all_users(self, domain_id):
-        if not domain_id:
-            users = self.users.list()
-        else:
-            users = [user for user in self.users.list()
-                     if user.domain_id == domain_id]
-        return users
-
     def _get_all_groups(self, domain_id):
         if not domain_id:
             groups = self.groups.list()
@@ -816,10 +804,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         return [user for user in self.users.list()
                 if user.project_id == project_id]
 
-    def _get_proj_groups(self, project_id):
-        return [group for group in self.groups.list()
-                if group.project_id == project_id]
-
     def _get_proj_role_assignment(self, project_id):
         project_scope = {'project': {'id': project_id}}
         return self.role_assignments.filter(scope=project_scope)
@@ -829,8 +813,8 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'tenant_get',
                                        'domain_get',
                                        'user_list',
-                                       'roles_for_group',
-                                       'group_list',
+                                       'user_list_by_ids',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'role_assignments_list'),
                         quotas: ('get_tenant_quota_data',
@@ -842,7 +826,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         domain_id = project.domain_id
-        users = self._get_all_users(domain_id)
         groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         proj_users = self._get_proj_users(project.id)
@@ -861,12 +844,13 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest),
+                                      set(['1', '2', '3'])) \
+            .AndReturn(proj_users)
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set(['1'])) \
+            .AndReturn(groups[:1])
 
         if keystone_api_version >= 3:
             api.keystone.role_assignments_list(IsA(http.HttpRequest),
@@ -882,12 +866,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                             user.id,
                                             self.tenant.id).AndReturn(roles)
 
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         self.mox.ReplayAll()
 
         url = reverse('horizon:identity:projects:update',
@@ -921,10 +899,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'user_list_by_ids',
                                        'remove_group_role',
                                        'add_group_role',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'role_assignments_list'),
                         api.nova: ('tenant_quota_update',),
@@ -939,10 +917,8 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         domain_id = project.domain_id
-        users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
         role_assignments = self._get_proj_role_assignment(project.id)
         quota_usages = self.quota_usages.first()
@@ -964,11 +940,12 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest),
+                                      set(['1', '2', '3'])) \
+            .AndReturn(proj_users)
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set(['1', '2', '3'])) \
             .AndReturn(groups)
 
         workflow_data = {}
@@ -987,12 +964,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                             user.id,
                                             self.tenant.id).AndReturn(roles)
 
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         workflow_data[USER_ROLE_PREFIX + "1"] = ['3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['2']  # member role
         # Group assignment form  data
@@ -1017,91 +988,34 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
+        # Only the changed role assignments are made, concurrently.
         # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='2',
-                                             role='1')
-        # add role 2
-        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
-                                          project=self.tenant.id,
-                                          user='2',
-                                          role='2')
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
+        # member user 2 - has role 2, kept
+        # member user 3 - has role 2, will remove it and add role 1
         api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
                                              project=self.tenant.id,
                                              user='3',
-                                             role='2')
-        # add role 1
+                                             role='2').InAnyOrder()
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
-                                          role='1')
+                                          role='1').InAnyOrder()
 
         # Group assignments
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group - try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
-        for role in roles:
-            api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                           role=role.id,
-                                           group='1',
-                                           project=self.tenant.id)
-
-        # member group 1 - has role 1, will remove it
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
+        # group 1 - has role 2, will remove it
         api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                       role='1',
-                                       group='2',
-                                       project=self.tenant.id)
-        # add role 2
+                                       role='2',
+                                       group='1',
+                                       project=self.tenant.id).InAnyOrder()
+        # new groups 2 and 3
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='2',
-                                    project=self.tenant.id)
-
-        # member group 3 - has role 2
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                       role='2',
-                                       group='3',
-                                       project=self.tenant.id)
-        # add role 1
+                                    project=self.tenant.id).InAnyOrder()
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='1',
                                     group='3',
-                                    project=self.tenant.id)
+                                    project=self.tenant.id).InAnyOrder()
 
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
@@ -1117,6 +1031,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         api.cinder.tenant_quota_update(IsA(http.HttpRequest),
                                        project.id,
                                        **cinder_updated_quota)
+        quotas.tenant_quota_usages.invalidate(IsA(http.HttpRequest))
         self.mox.ReplayAll()
 
         # submit form data
@@ -1177,10 +1092,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'remove_tenant_user',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'user_list_by_ids',
                                        'remove_group_role',
                                        'add_group_role',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'role_assignments_list'),
                         quotas: ('get_tenant_quota_data',
@@ -1194,7 +1109,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         domain_id = project.domain_id
-        users = self._get_all_users(domain_id)
         groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
         proj_users = self._get_proj_users(project.id)
@@ -1215,11 +1129,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(proj_users)
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
             .AndReturn(groups)
 
         workflow_data = {}
@@ -1244,11 +1158,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                              .append(user.id)
 
         for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-            role_ids = [role.id for role in roles]
             if role_ids:
                 workflow_data.setdefault(GROUP_ROLE_PREFIX + role_ids[0], []) \
                              .append(group.id)
@@ -1298,10 +1207,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'user_list_by_ids',
                                        'remove_group_role',
                                        'add_group_role',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'role_assignments_list'),
                         quotas: ('get_tenant_quota_data',
@@ -1315,10 +1224,8 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         domain_id = project.domain_id
-        users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
         role_assignments = self._get_proj_role_assignment(project.id)
         quota_usages = self.quota_usages.first()
@@ -1337,11 +1244,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(proj_users)
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
             .AndReturn(groups)
 
         workflow_data = {}
@@ -1360,12 +1267,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                             user.id,
                                             self.tenant.id).AndReturn(roles)
 
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
         # Group role assignment data
@@ -1390,57 +1291,38 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # add role 2
+        # admin user 1 - has role 1, add role 2
+        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
+                                          project=self.tenant.id,
+                                          user='1',
+                                          role='2').InAnyOrder()
+        # member user 2 - has no change
+        # member user 3 - has role 2, add role 1
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
-                                          role='2')
+                                          role='1').InAnyOrder()
 
         # Group assignment
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group 1- try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member group 1 - has no change
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-
-        # member group 3 - has role 1
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-
-        # add role 2
+        # group 1 - has role 2, add role 1
+        api.keystone.add_group_role(IsA(http.HttpRequest),
+                                    role='1',
+                                    group='1',
+                                    project=self.tenant.id).InAnyOrder()
+        # new group 2 - add role 2
+        api.keystone.add_group_role(IsA(http.HttpRequest),
+                                    role='2',
+                                    group='2',
+                                    project=self.tenant.id).InAnyOrder()
+        # new group 3 - add roles 1 and 2
+        api.keystone.add_group_role(IsA(http.HttpRequest),
+                                    role='1',
+                                    group='3',
+                                    project=self.tenant.id).InAnyOrder()
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='3',
-                                    project=self.tenant.id)
+                                    project=self.tenant.id).InAnyOrder()
 
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
@@ -1478,10 +1360,10 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'user_list_by_ids',
                                        'remove_group_role',
                                        'add_group_role',
-                                       'group_list',
+                                       'group_list_by_ids',
                                        'role_list',
                                        'role_assignments_list'),
                         quotas: ('get_tenant_quota_data',
@@ -1494,7 +1376,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         quota = self.quotas.first()
         default_role = self.roles.first()
         domain_id = project.domain_id
-        users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
@@ -1515,11 +1396,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(default_role)
-        api.keystone.user_list(IsA(http.HttpRequest), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
+            .AndReturn(proj_users)
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(roles)
-        api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), IgnoreArg()) \
             .AndReturn(groups)
 
         workflow_data = {}
@@ -1538,12 +1419,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                             user.id,
                                             self.tenant.id).AndReturn(roles)
 
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
 
@@ -1569,26 +1444,22 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id).AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id).AndReturn((roles[1],))
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id).AndReturn((roles[0],))
-        # add role 2
+        # The other changes are still made when one of them fails.
+        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
+                                          project=self.tenant.id,
+                                          user='1',
+                                          role='2').InAnyOrder()
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
-                                          role='2')\
+                                          role='1').InAnyOrder() \
             .AndRaise(self.exceptions.keystone)
+        for group_id, role_id in (('1', '1'), ('2', '2'),
+                                  ('3', '1'), ('3', '2')):
+            api.keystone.add_group_role(IsA(http.HttpRequest),
+                                        role=role_id,
+                                        group=group_id,
+                                        project=self.tenant.id).InAnyOrder()
 
         self.mox.ReplayAll()
 
@@ -1851,8 +1722,9 @@ class SeleniumTests(test.SeleniumAdminTestCase):
 
     @test.create_stubs({api.keystone: ('get_default_domain',
                                        'get_default_role',
-                                       'user_list',
-                                       'group_list',
+                                       'user_list_by_ids',
+                                       'user_search',
+                                       'group_list_by_ids',
                                        'role_list'),
                         api.base: ('is_service_enabled',),
                         quotas: ('get_default_quota_data',)})
@@ -1871,21 +1743,31 @@ class SeleniumTests(test.SeleniumAdminTestCase):
 
         api.keystone.get_default_role(IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(self.roles.first())
-        api.keystone.user_list(IsA(http.HttpRequest), domain=self.domain.id) \
-            .AndReturn(users)
+        api.keystone.user_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .AndReturn(self.roles.list())
-        api.keystone.group_list(IsA(http.HttpRequest), domain=self.domain.id) \
-            .AndReturn(self.groups.list())
+        api.keystone.group_list_by_ids(IsA(http.HttpRequest), set()) \
+            .AndReturn([])
         api.keystone.role_list(IsA(http.HttpRequest)) \
             .AndReturn(self.roles.list())
+        api.keystone.user_search(IsA(http.HttpRequest), 'user',
+                                 domain=self.domain.id) \
+            .AndReturn(users)
 
         self.mox.ReplayAll()
 
         self.selenium.get("%s%s" % (self.live_server_url,
                                 reverse('horizon:identity:projects:create')))
 
+        # The users are only listed once they're searched for.
         members = self.selenium.find_element_by_css_selector(member_css_class)
+        self.assertEqual('', members.text)
+        self.selenium.find_element_by_id(
+            "available_update_members").send_keys("user")
+        wait = self.ui.WebDriverWait(self.selenium, 10,
+                                     ignored_exceptions=[socket_timeout])
+        wait.until(lambda x: members.text)
 
         for user in users:
             self.assertIn(user.name, members.text)
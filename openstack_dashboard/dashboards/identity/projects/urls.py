@@ -29,4 +29,6 @@ urlpatterns = patterns('',
         views.UpdateProjectView.as_view(), name='update'),
     url(r'^(?P<project_id>[^/]+)/usage/$',
         views.ProjectUsageView.as_view(), name='usage'),
+    url(r'^members/(?P<kind>users|groups)/$',
+        views.SearchMembersView.as_view(), name='search_members'),
 )
@@ -16,12 +16,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 from django.core.urlresolvers import reverse
+from django import http
 from django.utils.translation import ugettext_lazy as _
+from django.views import generic
 
 from horizon import exceptions
 from horizon import messages
 from horizon import tables
+from horizon.utils import functions as utils
 from horizon.utils import memoized
 from horizon import workflows
 
@@ -203,3 +208,36 @@ class UpdateProjectView(workflows.WorkflowView):
                               _('Unable to retrieve project details.'),
                               redirect=reverse(INDEX_URL))
         return initial
+
+
+class SearchMembersView(generic.View):
+    """Returns the users or groups whose names start with the ``query``
+    parameter, a page at a time, for the membership steps of the project
+    workflows.
+    """
+    def get(self, request, kind):
+        if kind == 'users':
+            search = api.keystone.user_search
+            err_msg = _('Unable to retrieve user list.')
+        else:
+            search = api.keystone.group_search
+            err_msg = _('Unable to retrieve group list.')
+        query = request.GET.get('query', '')
+        try:
+            offset = max(int(request.GET.get('offset', 0)), 0)
+        except ValueError:
+            offset = 0
+        page_size = utils.get_page_size(request)
+
+        found = []
+        if query:
+            try:
+                found = search(request, query,
+                               domain=request.GET.get('domain'))
+            except Exception:
+                exceptions.handle(request, err_msg)
+        page = found[offset:offset + page_size]
+        data = {'items': [{'id': obj.id, 'name': obj.name} for obj in page],
+                'more': len(found) > offset + page_size}
+        return http.HttpResponse(json.dumps(data),
+                                 content_type='application/json')
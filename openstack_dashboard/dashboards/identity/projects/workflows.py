@@ -17,9 +17,13 @@
 #    under the License.
 
 
+import collections
+import functools
+
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext_lazy as _
+import six.moves.urllib.parse as urlparse
 
 from horizon import exceptions
 from horizon import forms
@@ -35,6 +39,7 @@ from openstack_dashboard.usage import quotas
 
 INDEX_URL = "horizon:identity:projects:index"
 ADD_USER_URL = "horizon:identity:projects:create_user"
+SEARCH_MEMBERS_URL = "horizon:identity:projects:search_members"
 PROJECT_GROUP_ENABLED = keystone.VERSIONS.active >= 3
 PROJECT_USER_MEMBER_SLUG = "update_members"
 PROJECT_GROUP_MEMBER_SLUG = "update_group_members"
@@ -156,14 +161,19 @@ class CreateProjectInfo(workflows.Step):
                    "enabled")
 
 
+def _get_search_url(kind, domain_id):
+    url = reverse(SEARCH_MEMBERS_URL, args=[kind])
+    if domain_id:
+        url += "?" + urlparse.urlencode({'domain': domain_id})
+    return url
+
+
 class UpdateProjectMembersAction(workflows.MembershipAction):
     def __init__(self, request, *args, **kwargs):
         super(UpdateProjectMembersAction, self).__init__(request,
                                                          *args,
                                                          **kwargs)
         err_msg = _('Unable to retrieve user list. Please try again later.')
-        # Use the domain_id from the project
-        domain_id = self.initial.get("domain_id", None)
         project_id = ''
         if 'project_id' in self.initial:
             project_id = self.initial['project_id']
@@ -186,15 +196,6 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
         self.fields[default_role_name] = forms.CharField(required=False)
         self.fields[default_role_name].initial = default_role.id
 
-        # Get list of available users
-        all_users = []
-        try:
-            all_users = api.keystone.user_list(request,
-                                               domain=domain_id)
-        except Exception:
-            exceptions.handle(request, err_msg)
-        users_list = [(user.id, user.name) for user in all_users]
-
         # Get list of roles
         role_list = []
         try:
@@ -203,15 +204,9 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
             exceptions.handle(request,
                               err_msg,
                               redirect=reverse(INDEX_URL))
-        for role in role_list:
-            field_name = self.get_member_field_name(role.id)
-            label = role.name
-            self.fields[field_name] = forms.MultipleChoiceField(required=False,
-                                                                label=label)
-            self.fields[field_name].choices = users_list
-            self.fields[field_name].initial = []
 
         # Figure out users & roles
+        users_roles = {}
         if project_id:
             try:
                 users_roles = api.keystone.get_project_users_roles(request,
@@ -221,11 +216,31 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
                                   err_msg,
                                   redirect=reverse(INDEX_URL))
 
-            for user_id in users_roles:
-                roles_ids = users_roles[user_id]
-                for role_id in roles_ids:
-                    field_name = self.get_member_field_name(role_id)
-                    self.fields[field_name].initial.append(user_id)
+        # Only the members of the project (and the users submitted as new
+        # members) are given as choices; the other users are searched for.
+        user_ids = set(users_roles)
+        user_ids.update(self.get_submitted_members(
+            [role.id for role in role_list]))
+        users = []
+        try:
+            users = api.keystone.user_list_by_ids(request, user_ids)
+        except Exception:
+            exceptions.handle(request, err_msg)
+        users_list = [(user.id, user.name) for user in users]
+
+        for role in role_list:
+            field_name = self.get_member_field_name(role.id)
+            label = role.name
+            self.fields[field_name] = forms.MultipleChoiceField(required=False,
+                                                                label=label)
+            self.fields[field_name].choices = users_list
+            self.fields[field_name].initial = []
+
+        for user_id in users_roles:
+            roles_ids = users_roles[user_id]
+            for role_id in roles_ids:
+                field_name = self.get_member_field_name(role_id)
+                self.fields[field_name].initial.append(user_id)
 
     class Meta:
         name = _("Project Members")
@@ -239,6 +254,10 @@ class UpdateProjectMembers(workflows.UpdateMembersStep):
     no_available_text = _("No users found.")
     no_members_text = _("No users.")
 
+    @property
+    def search_url(self):
+        return _get_search_url('users', self.workflow.context.get('domain_id'))
+
     def contribute(self, data, context):
         if data:
             try:
@@ -260,8 +279,6 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
                                                         *args,
                                                         **kwargs)
         err_msg = _('Unable to retrieve group list. Please try again later.')
-        # Use the domain_id from the project
-        domain_id = self.initial.get("domain_id", None)
         project_id = ''
         if 'project_id' in self.initial:
             project_id = self.initial['project_id']
@@ -284,15 +301,6 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
         self.fields[default_role_name] = forms.CharField(required=False)
         self.fields[default_role_name].initial = default_role.id
 
-        # Get list of available groups
-        all_groups = []
-        try:
-            all_groups = api.keystone.group_list(request,
-                                                 domain=domain_id)
-        except Exception:
-            exceptions.handle(request, err_msg)
-        groups_list = [(group.id, group.name) for group in all_groups]
-
         # Get list of roles
         role_list = []
         try:
@@ -301,6 +309,31 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
             exceptions.handle(request,
                               err_msg,
                               redirect=reverse(INDEX_URL))
+
+        # Figure out groups & roles, from the same listing of the role
+        # assignments of the project as the users
+        groups_roles = {}
+        if project_id:
+            try:
+                groups_roles = api.keystone.get_project_groups_roles(
+                    request, project_id)
+            except Exception:
+                exceptions.handle(request,
+                                  err_msg,
+                                  redirect=reverse(INDEX_URL))
+
+        # Only the groups of the project (and the groups submitted as new
+        # members) are given as choices; the other groups are searched for.
+        group_ids = set(groups_roles)
+        group_ids.update(self.get_submitted_members(
+            [role.id for role in role_list]))
+        groups = []
+        try:
+            groups = api.keystone.group_list_by_ids(request, group_ids)
+        except Exception:
+            exceptions.handle(request, err_msg)
+        groups_list = [(group.id, group.name) for group in groups]
+
         for role in role_list:
             field_name = self.get_member_field_name(role.id)
             label = role.name
@@ -309,20 +342,10 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
             self.fields[field_name].choices = groups_list
             self.fields[field_name].initial = []
 
-        # Figure out groups & roles
-        if project_id:
-            for group in all_groups:
-                try:
-                    roles = api.keystone.roles_for_group(self.request,
-                                                         group=group.id,
-                                                         project=project_id)
-                except Exception:
-                    exceptions.handle(request,
-                                      err_msg,
-                                      redirect=reverse(INDEX_URL))
-                for role in roles:
-                    field_name = self.get_member_field_name(role.id)
-                    self.fields[field_name].initial.append(group.id)
+        for group_id in groups_roles:
+            for role_id in groups_roles[group_id]:
+                field_name = self.get_member_field_name(role_id)
+                self.fields[field_name].initial.append(group_id)
 
     class Meta:
         name = _("Project Groups")
@@ -336,6 +359,11 @@ class UpdateProjectGroups(workflows.UpdateMembersStep):
     no_available_text = _("No groups found.")
     no_members_text = _("No groups.")
 
+    @property
+    def search_url(self):
+        return _get_search_url('groups',
+                               self.workflow.context.get('domain_id'))
+
     def contribute(self, data, context):
         if data:
             try:
@@ -532,77 +560,75 @@ class UpdateProject(workflows.Workflow):
     def format_status_message(self, message):
         return message % self.context.get('name', 'unknown project')
 
-    def handle(self, request, data):
-        # FIXME(gabriel): This should be refactored to use Python's built-in
-        # sets and do this all in a single "roles to add" and "roles to remove"
-        # pass instead of the multi-pass thing happening now.
+    def _get_role_changes(self, step_slug, current_roles, available_roles,
+                          data):
+        """Returns the ``(member ID, role ID)`` pairs to grant and to revoke
+        on the project, from the members of the given step and the current
+        roles of the members.
+        """
+        member_step = self.get_step(step_slug)
+        wanted = set()
+        for role in available_roles:
+            field_name = member_step.get_member_field_name(role.id)
+            wanted.update((member_id, role.id)
+                          for member_id in data[field_name])
+        current = set((member_id, role_id)
+                      for member_id, role_ids in current_roles.items()
+                      for role_id in role_ids)
+        return wanted - current, current - wanted
+
+    def _apply_role_changes(self, request, changes):
+        """Makes the role assignment changes concurrently.
+
+        ``changes`` maps the IDs of the members to the calls changing their
+        roles. Returns the number of members for which a change failed.
+        """
+        members = []
+        calls = []
+        for member_id, member_calls in changes.items():
+            members.extend([member_id] * len(member_calls))
+            calls.extend(member_calls)
+        failed = set()
+        for member_id, future in zip(members, base.gather(*calls)):
+            try:
+                future.result()
+            except Exception:
+                failed.add(member_id)
+                exceptions.handle(request, ignore=True)
+        return len(failed)
 
+    def handle(self, request, data):
         project_id = data['project_id']
-        domain_id = ''
         # update project info
         try:
-            project = api.keystone.tenant_update(
+            api.keystone.tenant_update(
                 request,
                 project_id,
                 name=data['name'],
                 description=data['description'],
                 enabled=data['enabled'])
-            # Use the domain_id from the project if available
-            domain_id = getattr(project, "domain_id", None)
         except Exception:
             exceptions.handle(request, ignore=True)
             return False
 
-        # update project members
-        users_to_modify = 0
-        # Project-user member step
-        member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
+        # Work out the role assignments to add and remove from the current
+        # ones, which are listed once, and only make those changes.
+        user_changes = collections.defaultdict(list)
+        group_changes = collections.defaultdict(list)
         try:
-            # Get our role options
             available_roles = api.keystone.role_list(request)
-            # Get the users currently associated with this project so we
-            # can diff against it.
-            project_members = api.keystone.user_list(request,
-                                                     project=project_id)
-            users_to_modify = len(project_members)
-
-            for user in project_members:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_user(self.request,
-                                                            user.id,
-                                                            project_id)
-                current_role_ids = [role.id for role in current_roles]
-
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Check if the user is in the list of users with this role.
-                    if user.id in data[field_name]:
-                        # Add it if necessary
-                        if role.id not in current_role_ids:
-                            # user role has changed
-                            api.keystone.add_tenant_user_role(
-                                request,
-                                project=project_id,
-                                user=user.id,
-                                role=role.id)
-                        else:
-                            # User role is unchanged, so remove it from the
-                            # remaining roles list to avoid removing it later.
-                            index = current_role_ids.index(role.id)
-                            current_role_ids.pop(index)
-
-                # Prevent admins from doing stupid things to themselves.
-                is_current_user = user.id == request.user.id
-                is_current_project = project_id == request.user.tenant_id
-                admin_roles = [role for role in current_roles
-                               if role.name.lower() == 'admin']
-                if len(admin_roles):
-                    removing_admin = any([role.id in current_role_ids
-                                          for role in admin_roles])
-                else:
-                    removing_admin = False
-                if is_current_user and is_current_project and removing_admin:
+            current_roles = api.keystone.get_project_users_roles(request,
+                                                                 project_id)
+            to_grant, to_revoke = self._get_role_changes(
+                PROJECT_USER_MEMBER_SLUG, current_roles, available_roles,
+                data)
+
+            # Prevent admins from doing stupid things to themselves.
+            if project_id == request.user.tenant_id:
+                admin_role_ids = [role.id for role in available_roles
+                                  if role.name.lower() == 'admin']
+                if any((request.user.id, role_id) in to_revoke
+                       for role_id in admin_role_ids):
                     # Cannot remove "admin" role on current(admin) project
                     msg = _('You cannot revoke your administrative privileges '
                             'from the project you are currently logged into. '
@@ -610,116 +636,58 @@ class UpdateProject(workflows.Workflow):
                             'administrative privileges or remove the '
                             'administrative role manually via the CLI.')
                     messages.warning(request, msg)
+                    to_revoke = set((user_id, role_id)
+                                    for user_id, role_id in to_revoke
+                                    if user_id != request.user.id)
+
+            for user_id, role_id in to_grant:
+                user_changes[user_id].append(functools.partial(
+                    api.keystone.add_tenant_user_role, request,
+                    project=project_id, user=user_id, role=role_id))
+            for user_id, role_id in to_revoke:
+                user_changes[user_id].append(functools.partial(
+                    api.keystone.remove_tenant_user_role, request,
+                    project=project_id, user=user_id, role=role_id))
 
-                # Otherwise go through and revoke any removed roles.
-                else:
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_tenant_user_role(
-                            request,
-                            project=project_id,
-                            user=user.id,
-                            role=id_to_delete)
-                users_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many users may be added for exception handling.
-                users_to_modify += len(data[field_name])
-            for role in available_roles:
-                users_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for user_id in data[field_name]:
-                    if not filter(lambda x: user_id == x.id, project_members):
-                        api.keystone.add_tenant_user_role(request,
-                                                          project=project_id,
-                                                          user=user_id,
-                                                          role=role.id)
-                    users_added += 1
-                users_to_modify -= users_added
+            if PROJECT_GROUP_ENABLED:
+                current_roles = api.keystone.get_project_groups_roles(
+                    request, project_id)
+                to_grant, to_revoke = self._get_role_changes(
+                    PROJECT_GROUP_MEMBER_SLUG, current_roles,
+                    available_roles, data)
+                for group_id, role_id in to_grant:
+                    group_changes[group_id].append(functools.partial(
+                        api.keystone.add_group_role, request,
+                        role=role_id, group=group_id, project=project_id))
+                for group_id, role_id in to_revoke:
+                    group_changes[group_id].append(functools.partial(
+                        api.keystone.remove_group_role, request,
+                        role=role_id, group=group_id, project=project_id))
         except Exception:
+            exceptions.handle(request, _('Unable to retrieve the members of '
+                                         'the project.'))
+            return False
+
+        # update project members and groups
+        users_failed = self._apply_role_changes(request, user_changes)
+        groups_failed = self._apply_role_changes(request, group_changes)
+        if users_failed:
             if PROJECT_GROUP_ENABLED:
                 group_msg = _(", update project groups")
             else:
                 group_msg = ""
-            exceptions.handle(request, _('Failed to modify %(users_to_modify)s'
-                                         ' project members%(group_msg)s and '
-                                         'update project quotas.')
-                                       % {'users_to_modify': users_to_modify,
-                                          'group_msg': group_msg})
+            messages.error(request, _('Failed to modify %(users_to_modify)s'
+                                      ' project members%(group_msg)s and '
+                                      'update project quotas.')
+                           % {'users_to_modify': users_failed,
+                              'group_msg': group_msg})
+            return False
+        if groups_failed:
+            messages.error(request, _('Failed to modify %s project '
+                                      'members, update project groups '
+                                      'and update project quotas.')
+                           % groups_failed)
             return False
-
-        if PROJECT_GROUP_ENABLED:
-            # update project groups
-            groups_to_modify = 0
-            member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
-            try:
-                # Get the groups currently associated with this project so we
-                # can diff against it.
-                project_groups = api.keystone.group_list(request,
-                                                         domain=domain_id,
-                                                         project=project_id)
-                groups_to_modify = len(project_groups)
-                for group in project_groups:
-                    # Check if there have been any changes in the roles of
-                    # Existing project members.
-                    current_roles = api.keystone.roles_for_group(
-                        self.request,
-                        group=group.id,
-                        project=project_id)
-                    current_role_ids = [role.id for role in current_roles]
-                    for role in available_roles:
-                        # Check if the group is in the list of groups with
-                        # this role.
-                        field_name = member_step.get_member_field_name(role.id)
-                        if group.id in data[field_name]:
-                            # Add it if necessary
-                            if role.id not in current_role_ids:
-                                # group role has changed
-                                api.keystone.add_group_role(
-                                    request,
-                                    role=role.id,
-                                    group=group.id,
-                                    project=project_id)
-                            else:
-                                # Group role is unchanged, so remove it from
-                                # the remaining roles list to avoid removing it
-                                # later.
-                                index = current_role_ids.index(role.id)
-                                current_role_ids.pop(index)
-
-                    # Revoke any removed roles.
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_group_role(request,
-                                                       role=id_to_delete,
-                                                       group=group.id,
-                                                       project=project_id)
-                    groups_to_modify -= 1
-
-                # Grant new roles on the project.
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Count how many groups may be added for error handling.
-                    groups_to_modify += len(data[field_name])
-                for role in available_roles:
-                    groups_added = 0
-                    field_name = member_step.get_member_field_name(role.id)
-                    for group_id in data[field_name]:
-                        if not filter(lambda x: group_id == x.id,
-                                      project_groups):
-                            api.keystone.add_group_role(request,
-                                                        role=role.id,
-                                                        group=group_id,
-                                                        project=project_id)
-                        groups_added += 1
-                    groups_to_modify -= groups_added
-            except Exception:
-                exceptions.handle(request,
-                                  _('Failed to modify %s project '
-                                    'members, update project groups '
-                                    'and update project quotas.')
-                                  % groups_to_modify)
-                return False
 
         # update the project quota
         nova_data = dict(
@@ -746,6 +714,7 @@ class UpdateProject(workflows.Workflow):
                 api.neutron.tenant_quota_update(request,
                                                 project_id,
                                                 **neutron_data)
+            quotas.tenant_quota_usages.invalidate(request)
             return True
         except Exception:
             exceptions.handle(request, _('Modified project information and '
@@ -47,6 +47,7 @@ class FloatingIpAllocate(forms.SelfHandlingForm):
 
             fip = api.network.tenant_floating_ip_allocate(request,
                                                        pool=data['pool'])
+            quotas.tenant_quota_usages.invalidate(request)
             messages.success(request,
                              _('Allocated Floating IP %(ip)s.')
                              % {"ip": fip.ip})
@@ -100,6 +100,7 @@ class ReleaseIPs(tables.BatchAction):
 
     def action(self, request, obj_id):
         api.network.tenant_floating_ip_release(request, obj_id)
+        quotas.tenant_quota_usages.invalidate(request)
 
 
 class AssociateIP(tables.LinkAction):
@@ -181,7 +181,7 @@ class FloatingIpNeutronViewTests(FloatingIpViewTests):
         super(FloatingIpViewTests, self).tearDown()
 
     @test.create_stubs({api.nova: ('tenant_quota_get', 'flavor_list',
-                                   'server_list'),
+                                   'server_iter'),
                         api.cinder: ('tenant_quota_get', 'volume_list',
                                      'volume_snapshot_list',),
                         api.network: ('floating_ip_pools_list',
@@ -198,8 +198,8 @@ class FloatingIpNeutronViewTests(FloatingIpViewTests):
             .AndReturn(self.quotas.first())
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
-        api.nova.server_list(IsA(http.HttpRequest)) \
-            .AndReturn([servers, False])
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+            .AndReturn(iter(servers))
         api.cinder.volume_list(IsA(http.HttpRequest)) \
             .AndReturn(self.volumes.list())
         api.cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
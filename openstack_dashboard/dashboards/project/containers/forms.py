@@ -16,6 +16,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import logging
+
 from django.core.urlresolvers import reverse
 from django.core import validators
 from django.utils.encoding import force_text
@@ -30,6 +33,9 @@ from openstack_dashboard import api
 from openstack_dashboard.dashboards.project.containers import tables
 
 
+LOG = logging.getLogger(__name__)
+
+
 no_slash_validator = validators.RegexValidator(r'^(?u)[^/]+$',
                                                _("Slash is not an allowed "
                                                  "character."),
@@ -102,6 +108,23 @@ class UploadObject(forms.SelfHandlingForm):
             object_path = data['name']
         return object_path
 
+    def _upload_progress(self, container_name, object_path, uploaded, size):
+        LOG.info('Uploaded %(uploaded)s of %(size)s bytes of "%(obj)s" '
+                 'to container "%(container)s".'
+                 % {'uploaded': uploaded, 'size': size,
+                    'obj': object_path, 'container': container_name})
+
+    def _upload(self, request, data, object_file):
+        object_path = self._set_object_path(data)
+        progress = functools.partial(self._upload_progress,
+                                     data['container_name'],
+                                     object_path)
+        return api.swift.swift_upload_object(request,
+                                             data['container_name'],
+                                             object_path,
+                                             object_file,
+                                             progress=progress)
+
     def clean(self):
         data = super(UploadObject, self).clean()
         if 'object_file' not in self.files:
@@ -111,12 +134,8 @@ class UploadObject(forms.SelfHandlingForm):
 
     def handle(self, request, data):
         object_file = self.files['object_file']
-        object_path = self._set_object_path(data)
         try:
-            obj = api.swift.swift_upload_object(request,
-                                                data['container_name'],
-                                                object_path,
-                                                object_file)
+            obj = self._upload(request, data, object_file)
             msg = force_text(_("Object was successfully uploaded."))
             messages.success(request, msg)
             return obj
@@ -134,12 +153,8 @@ class UpdateObject(UploadObject):
     def handle(self, request, data):
         object_file = self.files.get('object_file')
         if object_file:
-            object_path = self._set_object_path(data)
             try:
-                obj = api.swift.swift_upload_object(request,
-                                                    data['container_name'],
-                                                    object_path,
-                                                    object_file)
+                obj = self._upload(request, data, object_file)
                 messages.success(
                     request, _("Object was successfully updated."))
                 return obj
@@ -20,8 +20,10 @@ import tempfile
 
 from django.core.files.uploadedfile import InMemoryUploadedFile  # noqa
 from django import http
+from django.test.utils import override_settings
 from django.utils import http as utils_http
 
+from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
@@ -56,6 +58,13 @@ def invalid_paths():
     return INVALID_PATHS
 
 
+def _response_content(response):
+    # Downloads are only streamed on Django 1.5 and later.
+    if getattr(response, 'streaming', False):
+        return ''.join(response.streaming_content)
+    return response.content
+
+
 class SwiftTests(test.TestCase):
 
     def _test_invalid_paths(self, response):
@@ -209,7 +218,8 @@ class SwiftTests(test.TestCase):
         api.swift.swift_upload_object(IsA(http.HttpRequest),
                                       container.name,
                                       obj.name,
-                                      IsA(InMemoryUploadedFile)).AndReturn(obj)
+                                      IsA(InMemoryUploadedFile),
+                                      progress=IgnoreArg()).AndReturn(obj)
         self.mox.ReplayAll()
 
         upload_url = reverse('horizon:project:containers:object_upload',
@@ -238,7 +248,8 @@ class SwiftTests(test.TestCase):
         api.swift.swift_upload_object(IsA(http.HttpRequest),
                                       container.name,
                                       obj.name,
-                                      None).AndReturn(obj)
+                                      None,
+                                      progress=IgnoreArg()).AndReturn(obj)
         self.mox.ReplayAll()
 
         upload_url = reverse('horizon:project:containers:object_upload',
@@ -330,24 +341,30 @@ class SwiftTests(test.TestCase):
         handled = table.maybe_handle()
         self.assertEqual(handled['location'], index_url)
 
+    @override_settings(SWIFT_FILE_TRANSFER_CHUNK_SIZE=1024)
     @test.create_stubs({api.swift: ('swift_get_object',)})
     def test_download(self):
         for container in self.containers.list():
             for obj in self.objects.list():
                 self.mox.ResetAll()  # mandatory in a for loop
-                api.swift.swift_get_object(IsA(http.HttpRequest),
-                                           container.name,
-                                           obj.name).AndReturn(obj)
+                api.swift.swift_get_object(
+                    IsA(http.HttpRequest),
+                    container.name,
+                    obj.name,
+                    resp_chunk_size=1024,
+                    byte_range=None).AndReturn(obj)
                 self.mox.ReplayAll()
 
                 download_url = reverse(
                     'horizon:project:containers:object_download',
                     args=[container.name, obj.name])
                 res = self.client.get(download_url)
-                self.assertEqual(res.content, obj.data)
+                content = _response_content(res)
+                self.assertEqual(content, obj.data)
+                self.assertEqual(str(obj.bytes), res['Content-Length'])
                 self.assertTrue(res.has_header('Content-Disposition'))
-                self.assertNotContains(res, INVALID_CONTAINER_NAME_1)
-                self.assertNotContains(res, INVALID_CONTAINER_NAME_2)
+                self.assertNotIn(INVALID_CONTAINER_NAME_1, content)
+                self.assertNotIn(INVALID_CONTAINER_NAME_2, content)
 
                 # Check that the returned Content-Disposition filename is well
                 # surrounded by double quotes and with commas removed
@@ -358,6 +375,31 @@ class SwiftTests(test.TestCase):
                     'attachment; filename=%s' % expected_name
                 )
 
+    @test.create_stubs({api.swift: ('swift_get_object',)})
+    def test_download_range(self):
+        container = self.containers.first()
+        obj = api.swift.StorageObject({'name': u'test.txt',
+                                       'bytes': 4,
+                                       'etag': 'object_hash',
+                                       'content_range': 'bytes 0-3/9'},
+                                      container.name,
+                                      data=iter(['Fa', 'ke']))
+        api.swift.swift_get_object(IsA(http.HttpRequest),
+                                   container.name,
+                                   obj.name,
+                                   resp_chunk_size=512 * 1024,
+                                   byte_range='bytes=0-3').AndReturn(obj)
+        self.mox.ReplayAll()
+
+        download_url = reverse('horizon:project:containers:object_download',
+                               args=[container.name, obj.name])
+        res = self.client.get(download_url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(206, res.status_code)
+        self.assertEqual('Fake', _response_content(res))
+        self.assertEqual('4', res['Content-Length'])
+        self.assertEqual('bytes 0-3/9', res['Content-Range'])
+        self.assertEqual('object_hash', res['ETag'])
+
     @test.create_stubs({api.swift: ('swift_get_containers',)})
     def test_copy_index(self):
         ret = (self.containers.list(), False)
@@ -438,7 +480,8 @@ class SwiftTests(test.TestCase):
         api.swift.swift_upload_object(IsA(http.HttpRequest),
                                       container.name,
                                       obj.name,
-                                      IsA(InMemoryUploadedFile)).AndReturn(obj)
+                                      IsA(InMemoryUploadedFile),
+                                      progress=IgnoreArg()).AndReturn(obj)
         self.mox.ReplayAll()
 
         update_url = reverse('horizon:project:containers:object_update',
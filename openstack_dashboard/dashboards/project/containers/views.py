@@ -21,10 +21,13 @@ Views for managing Swift containers.
 """
 
 import os
+import re
 
+from django.conf import settings
 from django import http
 from django.utils.functional import cached_property  # noqa
 from django.utils.translation import ugettext_lazy as _
+from django import VERSION  # noqa
 from django.views import generic
 
 from horizon import browsers
@@ -188,10 +191,24 @@ class UploadView(forms.ModalFormView):
         return context
 
 
+# Only single byte ranges are passed on to Swift; for anything else the
+# whole object is returned, as allowed by RFC 2616.
+SINGLE_BYTE_RANGE = re.compile(r'^bytes=(\d+-\d*|-\d+)$')
+
+
 def object_download(request, container_name, object_path):
+    byte_range = request.META.get('HTTP_RANGE', '').replace(' ', '')
+    if not SINGLE_BYTE_RANGE.match(byte_range):
+        byte_range = None
+    chunk_size = getattr(settings, 'SWIFT_FILE_TRANSFER_CHUNK_SIZE',
+                         512 * 1024)
     try:
-        obj = api.swift.swift_get_object(request, container_name, object_path)
-    except Exception:
+        obj = api.swift.swift_get_object(request, container_name, object_path,
+                                         resp_chunk_size=chunk_size,
+                                         byte_range=byte_range)
+    except Exception as e:
+        if byte_range and getattr(e, 'http_status', None) == 416:
+            return http.HttpResponse(status=416)
         redirect = reverse("horizon:project:containers:index")
         exceptions.handle(request,
                           _("Unable to retrieve object."),
@@ -202,11 +219,25 @@ def object_download(request, container_name, object_path):
     if not os.path.splitext(obj.name)[1] and obj.orig_name:
         name, ext = os.path.splitext(obj.orig_name)
         filename = "%s%s" % (filename, ext)
-    response = http.HttpResponse()
+    # The contents are streamed from Swift, so they are never held in memory
+    # as a whole. Before Django 1.5 a plain HttpResponse consumes an iterator
+    # lazily as well.
+    if VERSION >= (1, 5, 0):
+        response = http.StreamingHttpResponse(obj.data)
+    else:
+        response = http.HttpResponse(obj.data)
     safe_name = filename.replace(",", "").encode('utf-8')
     response['Content-Disposition'] = 'attachment; filename="%s"' % safe_name
     response['Content-Type'] = 'application/octet-stream'
-    response.write(obj.data)
+    response['Accept-Ranges'] = 'bytes'
+    if getattr(obj, 'bytes', None) is not None:
+        response['Content-Length'] = obj.bytes
+    if getattr(obj, 'etag', None):
+        response['ETag'] = obj.etag
+    content_range = getattr(obj, 'content_range', None)
+    if byte_range and content_range:
+        response.status_code = 206
+        response['Content-Range'] = content_range
     return response
 
 
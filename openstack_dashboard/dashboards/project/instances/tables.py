@@ -13,6 +13,7 @@
 #    under the License.
 
 
+import functools
 import logging
 
 from django.conf import settings
@@ -44,6 +45,7 @@ from openstack_dashboard.dashboards.project.instances.workflows \
 from openstack_dashboard.dashboards.project.instances.workflows \
     import update_instance
 from openstack_dashboard import policy
+from openstack_dashboard.usage import quotas
 
 
 LOG = logging.getLogger(__name__)
@@ -106,6 +108,7 @@ class TerminateInstance(policy.PolicyTargetMixin, tables.BatchAction):
 
     def action(self, request, obj_id):
         api.nova.server_delete(request, obj_id)
+        quotas.tenant_quota_usages.invalidate(request)
 
 
 class RebootInstance(policy.PolicyTargetMixin, tables.BatchAction):
@@ -476,6 +479,7 @@ class RevertResize(policy.PolicyTargetMixin, tables.Action):
 
     def single(self, table, request, instance):
         api.nova.server_revert_resize(request, instance)
+        quotas.tenant_quota_usages.invalidate(request)
 
 
 class RebuildInstance(policy.PolicyTargetMixin, tables.LinkAction):
@@ -561,6 +565,7 @@ class SimpleAssociateIP(policy.PolicyTargetMixin, tables.Action):
                 request, instance_id).split('_')[0]
 
             fip = api.network.tenant_floating_ip_allocate(request)
+            quotas.tenant_quota_usages.invalidate(request)
             api.network.floating_ip_associate(request, fip.id, target_id)
             messages.success(request,
                              _("Successfully associated floating IP: %s")
@@ -647,6 +652,48 @@ class UpdateRow(tables.Row):
             messages.error(request, error)
         return instance
 
+    def get_data_many(self, request, instance_ids):
+        # The instances are fetched concurrently (at most API_MAX_WORKERS
+        # at a time) and the flavors are listed once instead of a flavor_get
+        # for each row.
+        futures = api.base.gather(*[
+            functools.partial(api.nova.server_get, request, instance_id)
+            for instance_id in instance_ids])
+        data = {}
+        for instance_id, future in zip(instance_ids, futures):
+            try:
+                data[instance_id] = future.result()
+            except Exception:
+                error = exceptions.handle(request, ignore=True)
+                if error is not exceptions.NotFound:
+                    data[instance_id] = None
+        if not any(data.values()):
+            return data
+        try:
+            flavors = dict((str(flavor.id), flavor)
+                           for flavor in api.nova.flavor_list(request))
+        except Exception:
+            exceptions.handle(request, ignore=True)
+            flavors = {}
+        for instance_id, instance in data.items():
+            if instance is None:
+                continue
+            flavor_id = instance.flavor["id"]
+            try:
+                if flavor_id in flavors:
+                    instance.full_flavor = flavors[flavor_id]
+                else:
+                    instance.full_flavor = api.nova.flavor_get(request,
+                                                               flavor_id)
+            except Exception:
+                exceptions.handle(request, ignore=True)
+                data[instance_id] = None
+                continue
+            error = get_instance_error(instance)
+            if error:
+                messages.error(request, error)
+        return data
+
 
 class StartInstance(policy.PolicyTargetMixin, tables.BatchAction):
     name = "start"
@@ -28,6 +28,7 @@ from django.utils import encoding
 from django.utils.http import urlencode
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
 
 from horizon import exceptions
 from horizon.workflows import views
@@ -96,12 +97,16 @@ class InstanceTests(helpers.TestCase):
         self.assertItemsEqual(instances, self.servers.list())
         self.assertNotContains(res, "Launch Instance (Quota exceeded)")
 
-    @helpers.create_stubs({api.nova: ('server_list',
-                                   'tenant_absolute_limits',)})
+    @helpers.create_stubs({api.nova: ('server_list', 'flavor_list',
+                                   'tenant_absolute_limits',),
+                           api.glance: ('image_list_detailed',)})
     def test_index_server_list_exception(self):
         search_opts = {'marker': None, 'paginate': True}
         api.nova.server_list(IsA(http.HttpRequest), search_opts=search_opts) \
             .AndRaise(self.exceptions.nova)
+        # flavor_list and image_list_detailed are stubbed without expected
+        # calls: they may have been started alongside server_list, but their
+        # results must not be used once it fails.
         api.nova.tenant_absolute_limits(IsA(http.HttpRequest), reserved=True) \
            .MultipleTimes().AndReturn(self.limits['absolute'])
 
@@ -1573,6 +1578,7 @@ class InstanceTests(helpers.TestCase):
                                disk_config=disk_config_value)
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
+        quotas.tenant_quota_usages.invalidate(IsA(http.HttpRequest))
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
 
@@ -1699,6 +1705,7 @@ class InstanceTests(helpers.TestCase):
                                disk_config=u'AUTO')
         quotas.tenant_quota_usages(IsA(http.HttpRequest)) \
                 .AndReturn(quota_usages)
+        quotas.tenant_quota_usages.invalidate(IsA(http.HttpRequest))
 
         self.mox.ReplayAll()
 
@@ -1826,6 +1833,7 @@ class InstanceTests(helpers.TestCase):
                                instance_count=IsA(int),
                                admin_pass=u'',
                                disk_config='MANUAL')
+        quotas.tenant_quota_usages.invalidate(IsA(http.HttpRequest))
 
         self.mox.ReplayAll()
 
@@ -3328,6 +3336,99 @@ class InstanceAjaxTests(helpers.TestCase):
         self.assertEqual(messages[0][0], 'error')
         self.assertTrue(messages[0][1].startswith('Failed'))
 
+    @helpers.create_stubs({api.nova: ("server_get",
+                                      "flavor_list",
+                                      "extension_supported"),
+                           api.neutron: ("is_extension_supported",)})
+    def test_rows_update(self):
+        servers = self.servers.list()
+        deleted_id = str(uuid.uuid4())
+
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest))\
+            .MultipleTimes().AndReturn(True)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                                           'security-group')\
+            .MultipleTimes().AndReturn(True)
+        # The instances are fetched concurrently.
+        for server in servers[:2]:
+            api.nova.server_get(IsA(http.HttpRequest), server.id) \
+                .InAnyOrder().AndReturn(server)
+        api.nova.server_get(IsA(http.HttpRequest), deleted_id) \
+            .InAnyOrder().AndRaise(nova_exceptions.NotFound(404))
+        api.nova.flavor_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.flavors.list())
+
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', servers[0].id),
+                  ('obj_id', servers[1].id),
+                  ('obj_id', deleted_id)]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(res.content)
+        self.assertEqual(sorted([servers[0].id, servers[1].id]),
+                         sorted(data['rows']))
+        self.assertIn(servers[1].name, data['rows'][servers[1].id])
+        self.assertEqual([deleted_id], data['deleted'])
+        self.assertEqual([], data['failed'])
+
+    @helpers.create_stubs({api.nova: ("server_get",)})
+    def test_rows_update_all_deleted(self):
+        deleted_id = str(uuid.uuid4())
+        api.nova.server_get(IsA(http.HttpRequest), deleted_id) \
+            .AndRaise(nova_exceptions.NotFound(404))
+
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', deleted_id)]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = json.loads(res.content)
+        self.assertEqual({}, data['rows'])
+        self.assertEqual([deleted_id], data['deleted'])
+
+    @django.test.utils.override_settings(API_MAX_WORKERS=1)
+    @helpers.create_stubs({api.nova: ("server_get",
+                                      "flavor_list",
+                                      "flavor_get",
+                                      "extension_supported"),
+                           api.neutron: ("is_extension_supported",)})
+    def test_rows_update_flavor_error(self):
+        servers = self.servers.list()[:2]
+        flavor = self.flavors.first()
+        servers[0].flavor = {'id': flavor.id}
+        servers[1].flavor = {'id': 'missing'}
+
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest))\
+            .MultipleTimes().AndReturn(True)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                                           'security-group')\
+            .MultipleTimes().AndReturn(True)
+        # More rows than API_MAX_WORKERS are still fetched one by one.
+        for server in servers:
+            api.nova.server_get(IsA(http.HttpRequest), server.id) \
+                .InAnyOrder().AndReturn(server)
+        api.nova.flavor_list(IsA(http.HttpRequest)).AndReturn([flavor])
+        api.nova.flavor_get(IsA(http.HttpRequest), 'missing') \
+            .AndRaise(self.exceptions.nova)
+
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', servers[0].id),
+                  ('obj_id', servers[1].id)]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        # Only the row whose flavor couldn't be retrieved fails.
+        data = json.loads(res.content)
+        self.assertEqual([servers[0].id], list(data['rows']))
+        self.assertEqual([servers[1].id], data['failed'])
+
 
 class ConsoleManagerTests(helpers.TestCase):
 
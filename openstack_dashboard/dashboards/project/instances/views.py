@@ -19,6 +19,8 @@
 """
 Views for managing instances.
 """
+import functools
+
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django import http
@@ -58,18 +60,29 @@ class IndexView(tables.DataTableView):
         marker = self.request.GET.get(
             project_tables.InstancesTable._meta.pagination_param, None)
         search_opts = self.get_filters({'marker': marker, 'paginate': True})
+        # Flavors and images don't depend on the instances, so fetch all
+        # three concurrently.
+        servers, flavors, images = api.base.gather(
+            functools.partial(api.nova.server_list, self.request,
+                              search_opts=search_opts),
+            functools.partial(api.nova.flavor_list, self.request),
+            # TODO(gabriel): Handle pagination.
+            functools.partial(api.glance.image_list_detailed, self.request))
         # Gather our instances
         try:
-            instances, self._more = api.nova.server_list(
-                self.request,
-                search_opts=search_opts)
+            instances, self._more = servers.result()
         except Exception:
             self._more = False
             instances = []
             exceptions.handle(self.request,
                               _('Unable to retrieve instances.'))
 
-        if instances:
+        if not instances:
+            # Flavors and images are only needed to describe the instances;
+            # drop the calls which haven't started and ignore the others.
+            flavors.cancel()
+            images.cancel()
+        else:
             try:
                 api.network.servers_update_addresses(self.request, instances)
             except Exception:
@@ -80,15 +93,13 @@ class IndexView(tables.DataTableView):
 
             # Gather our flavors and images and correlate our instances to them
             try:
-                flavors = api.nova.flavor_list(self.request)
+                flavors = flavors.result()
             except Exception:
                 flavors = []
                 exceptions.handle(self.request, ignore=True)
 
             try:
-                # TODO(gabriel): Handle pagination.
-                images, more, prev = api.glance.image_list_detailed(
-                    self.request)
+                images, more, prev = images.result()
             except Exception:
                 images = []
                 exceptions.handle(self.request, ignore=True)
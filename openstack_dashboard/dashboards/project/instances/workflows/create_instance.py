@@ -790,6 +790,7 @@ class LaunchInstance(workflows.Workflow):
                                    instance_count=int(context['count']),
                                    admin_pass=context['admin_pass'],
                                    disk_config=context.get('disk_config'))
+            quotas.tenant_quota_usages.invalidate(request)
             return True
         except Exception:
             exceptions.handle(request)
@@ -29,7 +29,7 @@ JSON_URL = reverse('horizon:project:network_topology:json')
 
 class NetworkTopologyTests(test.TestCase):
 
-    @test.create_stubs({api.nova: ('server_list',),
+    @test.create_stubs({api.nova: ('server_iter',),
                         api.neutron: ('network_list_for_tenant',
                                       'network_list',
                                       'router_list',
@@ -39,15 +39,15 @@ class NetworkTopologyTests(test.TestCase):
 
     @django.test.utils.override_settings(
         OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
-    @test.create_stubs({api.nova: ('server_list',),
+    @test.create_stubs({api.nova: ('server_iter',),
                         api.neutron: ('network_list_for_tenant',
                                       'port_list')})
     def test_json_view_router_disabled(self):
         self._test_json_view(router_enable=False)
 
     def _test_json_view(self, router_enable=True):
-        api.nova.server_list(
-            IsA(http.HttpRequest)).AndReturn([self.servers.list(), False])
+        api.nova.server_iter(
+            IsA(http.HttpRequest)).AndReturn(iter(self.servers.list()))
         tenant_networks = [net for net in self.networks.list()
                           if not net['router:external']]
         external_networks = [net for net in self.networks.list()
@@ -148,3 +148,56 @@ class NetworkTopologyTests(test.TestCase):
                  'network_id': ext_net.id,
                  'fixed_ips': []})
         self.assertEqual(expect_port_urls, data['ports'])
+
+    def _stub_topology(self, servers):
+        api.nova.server_iter(IsA(http.HttpRequest)).AndReturn(iter(servers))
+        api.neutron.network_list_for_tenant(
+            IsA(http.HttpRequest),
+            self.tenant.id).AndReturn(self.networks.list())
+        api.neutron.port_list(
+            IsA(http.HttpRequest)).AndReturn(self.ports.list())
+
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_stubs({api.nova: ('server_iter',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    def test_json_view_not_modified(self):
+        self._stub_topology(self.servers.list())
+        self._stub_topology(self.servers.list())
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        self.assertEqual(200, res.status_code)
+        etag = res['ETag']
+
+        res = self.client.get(JSON_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, res.status_code)
+        self.assertEqual(etag, res['ETag'])
+
+    @django.test.utils.override_settings(
+        OPENSTACK_NEUTRON_NETWORK={'enable_router': False})
+    @test.create_stubs({api.nova: ('server_iter',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'port_list')})
+    def test_json_view_since(self):
+        servers = self.servers.list()
+        self._stub_topology(servers)
+        # The first server is deleted, the second one stopped.
+        self._stub_topology(servers[1:])
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        etag = res['ETag']
+        servers[1].status = 'SHUTOFF'
+
+        res = self.client.get(JSON_URL, {'since': etag.strip('"')})
+        self.assertEqual(200, res.status_code)
+        self.assertNotEqual(etag, res['ETag'])
+        data = json.loads(res.content)
+        self.assertEqual(etag.strip('"'), data['since'])
+        self.assertEqual([servers[1].id],
+                         [s['id'] for s in data['changed']['servers']])
+        self.assertEqual([servers[0].id], data['removed']['servers'])
+        self.assertEqual([], data['changed']['networks'])
+        self.assertEqual([], data['removed']['ports'])
@@ -16,16 +16,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
-
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
-from django.http import HttpResponse  # noqa
 from django.views.generic import TemplateView  # noqa
 from django.views.generic import View  # noqa
 
 from openstack_dashboard import api
+from openstack_dashboard.utils import polling
 
 from openstack_dashboard.dashboards.project.network_topology.instances \
     import tables as instances_tables
@@ -142,7 +140,7 @@ class JSONView(View):
     def _get_servers(self, request):
         # Get nova data
         try:
-            servers, more = api.nova.server_list(request)
+            servers = list(api.nova.server_iter(request))
         except Exception:
             servers = []
         console_type = getattr(settings, 'CONSOLE_TYPE', 'AUTO')
@@ -268,5 +266,9 @@ class JSONView(View):
                 'ports': self._get_ports(request),
                 'routers': self._get_routers(request)}
         self._prepare_gateway_ports(data['routers'], data['ports'])
-        json_string = json.dumps(data, ensure_ascii=False)
-        return HttpResponse(json_string, content_type='text/json')
+        # Unchanged topologies are answered with 304 Not Modified, and only
+        # the changed nodes are sent to the polls asking for them.
+        return polling.json_response(request, data,
+                                     ('servers', 'networks', 'ports',
+                                      'routers'),
+                                     content_type='text/json')
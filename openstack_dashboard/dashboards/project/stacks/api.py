@@ -22,16 +22,35 @@ class Stack(object):
     pass
 
 
-def d3_data(request, stack_id=''):
+def get_stack(request, stack_id):
+    """Returns the stack, or a stand-in for it once it's been deleted."""
     try:
-        stack = heat.stack_get(request, stack_id)
+        return heat.stack_get(request, stack_id)
     except Exception:
         stack = Stack()
         stack.id = stack_id
         stack.stack_name = request.session.get('stack_name', '')
         stack.stack_status = 'DELETE_COMPLETE'
         stack.stack_status_reason = 'DELETE_COMPLETE'
+        return stack
+
+
+def stack_version(stack):
+    """Returns a value which changes whenever the topology of the stack
+    may change, or ``None`` while an action on the stack is in progress.
+    """
+    if getattr(stack, 'status', None) == 'IN_PROGRESS':
+        return None
+    return [stack.id, stack.stack_status, stack.stack_status_reason,
+            getattr(stack, 'updated_time', None)]
 
+
+def d3_nodes(request, stack):
+    """Returns the topology of the stack, without the info boxes of the
+    resources, and a dict of its resources by name.
+
+    See :func:`resource_info_box` for the info boxes.
+    """
     try:
         resources = heat.resources_list(request, stack.stack_name)
     except Exception:
@@ -50,34 +69,47 @@ def d3_data(request, stack_id=''):
             'image_y': -30,
             'text_x': 40,
             'text_y': ".35em",
-            'in_progress': (stack.status == 'IN_PROGRESS'),
+            'in_progress': (getattr(stack, 'status', None) == 'IN_PROGRESS'),
             'info_box': sro.stack_info(stack, stack_image)
         }
         d3_data['stack'] = stack_node
 
-    if resources:
-        for resource in resources:
-            resource_image = mappings.get_resource_image(
-                resource.resource_status,
-                resource.resource_type)
-            resource_status = mappings.get_resource_status(
-                resource.resource_status)
-            if resource_status in ('IN_PROGRESS', 'INIT'):
-                in_progress = True
-            else:
-                in_progress = False
-            resource_node = {
-                'name': resource.resource_name,
-                'status': resource.resource_status,
-                'image': resource_image,
-                'required_by': resource.required_by,
-                'image_size': 50,
-                'image_x': -25,
-                'image_y': -25,
-                'text_x': 35,
-                'text_y': ".35em",
-                'in_progress': in_progress,
-                'info_box': sro.resource_info(resource)
-            }
-            d3_data['nodes'].append(resource_node)
+    for resource in resources:
+        resource_image = mappings.get_resource_image(
+            resource.resource_status,
+            resource.resource_type)
+        resource_status = mappings.get_resource_status(
+            resource.resource_status)
+        if resource_status in ('IN_PROGRESS', 'INIT'):
+            in_progress = True
+        else:
+            in_progress = False
+        resource_node = {
+            'name': resource.resource_name,
+            'status': resource.resource_status,
+            # The info box also shows these.
+            'status_reason': resource.resource_status_reason,
+            'type': resource.resource_type,
+            'image': resource_image,
+            'required_by': resource.required_by,
+            'image_size': 50,
+            'image_x': -25,
+            'image_y': -25,
+            'text_x': 35,
+            'text_y': ".35em",
+            'in_progress': in_progress,
+        }
+        d3_data['nodes'].append(resource_node)
+    return d3_data, dict((r.resource_name, r) for r in resources)
+
+
+def resource_info_box(resources, node):
+    """Adds the info box of its resource to a node made by d3_nodes."""
+    node['info_box'] = sro.resource_info(resources[node['name']])
+
+
+def d3_data(request, stack_id=''):
+    d3_data, resources = d3_nodes(request, get_stack(request, stack_id))
+    for node in d3_data['nodes']:
+        resource_info_box(resources, node)
     return json.dumps(d3_data)
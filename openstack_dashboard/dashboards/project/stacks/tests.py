@@ -19,6 +19,8 @@ from django import http
 from django.test.utils import override_settings  # noqa
 from django.utils import html
 
+from heatclient.v1 import resources
+from heatclient.v1 import stacks
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
@@ -469,6 +471,68 @@ class StackTests(test.TestCase):
         self.assertFormErrors(res, 1)
         self.assertFormError(res, "form", 'stack_name', error)
 
+    def _stub_stack_get(self, stack, times, **info):
+        # Each request gets its own copy of the stack.
+        for i in range(times):
+            api.heat.stack_get(IsA(http.HttpRequest), stack.id) \
+                .AndReturn(stacks.Stack(stacks.StackManager(None),
+                                        dict(stack._info, **info)))
+
+    def _stack_resources(self, stack):
+        return [resources.Resource(resources.ResourceManager(None), {
+            'resource_name': 'server%d' % i,
+            'resource_status': 'CREATE_COMPLETE',
+            'resource_status_reason': 'state changed',
+            'resource_type': 'OS::Nova::Server',
+            'required_by': [],
+            'physical_resource_id': 'server-id-%d' % i}) for i in range(2)]
+
+    @test.create_stubs({api.heat: ('stack_get', 'resources_list')})
+    def test_d3_data_not_modified(self):
+        stack = self.stacks.first()
+        url = reverse('horizon:project:stacks:d3_data', args=[stack.id])
+        self._stub_stack_get(stack, 2)
+        # The resources aren't listed again while the stack is unchanged.
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(self._stack_resources(stack))
+        self.mox.ReplayAll()
+
+        res = self.client.get(url)
+        self.assertEqual(200, res.status_code)
+        data = json.loads(res.content)
+        self.assertEqual(['server0', 'server1'],
+                         [node['name'] for node in data['nodes']])
+        self.assertIn('OS::Nova::Server', data['nodes'][0]['info_box'])
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(304, res.status_code)
+
+    @test.create_stubs({api.heat: ('stack_get', 'resources_list')})
+    def test_d3_data_since(self):
+        stack = self.stacks.first()
+        stack_resources = self._stack_resources(stack)
+        url = reverse('horizon:project:stacks:d3_data', args=[stack.id])
+        self._stub_stack_get(stack, 2, stack_status='UPDATE_IN_PROGRESS')
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(stack_resources)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(stack_resources[1:])
+        self.mox.ReplayAll()
+
+        res = self.client.get(url)
+        etag = res['ETag'].strip('"')
+        stack_resources[1].resource_status = 'UPDATE_IN_PROGRESS'
+
+        res = self.client.get(url, {'since': etag})
+        data = json.loads(res.content)
+        self.assertEqual(etag, data['since'])
+        self.assertEqual(['server0'], data['removed']['nodes'])
+        self.assertEqual(['server1'],
+                         [node['name'] for node in data['changed']['nodes']])
+        self.assertTrue(data['changed']['nodes'][0]['in_progress'])
+        self.assertIn('info_box', data['changed']['nodes'][0])
+        self.assertIn('info_box', data['stack'])
+
 
 class TemplateFormTests(test.TestCase):
 
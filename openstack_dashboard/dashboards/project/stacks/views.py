@@ -16,7 +16,7 @@ from operator import attrgetter
 
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
-from django.http import HttpResponse  # noqa
+from django.utils import translation
 from django.utils.translation import ugettext_lazy as _
 import django.views.generic
 
@@ -34,6 +34,7 @@ from openstack_dashboard.dashboards.project.stacks \
     import tables as project_tables
 from openstack_dashboard.dashboards.project.stacks \
     import tabs as project_tabs
+from openstack_dashboard.utils import polling
 
 
 LOG = logging.getLogger(__name__)
@@ -263,5 +264,17 @@ class ResourceView(tabs.TabView):
 
 class JSONView(django.views.generic.View):
     def get(self, request, stack_id=''):
-        return HttpResponse(project_api.d3_data(request, stack_id=stack_id),
-                            content_type="application/json")
+        stack = project_api.get_stack(request, stack_id)
+        # The resources of a stack only change during an action on it, so
+        # while there's none the topology can be tagged without listing them.
+        version = project_api.stack_version(stack)
+        etag = None
+        if version is not None:
+            etag = polling.fingerprint([translation.get_language(), version])
+            if polling.etag_matches(request, etag):
+                return polling.not_modified(etag)
+        d3_data, resources = project_api.d3_nodes(request, stack)
+        return polling.json_response(
+            request, d3_data, ('nodes',), key='name', etag=etag,
+            complete=lambda name, node: project_api.resource_info_box(
+                resources, node))
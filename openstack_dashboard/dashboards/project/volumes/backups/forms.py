@@ -27,6 +27,7 @@ from horizon import messages
 from openstack_dashboard import api
 from openstack_dashboard.dashboards.project.containers \
     import forms as containers_forms
+from openstack_dashboard.usage import quotas
 
 
 class CreateBackupForm(forms.SelfHandlingForm):
@@ -95,6 +96,7 @@ class RestoreBackupForm(forms.SelfHandlingForm):
             restore = api.cinder.volume_backup_restore(request,
                                                        backup_id,
                                                        volume_id)
+            quotas.tenant_quota_usages.invalidate(request)
 
             # Needed for cases when a new volume is created.
             volume_id = restore.volume_id
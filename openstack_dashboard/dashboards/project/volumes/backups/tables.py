@@ -123,6 +123,8 @@ class BackupsTable(tables.DataTable):
 
     class Meta:
         name = "volume_backups"
+        pagination_param = 'backup_marker'
+        prev_pagination_param = 'prev_backup_marker'
         verbose_name = _("Volume Backups")
         status_columns = ("status",)
         row_class = UpdateRow
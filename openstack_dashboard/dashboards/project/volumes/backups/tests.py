@@ -52,9 +52,9 @@ class VolumeBackupsViewTests(test.TestCase):
         self.assertMessageCount(error=0, warning=0)
         self.assertRedirectsNoFollow(res, VOLUME_BACKUPS_TAB_URL)
 
-    @test.create_stubs({api.cinder: ('volume_list',
+    @test.create_stubs({api.cinder: ('volumes_get',
                                      'volume_backup_supported',
-                                     'volume_backup_list',
+                                     'volume_backup_list_paged',
                                      'volume_backup_delete')})
     def test_delete_volume_backup(self):
         vol_backups = self.cinder_volume_backups.list()
@@ -63,16 +63,20 @@ class VolumeBackupsViewTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        api.cinder.volume_backup_list(IsA(http.HttpRequest)). \
-            AndReturn(vol_backups)
-        api.cinder.volume_list(IsA(http.HttpRequest)). \
-            AndReturn(volumes)
+        api.cinder.volume_backup_list_paged(
+            IsA(http.HttpRequest), marker=None, paginate=True,
+            sort_dir='desc').AndReturn([vol_backups, False, False])
+        api.cinder.volumes_get(IsA(http.HttpRequest),
+                               [b.volume_id for b in vol_backups]). \
+            AndReturn(dict((v.id, v) for v in volumes))
         api.cinder.volume_backup_delete(IsA(http.HttpRequest), backup.id)
 
-        api.cinder.volume_backup_list(IsA(http.HttpRequest)). \
-            AndReturn(vol_backups)
-        api.cinder.volume_list(IsA(http.HttpRequest)). \
-            AndReturn(volumes)
+        api.cinder.volume_backup_list_paged(
+            IsA(http.HttpRequest), marker=None, paginate=True,
+            sort_dir='desc').AndReturn([vol_backups, False, False])
+        api.cinder.volumes_get(IsA(http.HttpRequest),
+                               [b.volume_id for b in vol_backups]). \
+            AndReturn(dict((v.id, v) for v in volumes))
         self.mox.ReplayAll()
 
         formData = {'action':
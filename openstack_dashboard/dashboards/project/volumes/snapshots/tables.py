@@ -24,6 +24,7 @@ from openstack_dashboard import api
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
 from openstack_dashboard import policy
+from openstack_dashboard.usage import quotas
 
 from openstack_dashboard.dashboards.project.volumes \
     .volumes import tables as volume_tables
@@ -58,6 +59,7 @@ class DeleteVolumeSnapshot(policy.PolicyTargetMixin, tables.DeleteAction):
 
     def delete(self, request, obj_id):
         api.cinder.volume_snapshot_delete(request, obj_id)
+        quotas.tenant_quota_usages.invalidate(request)
 
 
 class EditVolumeSnapshot(policy.PolicyTargetMixin, tables.LinkAction):
@@ -130,6 +132,8 @@ class VolumeSnapshotsTable(volume_tables.VolumesTableBase):
 
     class Meta:
         name = "volume_snapshots"
+        pagination_param = 'snapshot_marker'
+        prev_pagination_param = 'prev_snapshot_marker'
         verbose_name = _("Volume Snapshots")
         table_actions = (DeleteVolumeSnapshot,)
         row_actions = (CreateVolumeFromSnapshot, LaunchSnapshot,
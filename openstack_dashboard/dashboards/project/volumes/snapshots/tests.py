@@ -105,8 +105,8 @@ class VolumeSnapshotsViewTests(test.TestCase):
         res = self.client.post(url, formData)
         self.assertRedirectsNoFollow(res, VOLUME_SNAPSHOTS_TAB_URL)
 
-    @test.create_stubs({api.cinder: ('volume_snapshot_list',
-                                     'volume_list',
+    @test.create_stubs({api.cinder: ('volume_snapshot_list_paged',
+                                     'volumes_get',
                                      'volume_backup_supported',
                                      'volume_snapshot_delete')})
     def test_delete_volume_snapshot(self):
@@ -116,16 +116,18 @@ class VolumeSnapshotsViewTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        api.cinder.volume_snapshot_list(IsA(http.HttpRequest)). \
-            AndReturn(vol_snapshots)
-        api.cinder.volume_list(IsA(http.HttpRequest)). \
-            AndReturn(volumes)
+        api.cinder.volume_snapshot_list_paged(
+            IsA(http.HttpRequest), marker=None, paginate=True,
+            sort_dir='desc').AndReturn([vol_snapshots, False, False])
+        api.cinder.volumes_get(IsA(http.HttpRequest),
+                               [s.volume_id for s in vol_snapshots]). \
+            AndReturn(dict((v.id, v) for v in volumes))
 
         api.cinder.volume_snapshot_delete(IsA(http.HttpRequest), snapshot.id)
-        api.cinder.volume_snapshot_list(IsA(http.HttpRequest)). \
-            AndReturn([])
-        api.cinder.volume_list(IsA(http.HttpRequest)). \
-            AndReturn(volumes)
+        api.cinder.volume_snapshot_list_paged(
+            IsA(http.HttpRequest), marker=None, paginate=True,
+            sort_dir='desc').AndReturn([[], False, False])
+        api.cinder.volumes_get(IsA(http.HttpRequest), []).AndReturn({})
         self.mox.ReplayAll()
 
         formData = {'action':
@@ -12,10 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon import messages
 from horizon import tabs
 
 from openstack_dashboard import api
@@ -28,33 +28,56 @@ from openstack_dashboard.dashboards.project.volumes.volumes \
     import tables as volume_tables
 
 
-class VolumeTableMixIn(object):
+class PagedTableMixin(object):
+    """Marker based pagination for the single table of a tab.
+
+    The ``get_*_data`` method fetches its page with the marker and sort
+    direction returned by :meth:`_get_marker` and stores the paging flags
+    with :meth:`_set_page`.
+    """
+    _has_prev_data = False
+    _has_more_data = False
+
+    def has_prev_data(self, table):
+        return self._has_prev_data
+
+    def has_more_data(self, table):
+        return self._has_more_data
+
+    def _get_marker(self):
+        meta = self.table_classes[0]._meta
+        prev_marker = self.request.GET.get(meta.prev_pagination_param, None)
+        if prev_marker is not None:
+            return prev_marker, "asc"
+        return self.request.GET.get(meta.pagination_param, None), "desc"
+
+    def _set_page(self, items, has_more_data, has_prev_data, sort_dir):
+        self._has_more_data = has_more_data
+        self._has_prev_data = has_prev_data
+        # A previous page is fetched in ascending order.
+        if sort_dir == "asc":
+            items.reverse()
+        return items
+
+
+class VolumeTableMixIn(PagedTableMixin):
     def _get_volumes(self, search_opts=None):
+        marker, sort_dir = self._get_marker()
         try:
-            return api.cinder.volume_list(self.request,
-                                          search_opts=search_opts)
+            volumes, has_more, has_prev = api.cinder.volume_list_paged(
+                self.request, search_opts=search_opts, marker=marker,
+                paginate=True, sort_dir=sort_dir)
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve volume list.'))
             return []
+        return self._set_page(volumes, has_more, has_prev, sort_dir)
 
-    def _get_instances(self, search_opts=None):
-        try:
-            instances, has_more = api.nova.server_list(self.request,
-                                                       search_opts=search_opts)
-            return instances
-        except Exception:
-            exceptions.handle(self.request,
-                              _("Unable to retrieve volume/instance "
-                                "attachment information"))
-            return []
-
-    def _set_attachments_string(self, volumes, instances):
-        instances = SortedDict([(inst.id, inst) for inst in instances])
-        for volume in volumes:
-            for att in volume.attachments:
-                server_id = att.get('server_id', None)
-                att['instance'] = instances.get(server_id, None)
+    def _update_attachment_names(self, volumes):
+        if api.cinder.volumes_update_attachment_names(self.request, volumes):
+            messages.error(self.request,
+                           _("Unable to retrieve volume/instance "
+                             "attachment information"))
 
 
 class VolumeTab(tabs.TableTab, VolumeTableMixIn):
@@ -66,12 +89,11 @@ class VolumeTab(tabs.TableTab, VolumeTableMixIn):
 
     def get_volumes_data(self):
         volumes = self._get_volumes()
-        instances = self._get_instances()
-        self._set_attachments_string(volumes, instances)
+        self._update_attachment_names(volumes)
         return volumes
 
 
-class SnapshotTab(tabs.TableTab):
+class SnapshotTab(tabs.TableTab, PagedTableMixin):
     table_classes = (vol_snapshot_tables.VolumeSnapshotsTable,)
     name = _("Volume Snapshots")
     slug = "snapshots_tab"
@@ -80,16 +102,22 @@ class SnapshotTab(tabs.TableTab):
 
     def get_volume_snapshots_data(self):
         if api.base.is_service_enabled(self.request, 'volume'):
+            marker, sort_dir = self._get_marker()
             try:
-                snapshots = api.cinder.volume_snapshot_list(self.request)
-                volumes = api.cinder.volume_list(self.request)
-                volumes = dict((v.id, v) for v in volumes)
+                snapshots, has_more, has_prev = \
+                    api.cinder.volume_snapshot_list_paged(
+                        self.request, marker=marker, paginate=True,
+                        sort_dir=sort_dir)
+                snapshots = self._set_page(snapshots, has_more, has_prev,
+                                           sort_dir)
             except Exception:
                 snapshots = []
-                volumes = {}
                 exceptions.handle(self.request, _("Unable to retrieve "
                                                   "volume snapshots."))
 
+            # Only the volumes of the snapshots on the page are retrieved.
+            volumes = api.cinder.volumes_get(
+                self.request, [s.volume_id for s in snapshots])
             for snapshot in snapshots:
                 volume = volumes.get(snapshot.volume_id)
                 setattr(snapshot, '_volume', volume)
@@ -110,10 +138,14 @@ class BackupsTab(tabs.TableTab, VolumeTableMixIn):
         return api.cinder.volume_backup_supported(self.request)
 
     def get_volume_backups_data(self):
+        marker, sort_dir = self._get_marker()
         try:
-            backups = api.cinder.volume_backup_list(self.request)
-            volumes = api.cinder.volume_list(self.request)
-            volumes = dict((v.id, v) for v in volumes)
+            backups, has_more, has_prev = api.cinder.volume_backup_list_paged(
+                self.request, marker=marker, paginate=True, sort_dir=sort_dir)
+            backups = self._set_page(backups, has_more, has_prev, sort_dir)
+            # Only the volumes of the backups on the page are retrieved.
+            volumes = api.cinder.volumes_get(
+                self.request, [b.volume_id for b in backups])
             for backup in backups:
                 backup.volume = volumes.get(backup.volume_id)
         except Exception:
@@ -28,12 +28,13 @@ VOLUME_BACKUPS_TAB_URL = reverse('horizon:project:volumes:backups_tab')
 
 class VolumeAndSnapshotsTests(test.TestCase):
     @test.create_stubs({api.cinder: ('tenant_absolute_limits',
-                                     'volume_list',
-                                     'volume_snapshot_list',
+                                     'volume_list_paged',
+                                     'volumes_get',
+                                     'volume_snapshot_list_paged',
                                      'volume_backup_supported',
-                                     'volume_backup_list',
+                                     'volume_backup_list_paged',
                                      ),
-                        api.nova: ('server_list',)})
+                        api.nova: ('server_get',)})
     def _test_index(self, backup_supported=True):
         vol_backups = self.cinder_volume_backups.list()
         vol_snaps = self.cinder_volume_snapshots.list()
@@ -41,17 +42,28 @@ class VolumeAndSnapshotsTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)).\
             MultipleTimes().AndReturn(backup_supported)
-        api.cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn(volumes)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn([self.servers.list(), False])
-        api.cinder.volume_snapshot_list(IsA(http.HttpRequest)).\
-            AndReturn(vol_snaps)
-        api.cinder.volume_list(IsA(http.HttpRequest)).AndReturn(volumes)
+        api.cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                     marker=None, paginate=True,
+                                     sort_dir='desc').\
+            AndReturn([volumes, False, False])
+        for server in self.servers.list()[:2]:
+            api.nova.server_get(IsA(http.HttpRequest), server.id).\
+                InAnyOrder().AndReturn(server)
+        api.cinder.volume_snapshot_list_paged(IsA(http.HttpRequest),
+                                              marker=None, paginate=True,
+                                              sort_dir='desc').\
+            AndReturn([vol_snaps, False, False])
+        api.cinder.volumes_get(IsA(http.HttpRequest),
+                               [s.volume_id for s in vol_snaps]).\
+            AndReturn(dict((v.id, v) for v in volumes))
         if backup_supported:
-            api.cinder.volume_backup_list(IsA(http.HttpRequest)).\
-                AndReturn(vol_backups)
-            api.cinder.volume_list(IsA(http.HttpRequest)).AndReturn(volumes)
+            api.cinder.volume_backup_list_paged(IsA(http.HttpRequest),
+                                                marker=None, paginate=True,
+                                                sort_dir='desc').\
+                AndReturn([vol_backups, False, False])
+            api.cinder.volumes_get(IsA(http.HttpRequest),
+                                   [b.volume_id for b in vol_backups]).\
+                AndReturn(dict((v.id, v) for v in volumes))
         api.cinder.tenant_absolute_limits(IsA(http.HttpRequest)).MultipleTimes(). \
             AndReturn(self.cinder_limits['absolute'])
         self.mox.ReplayAll()
@@ -362,6 +362,7 @@ class CreateForm(forms.SelfHandlingForm):
                                           metadata=metadata,
                                           availability_zone=az,
                                           source_volid=volume_id)
+            quotas.tenant_quota_usages.invalidate(request)
             message = _('Creating volume "%s"') % data['name']
             messages.info(request, message)
             return volume
@@ -490,6 +491,7 @@ class CreateSnapshotForm(forms.SelfHandlingForm):
                                                      data['name'],
                                                      data['description'],
                                                      force=force)
+            quotas.tenant_quota_usages.invalidate(request)
 
             messages.info(request, message)
             return snapshot
@@ -618,6 +620,7 @@ class ExtendForm(forms.SelfHandlingForm):
             volume = cinder.volume_extend(request,
                                           volume_id,
                                           data['new_size'])
+            quotas.tenant_quota_usages.invalidate(request)
 
             message = _('Extending volume: "%s"') % data['name']
             messages.info(request, message)
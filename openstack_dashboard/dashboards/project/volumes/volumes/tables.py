@@ -23,11 +23,13 @@ from django.utils.translation import string_concat  # noqa
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon import messages
 from horizon import tables
 
 from openstack_dashboard import api
 from openstack_dashboard.api import cinder
 from openstack_dashboard import policy
+from openstack_dashboard.usage import quotas
 
 
 DELETABLE_STATES = ("available", "error", "error_extending")
@@ -70,6 +72,7 @@ class DeleteVolume(VolumePolicyTargetMixin, tables.DeleteAction):
         name = self.table.get_object_display(obj)
         try:
             cinder.volume_delete(request, obj_id)
+            quotas.tenant_quota_usages.invalidate(request)
         except Exception:
             msg = _('Unable to delete volume "%s". One or more snapshots '
                     'depend on it.')
@@ -249,14 +252,13 @@ def get_attachment_name(request, attachment):
     server_id = attachment.get("server_id", None)
     if "instance" in attachment and attachment['instance']:
         name = attachment["instance"].name
+    elif "instance_name" in attachment:
+        name = attachment["instance_name"]
     else:
-        try:
-            server = api.nova.server_get(request, server_id)
-            name = server.name
-        except Exception:
-            name = None
-            exceptions.handle(request, _("Unable to retrieve "
-                                         "attachment information."))
+        name = api.nova.server_names(request, [server_id]).get(server_id)
+        if name is None:
+            messages.error(request, _("Unable to retrieve "
+                                      "attachment information."))
     try:
         url = reverse("horizon:project:instances:detail", args=(server_id,))
         instance = '<a href="%s">%s</a>' % (url, html.escape(name))
@@ -273,6 +275,14 @@ class AttachmentColumn(tables.Column):
     """
     def get_raw_data(self, volume):
         request = self.table.request
+        if not getattr(self.table, '_attachment_names_updated', False):
+            # Look up the servers of all the volumes in the table at once
+            # instead of one by one for each attachment.
+            self.table._attachment_names_updated = True
+            if api.cinder.volumes_update_attachment_names(
+                    request, self.table.data or [volume]):
+                messages.error(request, _("Unable to retrieve "
+                                          "attachment information."))
         link = _('Attached to %(instance)s on %(dev)s')
         attachments = []
         # Filter out "empty" attachments which the client returns...
@@ -354,6 +364,8 @@ class VolumesTable(VolumesTableBase):
 
     class Meta:
         name = "volumes"
+        pagination_param = 'volume_marker'
+        prev_pagination_param = 'prev_volume_marker'
         verbose_name = _("Volumes")
         status_columns = ["status"]
         row_class = UpdateRow
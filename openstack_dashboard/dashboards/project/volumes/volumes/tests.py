@@ -37,6 +37,12 @@ VOLUME_VOLUMES_TAB_URL = reverse('horizon:project:volumes:volumes_tab')
 
 
 class VolumeViewTests(test.TestCase):
+    def _stub_attached_servers(self):
+        # The volumes in the test data are attached to servers 1 and 2.
+        for server in self.servers.list()[:2]:
+            api.nova.server_get(IsA(http.HttpRequest), server.id)\
+                .InAnyOrder().AndReturn(server)
+
     @test.create_stubs({cinder: ('volume_create',
                                  'volume_snapshot_list',
                                  'volume_type_list',
@@ -714,10 +720,10 @@ class VolumeViewTests(test.TestCase):
         self.assertEqual(res.context['form'].errors['__all__'], expected_error)
 
     @test.create_stubs({cinder: ('tenant_absolute_limits',
-                                 'volume_list',
+                                 'volume_list_paged',
                                  'volume_backup_supported',
                                  'volume_delete',),
-                        api.nova: ('server_list',)})
+                        api.nova: ('server_get',)})
     def test_delete_volume(self):
         volumes = self.cinder_volumes.list()
         volume = self.cinder_volumes.first()
@@ -726,15 +732,17 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn(volumes)
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc').\
+            AndReturn([volumes, False, False])
+        self._stub_attached_servers()
         cinder.volume_delete(IsA(http.HttpRequest), volume.id)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn([self.servers.list(), False])
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn(volumes)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
-            AndReturn([self.servers.list(), False])
+        # The attached servers' names are known by the second listing.
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc').\
+            AndReturn([volumes, False, False])
         cinder.tenant_absolute_limits(IsA(http.HttpRequest)).MultipleTimes().\
             AndReturn(self.cinder_limits['absolute'])
 
@@ -746,10 +754,10 @@ class VolumeViewTests(test.TestCase):
                       [m.message for m in res.context['messages']])
 
     @test.create_stubs({cinder: ('tenant_absolute_limits',
-                                 'volume_list',
+                                 'volume_list_paged',
                                  'volume_backup_supported',
                                  'volume_delete',),
-                        api.nova: ('server_list',)})
+                        api.nova: ('server_get',)})
     def test_delete_volume_error_existing_snapshot(self):
         volume = self.cinder_volumes.first()
         volumes = self.cinder_volumes.list()
@@ -760,16 +768,18 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
-                           AndReturn(volumes)
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc').\
+            AndReturn([volumes, False, False])
+        self._stub_attached_servers()
         cinder.volume_delete(IsA(http.HttpRequest), volume.id).\
                              AndRaise(exc)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
-                             AndReturn([self.servers.list(), False])
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
-                           AndReturn(volumes)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
-                             AndReturn([self.servers.list(), False])
+        # The attached servers' names are known by the second listing.
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc').\
+            AndReturn([volumes, False, False])
         cinder.tenant_absolute_limits(IsA(http.HttpRequest)).MultipleTimes().\
                                    AndReturn(self.cinder_limits['absolute'])
         self.mox.ReplayAll()
@@ -917,9 +927,9 @@ class VolumeViewTests(test.TestCase):
                 msg_prefix="The create snapshot button is not disabled")
 
     @test.create_stubs({cinder: ('tenant_absolute_limits',
-                                 'volume_list',
+                                 'volume_list_paged',
                                  'volume_backup_supported',),
-                        api.nova: ('server_list',)})
+                        api.nova: ('server_get',)})
     def test_create_button_disabled_when_quota_exceeded(self):
         limits = self.cinder_limits['absolute']
         limits['totalVolumesUsed'] = limits['maxTotalVolumes']
@@ -927,10 +937,11 @@ class VolumeViewTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
-              .AndReturn(volumes)
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None)\
-              .AndReturn([self.servers.list(), False])
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc')\
+              .AndReturn([volumes, False, False])
+        self._stub_attached_servers()
         cinder.tenant_absolute_limits(IsA(http.HttpRequest))\
               .MultipleTimes().AndReturn(limits)
         self.mox.ReplayAll()
@@ -955,16 +966,16 @@ class VolumeViewTests(test.TestCase):
         self.assertContains(res, expected_string, html=True,
                             msg_prefix="The create button is not disabled")
 
-    @test.create_stubs({cinder: ('volume_get',),
-                        api.nova: ('server_get',)})
+    @test.create_stubs({cinder: ('volume_get',)})
     def test_detail_view(self):
         volume = self.cinder_volumes.first()
         server = self.servers.first()
 
-        volume.attachments = [{"server_id": server.id}]
+        # volume_get fills in the names of the attached servers.
+        volume.attachments = [{"server_id": server.id,
+                               "instance_name": server.name}]
 
         cinder.volume_get(IsA(http.HttpRequest), volume.id).AndReturn(volume)
-        api.nova.server_get(IsA(http.HttpRequest), server.id).AndReturn(server)
 
         self.mox.ReplayAll()
 
@@ -1266,10 +1277,10 @@ class VolumeViewTests(test.TestCase):
     def test_encryption_true(self):
         self._test_encryption(True)
 
-    @test.create_stubs({cinder: ('volume_list',
+    @test.create_stubs({cinder: ('volume_list_paged',
                                  'volume_backup_supported',
                                  'tenant_absolute_limits'),
-                        api.nova: ('server_list',)})
+                        api.nova: ('server_get',)})
     def _test_encryption(self, encryption):
         volumes = self.volumes.list()
         for volume in volumes:
@@ -1278,10 +1289,12 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest))\
             .MultipleTimes('backup_supported').AndReturn(False)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
-            .AndReturn(self.volumes.list())
-        api.nova.server_list(IsA(http.HttpRequest), search_opts=None)\
-            .AndReturn([self.servers.list(), False])
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts=None,
+                                 marker=None, paginate=True,
+                                 sort_dir='desc')\
+            .AndReturn([self.volumes.list(), False, False])
+        api.nova.server_get(IsA(http.HttpRequest), '1')\
+            .AndReturn(self.servers.first())
         cinder.tenant_absolute_limits(IsA(http.HttpRequest))\
             .MultipleTimes('limits').AndReturn(limits)
 
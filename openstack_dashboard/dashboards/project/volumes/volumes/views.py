@@ -53,9 +53,6 @@ class DetailView(tabs.TabView):
         try:
             volume_id = self.kwargs['volume_id']
             volume = cinder.volume_get(self.request, volume_id)
-            for att in volume.attachments:
-                att['instance'] = api.nova.server_get(self.request,
-                                                      att['server_id'])
         except Exception:
             redirect = self.get_redirect_url()
             exceptions.handle(self.request,
@@ -18,6 +18,13 @@
 
 from __future__ import absolute_import
 
+import threading
+
+from django import http
+from django.test.utils import override_settings
+from openstack_auth import user
+import requests
+
 from horizon import exceptions
 
 from openstack_dashboard.api import base as api_base
@@ -200,6 +207,321 @@ class ApiHelperTests(test.TestCase):
         with self.assertRaises(exceptions.ServiceCatalogException):
             url = api_base.url_for(self.request, 'image')
 
+    def test_url_for_secondary_endpoint_type(self):
+        for service in self.request.user.service_catalog:
+            if service['type'] == 'image':
+                del service['endpoints'][0]['internalURL']
+        with override_settings(OPENSTACK_ENDPOINT_TYPE='internalURL'):
+            with self.assertRaises(exceptions.ServiceCatalogException):
+                api_base.url_for(self.request, 'image')
+            with override_settings(SECONDARY_ENDPOINT_TYPE='publicURL'):
+                url = api_base.url_for(self.request, 'image')
+        self.assertEqual('http://public.glance.example.com:9292/v1', url)
+
+    def test_url_for_v3_catalog(self):
+        catalog = [{'type': 'compute',
+                    'name': 'nova',
+                    'endpoints': [
+                        {'region': 'RegionOne', 'interface': 'admin',
+                         'url': 'http://admin.nova.example.com:8774/v2'},
+                        {'region': 'RegionOne', 'interface': 'public',
+                         'url': 'http://public.nova.example.com:8774/v2'}]}]
+        self.request.user.service_catalog = catalog
+        self.request.user.services_region = 'RegionOne'
+        self.assertEqual('http://public.nova.example.com:8774/v2',
+                         api_base.url_for(self.request, 'compute'))
+        self.assertEqual('http://admin.nova.example.com:8774/v2',
+                         api_base.url_for(self.request, 'compute',
+                                          endpoint_type='adminURL'))
+        self.assertRaises(exceptions.ServiceCatalogException,
+                          api_base.url_for, self.request, 'compute',
+                          endpoint_type='internalURL')
+
+    def test_is_service_enabled(self):
+        self.assertTrue(api_base.is_service_enabled(self.request, 'image'))
+        self.assertTrue(api_base.is_service_enabled(self.request, 'image',
+                                                    service_name='glance'))
+        self.assertFalse(api_base.is_service_enabled(self.request, 'image',
+                                                     service_name='other'))
+        self.assertFalse(api_base.is_service_enabled(self.request,
+                                                     'notAnApi'))
+
+        self.request.user.services_region = "RegionTwo"
+        self.assertFalse(api_base.is_service_enabled(self.request, 'image'))
+        self.assertTrue(api_base.is_service_enabled(self.request,
+                                                    'identity'))
+
+    def test_catalog_index_built_once_per_token(self):
+        index = api_base.get_catalog_index(self.request.user)
+        self.assertIs(index, api_base.get_catalog_index(self.request.user))
+        self.assertEqual('glance', index['image']['service']['name'])
+
+        self.request.user.token.id = 'another-token'
+        self.assertIsNot(index,
+                         api_base.get_catalog_index(self.request.user))
+
+
+class GatherTests(test.TestCase):
+    def test_gather(self):
+        def fail():
+            raise exceptions.NotFound()
+
+        ok, failed = api_base.gather(lambda: 'ok', fail)
+        self.assertEqual('ok', ok.result())
+        self.assertRaises(exceptions.NotFound, failed.result)
+
+    @override_settings(API_MAX_WORKERS=1)
+    def test_gather_sequential(self):
+        calls = []
+        futures = api_base.gather(lambda: calls.append(1),
+                                  lambda: calls.append(2))
+        # Without workers everything has run by the time gather returns.
+        self.assertEqual([1, 2], calls)
+        self.assertTrue(all(f.done() for f in futures))
+
+
+class SharedMemoizedTests(test.TestCase):
+    def setUp(self):
+        super(SharedMemoizedTests, self).setUp()
+        self.calls = []
+
+        @api_base.shared_memoized(timeout=60)
+        def cached_call(request, value):
+            self.calls.append(value)
+            return [value]
+
+        self.cached_call = cached_call
+
+    def _new_request(self, **user_kwargs):
+        request = http.HttpRequest()
+        user_kwargs.setdefault('tenant_id', self.tenant.id)
+        request.user = user.User(id=self.user.id,
+                                 roles=[self.roles.member._info],
+                                 endpoint='http://localhost:5000/v2.0',
+                                 **user_kwargs)
+        return request
+
+    def test_shared_across_requests(self):
+        self.assertEqual([1], self.cached_call(self._new_request(), 1))
+        self.assertEqual([1], self.cached_call(self._new_request(), 1))
+        self.assertEqual([2], self.cached_call(self._new_request(), 2))
+        self.assertEqual([1, 2], self.calls)
+
+    def test_scoped_by_project(self):
+        self.cached_call(self._new_request(), 1)
+        self.cached_call(self._new_request(tenant_id='other'), 1)
+        self.assertEqual([1, 1], self.calls)
+
+    def test_scoped_by_region(self):
+        self.cached_call(self._new_request(services_region='RegionOne'), 1)
+        self.cached_call(self._new_request(services_region='RegionTwo'), 1)
+        self.assertEqual([1, 1], self.calls)
+
+    def test_invalidate(self):
+        request = self._new_request()
+        self.cached_call(request, 1)
+        self.cached_call.invalidate(request)
+        self.cached_call(request, 1)
+        self.cached_call(self._new_request(), 1)
+        self.assertEqual([1, 1], self.calls)
+
+    def test_equivalent_arguments_share_results(self):
+        flavor = APIDict.get_instance({'id': 'f1', 'foo': 'foo'})
+        self.cached_call(self._new_request(), 'a')
+        self.cached_call(self._new_request(), u'a')
+        # Wrappers are identified by their id.
+        self.cached_call(self._new_request(), flavor)
+        self.cached_call(self._new_request(),
+                         APIDict.get_instance({'id': 'f1', 'foo': 'bar'}))
+        self.assertEqual(['a', flavor], self.calls)
+
+    def test_scoped_invalidation(self):
+        @api_base.shared_memoized(timeout=60, scoped_invalidation=True)
+        def project_call(request):
+            self.calls.append(request.user.tenant_id)
+            return request.user.tenant_id
+
+        other_request = self._new_request(tenant_id='other')
+        project_call.invalidate()
+        project_call(self._new_request())
+        project_call(other_request)
+        # Only the results of the request's project are dropped.
+        project_call.invalidate(self._new_request())
+        project_call(self._new_request())
+        project_call(self._new_request(tenant_id='other'))
+        self.assertEqual([self.tenant.id, 'other', self.tenant.id],
+                         self.calls)
+
+    def test_prepare_and_restore(self):
+        @api_base.shared_memoized(timeout=60,
+                                  prepare=lambda value: value['data'],
+                                  restore=lambda request, data: {
+                                      'data': data, 'restored': True})
+        def wrapped_call(request):
+            return {'data': 'value', 'restored': False}
+
+        self.assertFalse(wrapped_call(self._new_request())['restored'])
+        value = wrapped_call(self._new_request())
+        self.assertEqual({'data': 'value', 'restored': True}, value)
+
+    @override_settings(API_CACHE_TIMEOUTS={'base_tests.cached_call': 0})
+    def test_disabled_by_timeout_setting(self):
+        request = self._new_request()
+        self.cached_call(request, 1)
+        self.cached_call(request, 1)
+        self.cached_call(self._new_request(), 1)
+        self.assertEqual([1, 1], self.calls)
+
+    def test_not_cached_without_request(self):
+        self.cached_call(None, 1)
+        self.cached_call(None, 1)
+        self.assertEqual([1, 1], self.calls)
+
+
+class RequestMemoizedTests(test.TestCase):
+    def setUp(self):
+        super(RequestMemoizedTests, self).setUp()
+        self.calls = []
+
+        @api_base.request_memoized
+        def listing(request, search_opts=None):
+            self.calls.append(search_opts)
+            return [search_opts]
+
+        @api_base.invalidates(listing)
+        def change(request):
+            pass
+
+        self.listing = listing
+        self.change = change
+
+    def test_collapsed_within_request(self):
+        request = http.HttpRequest()
+        self.assertEqual([None], self.listing(request))
+        # Defaults are filled in, so both calls are the same.
+        self.assertEqual([None], self.listing(request, search_opts=None))
+        self.listing(request, {'a': 1, 'b': 2})
+        self.listing(request, search_opts={'b': 2, 'a': 1})
+        self.listing(http.HttpRequest())
+        self.assertEqual([None, {'a': 1, 'b': 2}, None], self.calls)
+        self.assertEqual(
+            [('base_tests.listing',
+              repr(((u'search_opts', ((u'a', 1), (u'b', 2))),)), 1),
+             ('base_tests.listing', repr(((u'search_opts', None),)), 1)],
+            sorted(api_base.get_request_store(request).summary()))
+
+    def test_results_are_copies(self):
+        request = http.HttpRequest()
+        self.listing(request).append('changed')
+        self.assertEqual([None], self.listing(request))
+
+    def test_wrapped_items_are_copies(self):
+        @api_base.request_memoized
+        def wrapped_listing(request):
+            return [APIResource.get_instance()], True
+
+        request = http.HttpRequest()
+        items, has_more = wrapped_listing(request)
+        items[0].annotation = 'changed'
+        items, has_more = wrapped_listing(request)
+        self.assertFalse(hasattr(items[0], 'annotation'))
+        self.assertEqual('foo', items[0].foo)
+
+    def test_paged_results_are_copies(self):
+        @api_base.request_memoized
+        def paged_listing(request):
+            return [1, 2], True, False
+
+        request = http.HttpRequest()
+        items, has_more, has_prev = paged_listing(request)
+        items.reverse()
+        self.assertEqual(([1, 2], True, False), paged_listing(request))
+
+    def test_invalidates(self):
+        request = http.HttpRequest()
+        self.listing(request)
+        self.change(request)
+        self.listing(request)
+        self.assertEqual([None, None], self.calls)
+
+    def test_failures_not_kept(self):
+        attempts = []
+
+        @api_base.request_memoized
+        def failing(request):
+            attempts.append(1)
+            raise exceptions.NotFound()
+
+        request = http.HttpRequest()
+        self.assertRaises(exceptions.NotFound, failing, request)
+        self.assertRaises(exceptions.NotFound, failing, request)
+        self.assertEqual(2, len(attempts))
+
+    def test_concurrent_calls_collapsed(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @api_base.request_memoized
+        def slow(request):
+            started.set()
+            release.wait(5)
+            self.calls.append('slow')
+            return 'done'
+
+        request = http.HttpRequest()
+        first, second = api_base.gather(lambda: slow(request),
+                                        lambda: slow(request))
+        started.wait(5)
+        release.set()
+        self.assertEqual('done', first.result())
+        self.assertEqual('done', second.result())
+        self.assertEqual(['slow'], self.calls)
+
+
+class ConnectionPoolRegistryTests(test.TestCase):
+    def setUp(self):
+        super(ConnectionPoolRegistryTests, self).setUp()
+        self.registry = api_base.ConnectionPoolRegistry()
+        self.addCleanup(self.registry.clear)
+
+    def test_same_endpoint_shares_adapter(self):
+        adapter = self.registry.get_adapter('https://nova:8774/v2/1')
+        self.assertIs(adapter,
+                      self.registry.get_adapter('https://nova:8774/v2/2'))
+        self.assertIsNot(adapter,
+                         self.registry.get_adapter('https://cinder:8776/v1'))
+
+    def test_tls_settings_separate_adapters(self):
+        url = 'https://nova:8774/v2'
+        adapter = self.registry.get_adapter(url)
+        self.assertIsNot(adapter,
+                         self.registry.get_adapter(url, insecure=True))
+        self.assertIsNot(adapter,
+                         self.registry.get_adapter(url, cacert='/ca.pem'))
+        pool = self.registry.for_client(insecure=True)
+        self.assertIs(self.registry.get_adapter(url, insecure=True),
+                      pool.get(url).adapter)
+
+    def test_closing_client_session_keeps_shared_adapter(self):
+        url = 'http://nova:8774/v2'
+        adapter = self.registry.get_adapter(url)
+        adapter.get_connection(url + '/servers')
+        session = requests.Session()
+        session.mount(url, self.registry.for_client().get(url))
+        session.close()
+        self.assertEqual(1, len(adapter.poolmanager.pools))
+
+    @override_settings(API_CONNECTION_POOL_SIZE=3)
+    def test_stats(self):
+        adapter = self.registry.get_adapter('http://nova:8774/v2')
+        adapter.get_connection('http://nova:8774/v2/servers')
+        stats = self.registry.stats()
+        self.assertEqual(1, len(stats))
+        self.assertEqual('http://nova:8774', stats[0]['endpoint'])
+        self.assertEqual(3, stats[0]['max_size'])
+        self.assertEqual(0, stats[0]['connections'])
+        self.assertEqual(0, stats[0]['requests'])
+
 
 class QuotaSetTests(test.TestCase):
 
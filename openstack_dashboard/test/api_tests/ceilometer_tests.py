@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+
 from django import http
 
 from mox import IsA  # noqa
@@ -58,6 +60,59 @@ class CeilometerApiTests(test.APITestCase):
         for r in ret_list:
             self.assertIsInstance(r, api.ceilometer.Resource)
 
+    @test.create_stubs({api.keystone: ('user_get', 'tenant_get')})
+    def test_resource_list_with_users_and_tenants(self):
+        resources = self.resources.list()
+        user = self.ceilometer_users.first()
+        tenant = self.ceilometer_tenants.first()
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.resources = self.mox.CreateMockAnything()
+        ceilometerclient.resources.list(q=[]).AndReturn(resources)
+        # All the resources share one user and one tenant, each of them
+        # is fetched once.
+        api.keystone.user_get(IsA(http.HttpRequest), 'fake_user_id') \
+            .AndReturn(user)
+        api.keystone.tenant_get(IsA(http.HttpRequest), 'fake_project_id') \
+            .AndReturn(tenant)
+        self.mox.ReplayAll()
+
+        usage = api.ceilometer.CeilometerUsage(self.request)
+        ret_list = api.ceilometer.resource_list(
+            self.request, query=[], ceilometer_usage_object=usage)
+        self.assertEqual(len(resources), len(ret_list))
+        for r in ret_list:
+            self.assertEqual(user.name, r.user.name)
+            self.assertEqual(tenant.name, r.tenant.name)
+
+        # The names are cached, so no more calls are made.
+        usage = api.ceilometer.CeilometerUsage(self.request)
+        usage.preload_users_and_tenants(user_ids=['fake_user_id'],
+                                        tenant_ids=['fake_project_id'])
+        self.assertEqual(user.name, usage.get_user('fake_user_id').name)
+
+    @test.create_stubs({api.keystone: ('user_list', 'tenant_list',
+                                       'tenant_get')})
+    def test_preload_users_and_tenants_bulk(self):
+        users = self.ceilometer_users.list()
+        tenant = self.ceilometer_tenants.first()
+        user_ids = [user.id for user in users] + ['deleted']
+        self.mox.StubOutWithMock(api.ceilometer, 'BULK_LOOKUP_THRESHOLD')
+        api.ceilometer.BULK_LOOKUP_THRESHOLD = 2
+        # Above the threshold, the users are listed rather than fetched
+        # one by one.
+        api.keystone.user_list(IsA(http.HttpRequest)).AndReturn(users)
+        api.keystone.tenant_get(IsA(http.HttpRequest), tenant.id) \
+            .AndReturn(tenant)
+        self.mox.ReplayAll()
+
+        usage = api.ceilometer.CeilometerUsage(self.request)
+        usage.preload_users_and_tenants(user_ids=user_ids + [None],
+                                        tenant_ids=[tenant.id, tenant.id])
+        self.assertEqual(sorted(user.id for user in users),
+                         sorted(usage._users))
+        self.assertEqual(users[1].name, usage._users[users[1].id].name)
+        self.assertEqual(tenant.name, usage._tenants[tenant.id].name)
+
     def test_statistic_list(self):
         statistics = self.statistics.list()
         meter_name = "meter_name"
@@ -158,10 +213,38 @@ class CeilometerApiTests(test.APITestCase):
             self.assertIn(ret.name, names)
             names.remove(ret.name)
 
+    @test.create_stubs({api.nova: ('flavor_list',),
+                        })
+    def test_meters_shared_catalog(self):
+        meters = self.meters.list()
+        flavor = self.flavors.first()
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.meters = self.mox.CreateMockAnything()
+        # The meter list is cached, so it's only fetched once.
+        ceilometerclient.meters.list(None).AndReturn(meters)
+
+        api.nova.flavor_list(IsA(http.HttpRequest), None) \
+            .MultipleTimes().AndReturn([flavor])
+        self.mox.ReplayAll()
+
+        first = api.ceilometer.Meters(self.request)
+        second = api.ceilometer.Meters(self.request)
+        # The static meters info is only built once.
+        self.assertIs(first._get_catalog(), second._get_catalog())
+        self.assertIs(first._neutron_meters_info,
+                      second._neutron_meters_info)
+        self.assertIn('instance:%s' % flavor.name, second._nova_meters_info)
+        nova_meters = dict((m.name, m) for m in second.list_nova())
+        self.assertEqual(["disk.read.bytes", "disk.write.bytes", "instance"],
+                         sorted(nova_meters))
+        self.assertEqual("Duration of instance",
+                         nova_meters["instance"].description)
+
     # TODO(lsmola) Test resource aggregates.
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "preload_users_and_tenants")})
     def test_global_data_get(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter"]
@@ -191,6 +274,9 @@ class CeilometerApiTests(test.APITestCase):
                                          period=None, q=IsA(list)).\
             AndReturn(statistics)
 
+        api.ceilometer.CeilometerUsage\
+                .preload_users_and_tenants(user_ids=IsA(list),
+                                           tenant_ids=IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -216,8 +302,8 @@ class CeilometerApiTests(test.APITestCase):
         # check that only one resource is returned
         self.assertEqual(1, len(data))
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "preload_users_and_tenants")})
     def test_global_data_get_without_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "fake_meter_1",
@@ -237,6 +323,9 @@ class CeilometerApiTests(test.APITestCase):
         ceilometerclient.resources = self.mox.CreateMockAnything()
         ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources)
 
+        api.ceilometer.CeilometerUsage\
+                .preload_users_and_tenants(user_ids=IsA(list),
+                                           tenant_ids=IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).MultipleTimes().AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -262,8 +351,8 @@ class CeilometerApiTests(test.APITestCase):
 
         self.assertEqual(len(resources), len(data))
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "preload_users_and_tenants")})
     def test_global_data_get_all_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter", ]
@@ -290,6 +379,9 @@ class CeilometerApiTests(test.APITestCase):
             MultipleTimes().\
             AndReturn(statistics)
 
+        api.ceilometer.CeilometerUsage\
+                .preload_users_and_tenants(user_ids=IsA(list),
+                                           tenant_ids=IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).MultipleTimes().AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -318,3 +410,48 @@ class CeilometerApiTests(test.APITestCase):
                          vars(statistic_obj))
 
         self.assertEqual(len(resources), len(data))
+
+
+class FakeResourceUsage(object):
+    def __init__(self, blocked=()):
+        self.blocked = blocked
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def update_with_statistics(self, resource, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            if resource in self.blocked:
+                self.release.wait(5)
+            else:
+                # Give the other workers a chance to start.
+                threading.Event().wait(0.01)
+            return resource
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class ThreadedUpdateResourceWithStatisticsTests(test.TestCase):
+    def test_process_list_bounded_workers(self):
+        usage = FakeResourceUsage()
+        resources = range(20)
+        updated = api.ceilometer.ThreadedUpdateResourceWithStatistics \
+            .process_list(usage, resources, meter_names=['cpu'],
+                          max_workers=3)
+        self.assertEqual(resources, sorted(updated))
+        self.assertTrue(1 < usage.max_running <= 3)
+
+    def test_process_list_deadline(self):
+        usage = FakeResourceUsage(blocked=(0,))
+        try:
+            updated = api.ceilometer.ThreadedUpdateResourceWithStatistics \
+                .process_list(usage, range(5), meter_names=['cpu'],
+                              max_workers=2, deadline=0.5)
+        finally:
+            usage.release.set()
+        self.assertEqual([1, 2, 3, 4], sorted(updated))
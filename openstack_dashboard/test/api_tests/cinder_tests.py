@@ -12,9 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.conf import settings
 from django.test.utils import override_settings
 
 import cinderclient as cinder_client
+from cinderclient import exceptions as cinder_exceptions
+import requests
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
@@ -32,6 +35,131 @@ class CinderApiTests(test.APITestCase):
         # No assertions are necessary. Verification is handled by mox.
         api.cinder.volume_list(self.request, search_opts=search_opts)
 
+    def _test_volume_list_paged(self, volume_page, page_size, marker,
+                                sort_dir, expected_more, expected_prev):
+        api.cinder.VERSIONS._active = 2
+        self.addCleanup(setattr, api.cinder.VERSIONS, '_active', None)
+        search_opts = {'all_tenants': 1}
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=search_opts, marker=marker,
+                                  limit=page_size + 1,
+                                  sort_key='created_at',
+                                  sort_dir=sort_dir).AndReturn(volume_page)
+        self.mox.ReplayAll()
+
+        with self.settings(API_RESULT_PAGE_SIZE=page_size):
+            volumes, has_more, has_prev = api.cinder.volume_list_paged(
+                self.request, search_opts=search_opts, marker=marker,
+                paginate=True, sort_dir=sort_dir)
+        self.assertEqual(volume_page[:page_size],
+                         [volume._apiresource for volume in volumes])
+        self.assertEqual(expected_more, has_more)
+        self.assertEqual(expected_prev, has_prev)
+
+    def test_volume_list_paged_first_page(self):
+        volumes = self.cinder_volumes.list()
+        self._test_volume_list_paged(volumes[:3], 2, None, 'desc',
+                                     True, False)
+
+    def test_volume_list_paged_middle_page(self):
+        volumes = self.cinder_volumes.list()
+        self._test_volume_list_paged(volumes[1:4], 2, volumes[0].id, 'desc',
+                                     True, True)
+
+    def test_volume_list_paged_last_page(self):
+        volumes = self.cinder_volumes.list()
+        self._test_volume_list_paged(volumes[3:], 2, volumes[2].id, 'desc',
+                                     False, True)
+
+    def test_volume_list_paged_back_to_first_page(self):
+        volumes = self.cinder_volumes.list()
+        self._test_volume_list_paged(volumes[:2], 2, volumes[2].id, 'asc',
+                                     True, False)
+
+    def test_volume_list_paged_v1(self):
+        # The v1 API can't page, so the page comes from the full list.
+        api.cinder.VERSIONS._active = 1
+        self.addCleanup(setattr, api.cinder.VERSIONS, '_active', None)
+        volumes = self.cinder_volumes.list()
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=None).AndReturn(volumes)
+        self.mox.ReplayAll()
+
+        with self.settings(API_RESULT_PAGE_SIZE=2):
+            page, has_more, has_prev = api.cinder.volume_list_paged(
+                self.request, marker=volumes[0].id, paginate=True)
+        self.assertEqual([volume.id for volume in volumes[1:3]],
+                         [volume.id for volume in page])
+        self.assertTrue(has_more)
+        self.assertTrue(has_prev)
+
+    def test_volume_backup_list_paged_previous_page(self):
+        backups = self.cinder_volume_backups.list()
+        cinderclient = self.stub_cinderclient()
+        cinderclient.backups = self.mox.CreateMockAnything()
+        cinderclient.backups.list().AndReturn(backups)
+        self.mox.ReplayAll()
+
+        with self.settings(API_RESULT_PAGE_SIZE=1):
+            page, has_more, has_prev = api.cinder.volume_backup_list_paged(
+                self.request, marker=backups[1].id, paginate=True,
+                sort_dir='asc')
+        self.assertEqual([backups[0].id], [backup.id for backup in page])
+        self.assertTrue(has_more)
+        self.assertFalse(has_prev)
+
+    def test_volume_get_attachment_names(self):
+        volume = self.cinder_volumes.list()[2]
+        server = self.servers.first()
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.get(volume.id).AndReturn(volume)
+        self.mox.StubOutWithMock(api.nova, 'server_names')
+        api.nova.server_names(self.request, set([server.id])) \
+            .AndReturn({server.id: server.name})
+        self.mox.ReplayAll()
+
+        volume = api.cinder.volume_get(self.request, volume.id)
+        self.assertEqual(server.name, volume.attachments[0]['instance_name'])
+
+    def test_volumes_get(self):
+        volumes = self.cinder_volumes.list()[:2]
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        # The volumes are retrieved concurrently, each of them once.
+        cinderclient.volumes.get(volumes[0].id).InAnyOrder() \
+            .AndReturn(volumes[0])
+        cinderclient.volumes.get(volumes[1].id).InAnyOrder() \
+            .AndRaise(self.exceptions.cinder)
+        self.mox.ReplayAll()
+
+        ret_val = api.cinder.volumes_get(
+            self.request, [volumes[0].id, volumes[1].id, volumes[0].id])
+        self.assertEqual([volumes[0].id], list(ret_val))
+        self.assertIsInstance(ret_val[volumes[0].id], api.cinder.Volume)
+
+    def test_volumes_update_attachment_names(self):
+        volumes = self.cinder_volumes.list()
+        volumes[0].attachments = [{"id": "3", "device": "/dev/hdc"}]
+        original = volumes[0].attachments[0]
+        self.mox.StubOutWithMock(api.nova, 'server_names')
+        # One call resolves the servers of all the volumes.
+        api.nova.server_names(self.request, set(['1', '2'])) \
+            .AndReturn({'1': 'server_1'})
+        self.mox.ReplayAll()
+
+        failed = api.cinder.volumes_update_attachment_names(self.request,
+                                                            volumes)
+        self.assertEqual(set(['2']), failed)
+        names = [att['instance_name'] for volume in volumes
+                 for att in volume.attachments]
+        self.assertEqual(["Unknown instance", 'server_1', "Unknown instance"],
+                         names)
+        # The attachments the volumes wrap are left alone.
+        self.assertNotIn('instance_name', original)
+
     def test_volume_snapshot_list(self):
         search_opts = {'all_tenants': 1}
         volume_snapshots = self.cinder_volume_snapshots.list()
@@ -87,6 +215,48 @@ class CinderApiTests(test.APITestCase):
         self.assertTrue(associate_spec, qos_specs_only_one[0].name)
 
 
+class FakeAdapter(object):
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        return self.response
+
+
+class CinderClientTests(test.TestCase):
+
+    def test_cinderclient_uses_shared_connection_pool(self):
+        client = api.cinder.cinderclient(self.request).client
+        url = api.base.url_for(self.request, 'volume')
+        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+        self.assertIs(api.base.connection_pools.get_adapter(url, insecure,
+                                                            cacert),
+                      client.session.get_adapter(url))
+
+    def test_cinderclient_request(self):
+        response = requests.Response()
+        response.status_code = 404
+        response._content = b'{"itemNotFound": {"message": "Not found"}}'
+        adapter = FakeAdapter(response)
+        url = api.base.url_for(self.request, 'volume')
+        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+        self.mox.StubOutWithMock(api.base.connection_pools, 'get_adapter')
+        api.base.connection_pools.get_adapter(
+            url + '/volumes/1', insecure, cacert).AndReturn(adapter)
+        self.mox.ReplayAll()
+
+        client = api.cinder.cinderclient(self.request).client
+        self.assertRaises(cinder_exceptions.NotFound,
+                          client.get, '/volumes/1')
+        self.assertEqual(1, len(adapter.requests))
+        self.assertEqual(self.request.user.token.id,
+                         adapter.requests[0].headers['X-Auth-Token'])
+
+
 class CinderApiVersionTests(test.TestCase):
 
     def setUp(self):
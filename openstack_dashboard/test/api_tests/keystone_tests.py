@@ -18,6 +18,8 @@
 
 from __future__ import absolute_import
 
+from django import http
+from keystoneclient import exceptions as keystone_exceptions
 from keystoneclient.v2_0 import client as keystone_client
 
 from openstack_dashboard import api
@@ -83,6 +85,96 @@ class RoleAPITests(test.APITestCase):
         role = api.keystone.get_default_role(self.request)
 
 
+class MemberAPITests(test.APITestCase):
+    def test_user_list_by_ids(self):
+        users = self.users.list()[:2]
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        for user in users:
+            keystoneclient.users.get(user.id).InAnyOrder().AndReturn(user)
+        keystoneclient.users.get('missing').InAnyOrder() \
+            .AndRaise(keystone_exceptions.NotFound)
+        self.mox.ReplayAll()
+
+        user_ids = [user.id for user in users] + ['missing']
+        found = api.keystone.user_list_by_ids(self.request, user_ids)
+        self.assertItemsEqual([user.id for user in users],
+                              [user.id for user in found])
+
+    def test_user_search(self):
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        keystoneclient.users.list(domain='1', name__istartswith='Test') \
+            .AndReturn(users)
+        self.mox.ReplayAll()
+
+        found = api.keystone.user_search(self.request, 'Test', domain='1')
+        # The names are matched again, ignoring case.
+        self.assertEqual(['test_user'], [user.name for user in found])
+
+    def test_user_search_v2(self):
+        active = api.keystone.VERSIONS._active
+        api.keystone.VERSIONS._active = 2
+        self.addCleanup(setattr, api.keystone.VERSIONS, '_active', active)
+        api.keystone._user_names_v2.invalidate()
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        # The users are listed once for both searches.
+        keystoneclient.users.list(tenant_id=None).AndReturn(users)
+        self.mox.ReplayAll()
+
+        found = api.keystone.user_search(self.request, 'Test')
+        self.assertEqual(['test_user'], [user.name for user in found])
+        # Another request made with an equivalent token shares the list.
+        request = http.HttpRequest()
+        request.user = self.request.user
+        found = api.keystone.user_search(request, 'Test_')
+        self.assertEqual(['test_user'], [user.name for user in found])
+
+    def test_get_project_members_roles(self):
+        project_scope = {'project': {'id': '1'}}
+        role_assignments = self.role_assignments.filter(scope=project_scope)
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.role_assignments = self.mox.CreateMockAnything()
+        keystoneclient.role_assignments.list(project='1', user=None,
+                                             role=None, group=None,
+                                             domain=None, effective=False) \
+            .AndReturn(role_assignments)
+        self.mox.ReplayAll()
+
+        # The role assignments are listed once for the users and groups.
+        users_roles = api.keystone.get_project_users_roles(self.request, '1')
+        groups_roles = api.keystone.get_project_groups_roles(self.request,
+                                                             '1')
+        self.assertEqual({'1': ['1'], '2': ['2'], '3': ['2']},
+                         dict(users_roles))
+        self.assertEqual({'1': ['2']}, dict(groups_roles))
+
+    def test_get_project_users_roles_v2(self):
+        active = api.keystone.VERSIONS._active
+        api.keystone.VERSIONS._active = 2
+        self.addCleanup(setattr, api.keystone.VERSIONS, '_active', active)
+        users = self.users.list()[:2]
+        roles = self.roles.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        keystoneclient.users.list(tenant_id='1').AndReturn(users)
+        keystoneclient.roles = self.mox.CreateMockAnything()
+        # The roles of the users are retrieved concurrently.
+        keystoneclient.roles.roles_for_user(users[0].id, '1') \
+            .InAnyOrder().AndReturn(roles[:1])
+        keystoneclient.roles.roles_for_user(users[1].id, '1') \
+            .InAnyOrder().AndReturn(roles)
+        self.mox.ReplayAll()
+
+        users_roles = api.keystone.get_project_users_roles(self.request, '1')
+        self.assertEqual({users[0].id: [roles[0].id],
+                          users[1].id: [role.id for role in roles]},
+                         dict(users_roles))
+
+
 class ServiceAPITests(test.APITestCase):
     def test_service_wrapper(self):
         catalog = self.service_catalog
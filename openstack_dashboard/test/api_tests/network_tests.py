@@ -20,6 +20,7 @@ import uuid
 from django import http
 from django.test.utils import override_settings
 from mox import IsA  # noqa
+from mox import SameElementsAs  # noqa
 
 from novaclient.v1_1 import floating_ip_pools
 
@@ -275,7 +276,9 @@ class NetworkApiNeutronTests(NetworkApiNeutronTestBase):
         if router_enabled:
             assoc_fips = [fip for fip in self.api_q_floating_ips.list()
                           if fip['port_id'] in server_port_ids]
-        server_network_ids = [p['network_id'] for p in server_ports]
+        # The networks are listed once each.
+        server_network_ids = list(collections.OrderedDict.fromkeys(
+            p['network_id'] for p in server_ports))
         server_networks = [net for net in self.api_networks.list()
                            if net['id'] in server_network_ids]
 
@@ -285,8 +288,6 @@ class NetworkApiNeutronTests(NetworkApiNeutronTestBase):
             self.qclient.list_floatingips(tenant_id=tenant_id,
                                           port_id=server_port_ids) \
                 .AndReturn({'floatingips': assoc_fips})
-            self.qclient.list_ports(tenant_id=tenant_id) \
-                .AndReturn({'ports': self.api_ports.list()})
         self.qclient.list_networks(id=server_network_ids) \
             .AndReturn({'networks': server_networks})
         self.qclient.list_subnets() \
@@ -397,7 +398,8 @@ class NetworkApiNeutronSecurityGroupTests(NetworkApiNeutronTestBase):
         # use deepcopy to ensure self.api_q_secgroups is not modified.
         self.qclient.show_security_group(secgroup['id']) \
             .AndReturn({'security_group': copy.deepcopy(secgroup)})
-        self.qclient.list_security_groups(id=sg_ids, fields=['id', 'name']) \
+        self.qclient.list_security_groups(id=SameElementsAs(sg_ids),
+                                          fields=['id', 'name']) \
             .AndReturn({'security_groups': related_sgs})
         self.mox.ReplayAll()
         ret = api.network.security_group_get(self.request, secgroup['id'])
@@ -451,7 +453,7 @@ class NetworkApiNeutronSecurityGroupTests(NetworkApiNeutronTestBase):
         post_body = {'security_group_rule': post_rule}
         self.qclient.create_security_group_rule(post_body) \
             .AndReturn({'security_group_rule': copy.deepcopy(sg_rule)})
-        self.qclient.list_security_groups(id=set([sg_id]),
+        self.qclient.list_security_groups(id=[sg_id],
                                           fields=['id', 'name']) \
             .AndReturn({'security_groups': [copy.deepcopy(secgroup)]})
         self.mox.ReplayAll()
@@ -489,7 +491,7 @@ class NetworkApiNeutronSecurityGroupTests(NetworkApiNeutronTestBase):
         self.qclient.list_ports(device_id=instance_id) \
             .AndReturn({'ports': instance_ports})
         secgroups = copy.deepcopy(self.api_q_secgroups.list())
-        self.qclient.list_security_groups(id=set(cur_sg_ids)) \
+        self.qclient.list_security_groups(id=SameElementsAs(cur_sg_ids)) \
             .AndReturn({'security_groups': secgroups})
         self.mox.ReplayAll()
 
@@ -545,13 +547,20 @@ class NetworkApiNeutronFloatingIpTests(NetworkApiNeutronTestBase):
             self.assertEqual([p[attr] for p in ext_nets],
                              [getattr(p, attr) for p in rets])
 
+    def _stub_floating_ip_ports(self, fips):
+        # Only the ports the floating IPs are associated with are fetched.
+        port_ids = [fip['port_id'] for fip in fips if fip['port_id']]
+        ports = [p for p in self.api_ports.list() if p['id'] in port_ids]
+        self.qclient.list_ports(id=port_ids,
+                                fields=['id', 'device_id', 'device_owner']) \
+            .AndReturn({'ports': ports})
+
     def test_floating_ip_list(self):
         fips = self.api_q_floating_ips.list()
         filters = {'tenant_id': self.request.user.tenant_id}
         self.qclient.list_floatingips(**filters) \
             .AndReturn({'floatingips': fips})
-        self.qclient.list_ports(**filters) \
-            .AndReturn({'ports': self.api_ports.list()})
+        self._stub_floating_ip_ports(fips)
         self.mox.ReplayAll()
 
         rets = api.network.tenant_floating_ip_list(self.request)
@@ -571,7 +580,7 @@ class NetworkApiNeutronFloatingIpTests(NetworkApiNeutronTestBase):
     def test_floating_ip_list_all_tenants(self):
         fips = self.api_q_floating_ips.list()
         self.qclient.list_floatingips().AndReturn({'floatingips': fips})
-        self.qclient.list_ports().AndReturn({'ports': self.api_ports.list()})
+        self._stub_floating_ip_ports(fips)
         self.mox.ReplayAll()
 
         # all_tenants option for floating IP list is api.neutron specific,
@@ -696,13 +705,20 @@ class NetworkApiNeutronFloatingIpTests(NetworkApiNeutronTestBase):
         target_ports = [(self._get_target_id(p),
                          self._get_target_name(p)) for p in ports
                         if not p['device_owner'].startswith('network:')]
-        filters = {'tenant_id': self.request.user.tenant_id}
-        self.qclient.list_ports(**filters).AndReturn({'ports': ports})
+        filters = {'tenant_id': self.request.user.tenant_id,
+                   'limit': 1000}
+        self.qclient.list_ports(retrieve_all=False, **filters) \
+            .AndReturn(iter([{'ports': ports}]))
         servers = self.servers.list()
         novaclient = self.stub_novaclient()
         novaclient.servers = self.mox.CreateMockAnything()
         search_opts = {'project_id': self.request.user.tenant_id}
-        novaclient.servers.list(True, search_opts).AndReturn(servers)
+        novaclient.servers.list(True, search_opts, marker=None,
+                                limit=1000) \
+            .AndReturn(servers)
+        novaclient.servers.list(True, search_opts, marker=servers[-1].id,
+                                limit=1000) \
+            .AndReturn([])
         self.mox.ReplayAll()
 
         rets = api.network.floating_ip_target_list(self.request)
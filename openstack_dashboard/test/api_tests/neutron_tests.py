@@ -12,13 +12,58 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import uuid
+
+from django.conf import settings
 from django.test.utils import override_settings
+from mox import IsA  # noqa
+import requests
 
 from openstack_dashboard import api
 from openstack_dashboard import policy
 from openstack_dashboard.test import helpers as test
 
 
+class FakeAdapter(object):
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        return self.response
+
+
+class NeutronClientTests(test.TestCase):
+
+    def test_neutronclient_uses_shared_connection_pool(self):
+        client = api.neutron.neutronclient(self.request).httpclient
+        url = api.base.url_for(self.request, 'network')
+        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+        self.assertIs(api.base.connection_pools.get_adapter(url, insecure,
+                                                            cacert),
+                      client.session.get_adapter(url))
+
+    def test_neutronclient_request(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"networks": []}'
+        adapter = FakeAdapter(response)
+        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+        self.mox.StubOutWithMock(api.base.connection_pools, 'get_adapter')
+        api.base.connection_pools.get_adapter(
+            IsA(str), insecure, cacert).AndReturn(adapter)
+        self.mox.ReplayAll()
+
+        networks = api.neutron.neutronclient(self.request).list_networks()
+        self.assertEqual({'networks': []}, networks)
+        self.assertEqual(1, len(adapter.requests))
+        self.assertEqual(self.request.user.token.id,
+                         adapter.requests[0].headers['X-Auth-Token'])
+
+
 class NeutronApiTests(test.APITestCase):
     def test_network_list(self):
         networks = {'networks': self.api_networks.list()}
@@ -154,6 +199,58 @@ class NeutronApiTests(test.APITestCase):
         for p in ret_val:
             self.assertIsInstance(p, api.neutron.Port)
 
+    def test_port_list_by_ids(self):
+        ports = self.api_ports.list()
+        device_ids = [str(uuid.uuid4()) for i in range(200)]
+        # The other filters are sent with each chunk.
+        max_length = (api.neutron.ID_FILTER_MAX_LENGTH -
+                      len('tenant_id=1&'))
+        chunks = api.neutron._chunk_ids('device_id', device_ids, max_length)
+        self.assertTrue(1 < len(chunks) <= len(ports))
+        self.assertEqual(device_ids, sum(chunks, []))
+
+        neutronclient = self.stub_neutronclient()
+        for i, chunk in enumerate(chunks):
+            neutronclient.list_ports(device_id=chunk, tenant_id='1')\
+                .InAnyOrder().AndReturn({'ports': [ports[i]]})
+        self.mox.ReplayAll()
+
+        # Duplicated IDs are sent once.
+        ret_val = api.neutron.port_list(self.request,
+                                        device_id=device_ids + device_ids[:5],
+                                        tenant_id='1')
+        self.assertEqual([p['id'] for p in ports[:len(chunks)]],
+                         [p.id for p in ret_val])
+        # An empty list of IDs matches no port.
+        self.assertEqual([], api.neutron.port_list(self.request,
+                                                   device_id=[]))
+
+    def test_port_list_by_ids_with_long_filters(self):
+        device_ids = [str(uuid.uuid4()) for i in range(100)]
+        network_ids = [str(uuid.uuid4()) for i in range(60)]
+        self.stub_neutronclient()
+        self.mox.ReplayAll()
+
+        # Only one list of IDs is split into chunks.
+        self.assertRaises(ValueError, api.neutron.port_list, self.request,
+                          device_id=device_ids, network_id=network_ids)
+
+    def test_port_iter(self):
+        ports = self.api_ports.list()
+        pages = [{'ports': ports[:1]}, {'ports': ports[1:]}]
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_ports(retrieve_all=False, limit=1000,
+                                 device_owner='compute:nova') \
+            .AndReturn(iter(pages))
+        self.mox.ReplayAll()
+
+        ret_val = list(api.neutron.port_iter(self.request,
+                                             device_owner='compute:nova'))
+        self.assertEqual([p['id'] for p in ports], [p.id for p in ret_val])
+        for p in ret_val:
+            self.assertIsInstance(p, api.neutron.Port)
+
     def test_port_get(self):
         port = {'port': self.api_ports.first()}
         port_id = self.api_ports.first()['id']
@@ -283,6 +380,29 @@ class NeutronApiTests(test.APITestCase):
         self.assertFalse(
             api.neutron.is_extension_supported(self.request, 'doesntexist'))
 
+    def test_dhcp_agents_by_network(self):
+        agents = self.api_agents.list()
+        networks = self.api_networks.list()
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_agents(agent_type='DHCP agent')\
+            .AndReturn({'agents': agents})
+        neutronclient.list_networks_on_dhcp_agent(agents[0]['id'])\
+            .AndReturn({'networks': networks[:1]})
+        neutronclient.list_networks_on_dhcp_agent(agents[1]['id'])\
+            .AndReturn({'networks': networks[:2]})
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.dhcp_agents_by_network(self.request)
+        self.assertEqual(set([networks[0]['id'], networks[1]['id']]),
+                         set(ret_val))
+        self.assertEqual([agents[0]['id'], agents[1]['id']],
+                         [a.id for a in ret_val[networks[0]['id']]])
+        self.assertEqual([agents[1]['id']],
+                         [a.id for a in ret_val[networks[1]['id']]])
+        for agent in ret_val[networks[0]['id']]:
+            self.assertIsInstance(agent, api.neutron.Agent)
+
     @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_distributed_router':
                                                   True},
                        POLICY_CHECK_FUNCTION=None)
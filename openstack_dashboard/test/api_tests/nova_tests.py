@@ -48,6 +48,18 @@ class ServerWrapperTests(test.TestCase):
         self.assertEqual(image.name, server.image_name)
 
 
+class NovaClientTests(test.TestCase):
+
+    def test_novaclient_uses_shared_connection_pool(self):
+        client = api.nova.novaclient(self.request).client
+        url = api.base.url_for(self.request, 'compute')
+        insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+        cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+        self.assertIs(api.base.connection_pools.get_adapter(url, insecure,
+                                                            cacert),
+                      client._get_session(url).get_adapter(url).adapter)
+
+
 class ComputeApiTests(test.APITestCase):
 
     def test_server_reboot(self):
@@ -135,6 +147,24 @@ class ComputeApiTests(test.APITestCase):
         for server in ret_val:
             self.assertIsInstance(server, api.nova.Server)
 
+    def test_server_names(self):
+        servers = self.servers.list()
+        novaclient = self.stub_novaclient()
+        novaclient.servers = self.mox.CreateMockAnything()
+        for server in servers[:2]:
+            novaclient.servers.get(server.id).InAnyOrder().AndReturn(server)
+        novaclient.servers.get(servers[2].id).InAnyOrder() \
+            .AndRaise(self.exceptions.nova)
+        self.mox.ReplayAll()
+
+        server_ids = [server.id for server in servers]
+        expected = dict((server.id, server.name) for server in servers[:2])
+        self.assertEqual(expected,
+                         api.nova.server_names(self.request, server_ids))
+        # The names are cached, so no more calls are made.
+        self.assertEqual(expected,
+                         api.nova.server_names(self.request, server_ids[:2]))
+
     def test_server_list_pagination(self):
         page_size = getattr(settings, 'API_RESULT_PAGE_SIZE', 20)
         servers = self.servers.list()
@@ -154,6 +184,27 @@ class ComputeApiTests(test.APITestCase):
             self.assertIsInstance(server, api.nova.Server)
         self.assertFalse(has_more)
 
+    @override_settings(API_RESULT_LIMIT=2)
+    def test_server_iter(self):
+        servers = self.servers.list()
+        novaclient = self.stub_novaclient()
+        novaclient.servers = self.mox.CreateMockAnything()
+        marker = None
+        # Nova returns a single server per page, fewer than asked for.
+        for server in servers:
+            novaclient.servers.list(True, {'all_tenants': True},
+                                    marker=marker, limit=2) \
+                .AndReturn([server])
+            marker = server.id
+        novaclient.servers.list(True, {'all_tenants': True},
+                                marker=marker, limit=2).AndReturn([])
+        self.mox.ReplayAll()
+
+        ret_val = list(api.nova.server_iter(self.request, all_tenants=True))
+        self.assertEqual([s.id for s in servers], [s.id for s in ret_val])
+        for server in ret_val:
+            self.assertIsInstance(server, api.nova.Server)
+
     @override_settings(API_RESULT_PAGE_SIZE=1)
     def test_server_list_pagination_more(self):
         page_size = getattr(settings, 'API_RESULT_PAGE_SIZE', 1)
@@ -18,11 +18,19 @@
 
 from __future__ import absolute_import
 
+import datetime
+import json
+
+from django.test.utils import override_settings
+from mox import Func  # noqa
 from mox import IsA  # noqa
+import six
+from swiftclient import client as swiftclient
 
 from horizon import exceptions
 
 from openstack_dashboard import api
+from openstack_dashboard.openstack.common import timeutils
 from openstack_dashboard.test import helpers as test
 
 
@@ -138,6 +146,30 @@ class SwiftApiTests(test.APITestCase):
                                          object.name)
         self.assertEqual(object.name, obj.name)
 
+    def test_swift_get_object_streamed(self):
+        container = self.containers.first()
+        object = self.objects.first()
+        headers = {'content-length': '4',
+                   'content-range': 'bytes 0-3/9',
+                   'etag': 'object_hash'}
+
+        swift_api = self.stub_swiftclient()
+        swift_api.get_object(container.name, object.name,
+                             resp_chunk_size=2,
+                             headers={'Range': 'bytes=0-3'}) \
+            .AndReturn([headers, iter(['Fa', 'ke'])])
+
+        self.mox.ReplayAll()
+
+        obj = api.swift.swift_get_object(self.request,
+                                         container.name,
+                                         object.name,
+                                         resp_chunk_size=2,
+                                         byte_range='bytes=0-3')
+        self.assertEqual('bytes 0-3/9', obj.content_range)
+        self.assertEqual('object_hash', obj.etag)
+        self.assertEqual(['Fa', 'ke'], list(obj.data))
+
     def test_swift_get_object_without_data(self):
         container = self.containers.first()
         object = self.objects.first()
@@ -180,6 +212,91 @@ class SwiftApiTests(test.APITestCase):
                                       obj.name,
                                       FakeFile())
 
+    def _stub_segment_uploads(self, swift_api, container, obj, data,
+                              failing=None):
+        prefix = '%s/2015-01-02T03:04:05.000000/%s/4/' % (obj.name,
+                                                          len(data))
+        segments = []
+        for index, offset in enumerate(range(0, len(data), 4)):
+            chunk = data[offset:offset + 4]
+            name = '%s%08d' % (prefix, index)
+            call = swift_api.put_object(
+                container.name + '_segments',
+                name,
+                Func(lambda reader, chunk=chunk: reader.read() == chunk),
+                content_length=len(chunk))
+            if index == failing:
+                call.AndRaise(self.exceptions.swift)
+            else:
+                call.AndReturn('etag%d' % index)
+                segments.append({'path': '/%s_segments/%s' % (container.name,
+                                                              name),
+                                 'etag': 'etag%d' % index,
+                                 'size_bytes': len(chunk)})
+        return segments
+
+    @override_settings(SWIFT_SEGMENT_THRESHOLD=4,
+                       SWIFT_SEGMENT_SIZE=4,
+                       SWIFT_SEGMENT_UPLOAD_WORKERS=1)
+    def test_swift_upload_object_in_segments(self):
+        container = self.containers.first()
+        obj = self.objects.first()
+        data = '0123456789'
+        object_file = six.StringIO(data)
+        object_file.name = 'fake_object.jpg'
+        object_file.size = len(data)
+        timeutils.set_time_override(datetime.datetime(2015, 1, 2, 3, 4, 5))
+        self.addCleanup(timeutils.clear_time_override)
+
+        swift_api = self.stub_swiftclient(expected_calls=2)
+        swift_api.put_container(container.name + '_segments')
+        segments = self._stub_segment_uploads(swift_api, container, obj, data)
+        # The connection of the worker is closed.
+        swift_api.close()
+        swift_api.put_object(
+            container.name,
+            obj.name,
+            Func(lambda manifest: json.loads(manifest) == segments),
+            headers={'X-Object-Meta-Orig-Filename': 'fake_object.jpg'},
+            query_string='multipart-manifest=put').AndReturn('manifest_etag')
+        self.mox.ReplayAll()
+
+        progress = []
+        uploaded = api.swift.swift_upload_object(
+            self.request, container.name, obj.name, object_file,
+            progress=lambda done, size: progress.append((done, size)))
+        self.assertEqual('manifest_etag', uploaded.etag)
+        self.assertEqual(len(data), uploaded.bytes)
+        self.assertEqual([(4, 10), (8, 10), (10, 10)], progress)
+
+    @override_settings(SWIFT_SEGMENT_THRESHOLD=4,
+                       SWIFT_SEGMENT_SIZE=4,
+                       SWIFT_SEGMENT_UPLOAD_WORKERS=1)
+    def test_swift_upload_object_in_segments_failure(self):
+        container = self.containers.first()
+        obj = self.objects.first()
+        data = '0123456789'
+        object_file = six.StringIO(data)
+        object_file.name = 'fake_object.jpg'
+        object_file.size = len(data)
+        timeutils.set_time_override(datetime.datetime(2015, 1, 2, 3, 4, 5))
+        self.addCleanup(timeutils.clear_time_override)
+
+        swift_api = self.stub_swiftclient(expected_calls=2)
+        swift_api.put_container(container.name + '_segments')
+        segments = self._stub_segment_uploads(swift_api, container, obj, data,
+                                              failing=1)
+        # The segments uploaded before the failure are cleaned up.
+        for segment in segments:
+            swift_api.delete_object(container.name + '_segments',
+                                    segment['path'].split('/', 2)[2])
+        swift_api.close()
+        self.mox.ReplayAll()
+
+        self.assertRaises(swiftclient.ClientException,
+                          api.swift.swift_upload_object,
+                          self.request, container.name, obj.name, object_file)
+
     def test_swift_upload_object_without_file(self):
         container = self.containers.first()
         obj = self.objects.first()
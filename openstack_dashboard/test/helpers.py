@@ -123,6 +123,8 @@ class TestCase(horizon_helpers.TestCase):
         self.mox = mox.Mox()
         self.factory = RequestFactoryWithMessages()
         self.context = {'authorized_tenants': self.tenants.list()}
+        # Don't let API results cached across requests leak between tests.
+        api.base._get_shared_cache().clear()
 
         def fake_conn_request(*args, **kwargs):
             raise Exception("An external URI request tried to escape through "
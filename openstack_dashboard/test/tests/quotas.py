@@ -49,7 +49,7 @@ class QuotaTests(test.APITestCase):
                                          'quota': 1000}})
         return usages
 
-    @test.create_stubs({api.nova: ('server_list',
+    @test.create_stubs({api.nova: ('server_iter',
                                    'flavor_list',
                                    'tenant_quota_get',),
                         api.network: ('tenant_floating_ip_list',
@@ -73,8 +73,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(True)
         api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.floating_ips.list())
-        api.nova.server_list(IsA(http.HttpRequest)) \
-                .AndReturn([servers, False])
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+                .AndReturn(iter(servers))
         cinder.volume_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.volumes.list())
         cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
@@ -90,7 +90,7 @@ class QuotaTests(test.APITestCase):
         # Compare internal structure of usages to expected.
         self.assertEqual(expected_output, quota_usages.usages)
 
-    @test.create_stubs({api.nova: ('server_list',
+    @test.create_stubs({api.nova: ('server_iter',
                                    'flavor_list',
                                    'tenant_quota_get',),
                         api.network: ('tenant_floating_ip_list',
@@ -112,8 +112,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(True)
         api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.floating_ips.list())
-        api.nova.server_list(IsA(http.HttpRequest)) \
-                .AndReturn([servers, False])
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+                .AndReturn(iter(servers))
 
         self.mox.ReplayAll()
 
@@ -128,7 +128,7 @@ class QuotaTests(test.APITestCase):
         self.assertIn('ram', quota_usages)
         self.assertIsNotNone(quota_usages.get('ram'))
 
-    @test.create_stubs({api.nova: ('server_list',
+    @test.create_stubs({api.nova: ('server_iter',
                                    'flavor_list',
                                    'tenant_quota_get',),
                         api.network: ('tenant_floating_ip_list',
@@ -147,7 +147,7 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(True)
         api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
                 .AndReturn([])
-        api.nova.server_list(IsA(http.HttpRequest)).AndReturn([[], False])
+        api.nova.server_iter(IsA(http.HttpRequest)).AndReturn(iter([]))
 
         self.mox.ReplayAll()
 
@@ -163,7 +163,7 @@ class QuotaTests(test.APITestCase):
         # Compare internal structure of usages to expected.
         self.assertEqual(expected_output, quota_usages.usages)
 
-    @test.create_stubs({api.nova: ('server_list',
+    @test.create_stubs({api.nova: ('server_iter',
                                    'flavor_list',
                                    'tenant_quota_get',),
                         api.network: ('tenant_floating_ip_list',
@@ -189,8 +189,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(True)
         api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.floating_ips.list())
-        api.nova.server_list(IsA(http.HttpRequest)) \
-                .AndReturn([servers, False])
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+                .AndReturn(iter(servers))
         cinder.volume_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.volumes.list())
         cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
@@ -209,7 +209,7 @@ class QuotaTests(test.APITestCase):
         # Compare internal structure of usages to expected.
         self.assertEqual(quota_usages.usages, expected_output)
 
-    @test.create_stubs({api.nova: ('server_list',
+    @test.create_stubs({api.nova: ('server_iter',
                                    'flavor_list',
                                    'tenant_quota_get',),
                         api.network: ('tenant_floating_ip_list',
@@ -231,8 +231,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(self.quotas.first())
         api.network.floating_ip_supported(IsA(http.HttpRequest)) \
                 .AndReturn(False)
-        api.nova.server_list(IsA(http.HttpRequest)) \
-                .AndReturn([servers, False])
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+                .AndReturn(iter(servers))
         cinder.volume_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.volumes.list())
         cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
@@ -249,3 +249,45 @@ class QuotaTests(test.APITestCase):
 
         # Compare internal structure of usages to expected.
         self.assertEqual(expected_output, quota_usages.usages)
+
+    @test.create_stubs({api.nova: ('server_iter',
+                                   'flavor_list',
+                                   'flavor_get',
+                                   'tenant_quota_get',),
+                        api.network: ('tenant_floating_ip_list',
+                                      'floating_ip_supported'),
+                        api.base: ('is_service_enabled',)})
+    def test_tenant_quota_usages_shared_between_requests(self):
+        servers = [s for s in self.servers.list()
+                   if s.tenant_id == self.request.user.tenant_id]
+        flavors = dict((f.id, f) for f in self.flavors.list())
+        missing_flavors = set(s.flavor['id'] for s in servers)
+
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                  'volume').AndReturn(False)
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                  'network').AndReturn(False)
+        api.nova.flavor_list(IsA(http.HttpRequest)).AndReturn([])
+        # Deleted flavors are only fetched once each.
+        for flavor_id in missing_flavors:
+            api.nova.flavor_get(IsA(http.HttpRequest), flavor_id) \
+                .InAnyOrder().AndReturn(flavors[flavor_id])
+        api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
+                .AndReturn(self.quotas.first())
+        api.network.floating_ip_supported(IsA(http.HttpRequest)) \
+                .AndReturn(True)
+        api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
+                .AndReturn(self.floating_ips.list())
+        api.nova.server_iter(IsA(http.HttpRequest)) \
+                .AndReturn(iter(servers))
+
+        self.mox.ReplayAll()
+
+        expected_output = self.get_usages(with_volume=False)
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(expected_output, quota_usages.usages)
+
+        request = http.HttpRequest()
+        request.user = self.request.user
+        quota_usages = quotas.tenant_quota_usages(request)
+        self.assertEqual(expected_output, quota_usages.usages)
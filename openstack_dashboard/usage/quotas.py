@@ -10,14 +10,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 from collections import defaultdict
+import functools
 import itertools
 import logging
 
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
-from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
@@ -136,15 +137,16 @@ class QuotaUsage(dict):
 
 def _get_quota_data(request, method_name, disabled_quotas=None,
                     tenant_id=None):
-    quotasets = []
     if not tenant_id:
         tenant_id = request.user.tenant_id
-    quotasets.append(getattr(nova, method_name)(request, tenant_id))
+    calls = [functools.partial(getattr(nova, method_name), request, tenant_id)]
     qs = base.QuotaSet()
     if disabled_quotas is None:
         disabled_quotas = get_disabled_quotas(request)
     if 'volumes' not in disabled_quotas:
-        quotasets.append(getattr(cinder, method_name)(request, tenant_id))
+        calls.append(functools.partial(getattr(cinder, method_name),
+                                       request, tenant_id))
+    quotasets = [result.result() for result in base.gather(*calls)]
     for quota in itertools.chain(*quotasets):
         if quota.name not in disabled_quotas:
             qs[quota.name] = quota.limit
@@ -214,55 +216,104 @@ def get_disabled_quotas(request):
     return disabled_quotas
 
 
-@memoized
+def _get_tenant_floating_ips(request):
+    try:
+        if network.floating_ip_supported(request):
+            return network.tenant_floating_ip_list(request)
+    except Exception:
+        pass
+    return []
+
+
+def _count_instance_flavors(request):
+    """Returns the number of instances of the project for each flavor ID.
+
+    The instances are counted as they are listed, one page at a time, so
+    projects with more instances than ``API_RESULT_LIMIT`` are counted in
+    full without keeping them all in memory.
+    """
+    return collections.Counter(instance.flavor['id']
+                               for instance in nova.server_iter(request))
+
+
+def _add_missing_flavors(request, flavors, flavor_ids):
+    """Adds the flavors with the given IDs which are missing from ``flavors``.
+
+    Flavors which have since been deleted are fetched once each,
+    concurrently; those which can't be retrieved map to an empty dict.
+    """
+    missing_flavors = [flavor_id for flavor_id in flavor_ids
+                       if flavor_id not in flavors]
+    results = base.gather(*[functools.partial(nova.flavor_get, request, fid)
+                            for fid in missing_flavors])
+    for missing, result in zip(missing_flavors, results):
+        try:
+            flavors[missing] = result.result()
+        except Exception:
+            flavors[missing] = {}
+            exceptions.handle(request, ignore=True)
+
+
+def _usages_from_dict(request, data):
+    usages = QuotaUsage()
+    usages.usages.update(data)
+    return usages
+
+
+@base.shared_memoized(timeout=30,
+                      prepare=lambda usages: dict(usages.usages),
+                      restore=_usages_from_dict,
+                      scoped_invalidation=True)
 def tenant_quota_usages(request):
+    """Returns the quotas of the current project and their usage.
+
+    The result is shared with the following requests for the same project
+    for a short while, so actions which create or delete instances, volumes,
+    snapshots or floating IPs should call ``tenant_quota_usages.invalidate``
+    with their request, which only drops the usages of that project.
+    """
     # Get our quotas and construct our usage object.
     disabled_quotas = get_disabled_quotas(request)
 
+    # None of the calls below depend on each other, so make them all at once.
+    calls = [functools.partial(get_tenant_quota_data, request,
+                               disabled_quotas=disabled_quotas),
+             functools.partial(_get_tenant_floating_ips, request),
+             functools.partial(nova.flavor_list, request),
+             functools.partial(_count_instance_flavors, request)]
+    if 'volumes' not in disabled_quotas:
+        calls.extend([functools.partial(cinder.volume_list, request),
+                      functools.partial(cinder.volume_snapshot_list, request)])
+    results = base.gather(*calls)
+    quotas, floating_ips, flavors, instance_flavors = results[:4]
+
     usages = QuotaUsage()
-    for quota in get_tenant_quota_data(request,
-                                       disabled_quotas=disabled_quotas):
+    for quota in quotas.result():
         usages.add_quota(quota)
 
     # Get our usages.
-    floating_ips = []
-    try:
-        if network.floating_ip_supported(request):
-            floating_ips = network.tenant_floating_ip_list(request)
-    except Exception:
-        pass
-    flavors = dict([(f.id, f) for f in nova.flavor_list(request)])
-    instances, has_more = nova.server_list(request)
+    flavors = dict([(f.id, f) for f in flavors.result()])
+    instance_flavors = instance_flavors.result()
     # Fetch deleted flavors if necessary.
-    missing_flavors = [instance.flavor['id'] for instance in instances
-                       if instance.flavor['id'] not in flavors]
-    for missing in missing_flavors:
-        if missing not in flavors:
-            try:
-                flavors[missing] = nova.flavor_get(request, missing)
-            except Exception:
-                flavors[missing] = {}
-                exceptions.handle(request, ignore=True)
-
-    usages.tally('instances', len(instances))
-    usages.tally('floating_ips', len(floating_ips))
+    _add_missing_flavors(request, flavors, instance_flavors)
+
+    usages.tally('instances', sum(instance_flavors.values()))
+    usages.tally('floating_ips', len(floating_ips.result()))
 
     if 'volumes' not in disabled_quotas:
-        volumes = cinder.volume_list(request)
-        snapshots = cinder.volume_snapshot_list(request)
+        volumes = results[4].result()
+        snapshots = results[5].result()
         usages.tally('gigabytes', sum([int(v.size) for v in volumes]))
         usages.tally('volumes', len(volumes))
         usages.tally('snapshots', len(snapshots))
 
     # Sum our usage based on the flavors of the instances.
-    for flavor in [flavors[instance.flavor['id']] for instance in instances]:
-        usages.tally('cores', getattr(flavor, 'vcpus', None))
-        usages.tally('ram', getattr(flavor, 'ram', None))
-
-    # Initialise the tally if no instances have been launched yet
-    if len(instances) == 0:
-        usages.tally('cores', 0)
-        usages.tally('ram', 0)
+    usages.tally('cores', 0)
+    usages.tally('ram', 0)
+    for flavor_id, count in instance_flavors.items():
+        flavor = flavors[flavor_id]
+        usages.tally('cores', (getattr(flavor, 'vcpus', None) or 0) * count)
+        usages.tally('ram', (getattr(flavor, 'ram', None) or 0) * count)
 
     return usages
 
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
+
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
@@ -45,8 +47,13 @@ class UsageView(tables.DataTableView):
             project_id = self.kwargs.get('project_id',
                                          self.request.user.tenant_id)
             self.usage = self.usage_class(self.request, project_id)
-            self.usage.summarize(*self.usage.get_date_range())
-            self.usage.get_limits()
+            start, end = self.usage.get_date_range()
+            # The usage report and the limits are independent of each other.
+            summary, limits = api.base.gather(
+                functools.partial(self.usage.summarize, start, end),
+                self.usage.get_limits)
+            summary.result()
+            limits.result()
             self.kwargs['usage'] = self.usage
             return self.usage.usage_list
         except Exception:
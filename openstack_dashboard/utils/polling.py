@@ -0,0 +1,127 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Helpers for the JSON views polled by the browser, e.g. the topologies.
+
+The responses carry an entity tag (``ETag``) made from their content.
+Requests whose ``If-None-Match`` header holds the current tag are answered
+with ``304 Not Modified``. Requests with the ``since`` parameter set to the
+tag of an earlier response only get the nodes which changed since then::
+
+    {"since": "<etag>",
+     "changed": {"<collection>": [<node>, ...]},
+     "removed": {"<collection>": [<node key>, ...]},
+     ...}
+
+The other members of the data are always included. If the earlier response
+isn't known anymore, the whole data is returned.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import get_cache  # noqa
+from django import http
+from django.utils import http as http_utils
+from django.utils import translation
+
+# How long the fingerprints of the nodes of a response are kept to answer
+# requests for the changes since that response.
+SNAPSHOT_TIMEOUT = 300
+
+
+def fingerprint(value):
+    """Returns a hash of a value which can be serialized to JSON."""
+    return hashlib.md5(json.dumps(value, sort_keys=True)).hexdigest()
+
+
+def etag_matches(request, etag):
+    """Returns whether the ``If-None-Match`` header holds the given tag."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = http_utils.parse_etags(header)
+    return etag in etags or '*' in etags
+
+
+def not_modified(etag):
+    response = http.HttpResponseNotModified()
+    response['ETag'] = http_utils.quote_etag(etag)
+    return response
+
+
+def _get_cache():
+    return get_cache(getattr(settings, 'API_CACHE_BACKEND', 'default'))
+
+
+def _snapshot_key(request, etag):
+    # The snapshots are kept per user, so nobody can learn the nodes of
+    # other projects from them.
+    return "horizon:polling:%s:%s" % (request.user.id, etag)
+
+
+def json_response(request, data, collections, key='id', etag=None,
+                  complete=None, content_type='application/json'):
+    """Returns the JSON response to a polling request.
+
+    :Parameters:
+      - `data`: A dict which can be serialized to JSON.
+      - `collections`: The names of the members of ``data`` which are
+                       lists of nodes.
+      - `key`: The member of the nodes identifying them.
+      - `etag`: The entity tag of the response. By default it's made from
+                ``data`` and the active language.
+      - `complete`: If given, it's called with the name of the collection
+                    and each node which is going to be sent, e.g. to
+                    render parts of the nodes which only depend on the
+                    rest of them. They're left out of the entity tag.
+    """
+    if etag is None:
+        etag = fingerprint([translation.get_language(), data])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    snapshot = dict((name, dict((node[key], fingerprint(node))
+                                for node in data[name]))
+                    for name in collections)
+    cache = _get_cache()
+    since = request.GET.get('since')
+    previous = since and cache.get(_snapshot_key(request, since))
+    cache.set(_snapshot_key(request, etag), snapshot, SNAPSHOT_TIMEOUT)
+
+    if previous:
+        body = dict((name, value) for name, value in data.items()
+                    if name not in collections)
+        body['since'] = since
+        body['changed'] = {}
+        body['removed'] = {}
+        for name in collections:
+            known = previous.get(name, {})
+            body['changed'][name] = [
+                node for node in data[name]
+                if known.get(node[key]) != snapshot[name][node[key]]]
+            body['removed'][name] = [node_key for node_key in known
+                                     if node_key not in snapshot[name]]
+        sent = body['changed']
+    else:
+        body = data
+        sent = data
+
+    if complete:
+        for name in collections:
+            for node in sent[name]:
+                complete(name, node)
+    response = http.HttpResponse(json.dumps(body, ensure_ascii=False),
+                                 content_type=content_type)
+    response['ETag'] = http_utils.quote_etag(etag)
+    return response
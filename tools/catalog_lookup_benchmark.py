@@ -0,0 +1,110 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Micro-benchmark of service catalog lookups against catalog size.
+
+Compares ``openstack_dashboard.api.base.url_for`` using the per-token
+catalog index with a linear scan of the catalog (the previous
+implementation), for catalogs of increasing size. Run it from the root of
+the repository with ``tools/with_venv.sh python
+tools/catalog_lookup_benchmark.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from django.conf import settings  # noqa
+
+settings.configure(HORIZON_CONFIG={})
+
+from openstack_dashboard.api import base  # noqa
+
+REGIONS = ('RegionOne', 'RegionTwo', 'RegionThree')
+SIZES = (10, 50, 200, 1000)
+LOOKUPS = 10000
+
+
+class FakeToken(object):
+    id = 'token'
+
+
+class FakeUser(object):
+    def __init__(self, catalog):
+        self.service_catalog = catalog
+        self.services_region = REGIONS[-1]
+        self.token = FakeToken()
+
+
+class FakeRequest(object):
+    def __init__(self, catalog):
+        self.user = FakeUser(catalog)
+
+
+def make_catalog(size):
+    catalog = []
+    for i in range(size):
+        endpoints = []
+        for region in REGIONS:
+            host = 'service%d.%s.example.com' % (i, region.lower())
+            endpoints.append({'region': region,
+                              'adminURL': 'http://admin.%s/' % host,
+                              'internalURL': 'http://int.%s/' % host,
+                              'publicURL': 'http://public.%s/' % host})
+        catalog.append({'type': 'service%d' % i,
+                        'name': 'service%d' % i,
+                        'endpoints': endpoints})
+    return catalog
+
+
+def linear_url_for(request, service_type, endpoint_type=None):
+    # The lookup as it was done before the catalog index was introduced.
+    endpoint_type = endpoint_type or getattr(settings,
+                                             'OPENSTACK_ENDPOINT_TYPE',
+                                             'publicURL')
+    getattr(settings, 'SECONDARY_ENDPOINT_TYPE', None)
+    service = base.get_service_from_catalog(request.user.service_catalog,
+                                            service_type)
+    region = request.user.services_region
+    for endpoint in service['endpoints']:
+        if endpoint['region'] == region and endpoint_type in endpoint:
+            return endpoint[endpoint_type]
+
+
+def per_lookup(func, *args):
+    # Microseconds per call, best of three runs.
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(3, LOOKUPS)) / LOOKUPS * 1e6
+
+
+def main():
+    print('%8s %14s %14s %14s' % ('services', 'linear (us)', 'indexed (us)',
+                                  'index (ms)'))
+    for size in SIZES:
+        catalog = make_catalog(size)
+        request = FakeRequest(catalog)
+        # Look up the last service, the worst case for a linear scan.
+        service_type = catalog[-1]['type']
+        linear = per_lookup(linear_url_for, request, service_type)
+        indexed = per_lookup(base.url_for, request, service_type)
+        build = min(timeit.Timer(
+            lambda: base.get_catalog_index(FakeUser(catalog))).repeat(3, 10))
+        print('%8d %14.2f %14.2f %14.2f' % (size, linear, indexed,
+                                            build / 10 * 1e3))
+
+
+if __name__ == '__main__':
+    main()
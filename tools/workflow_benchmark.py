@@ -0,0 +1,108 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Micro-benchmark of workflow instantiation against the number of steps.
+
+Measures the construction of a ``horizon.workflows.Workflow`` (as done on
+each GET and POST of a workflow view) whose steps have connection handlers
+given as dotted paths and as ``self`` methods, both with the per-class
+metadata already compiled (the usual case) and with it compiled again for
+each instance (the previous behaviour). Run it from the root of the
+repository with ``tools/with_venv.sh python tools/workflow_benchmark.py``.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from django.conf import settings  # noqa
+
+settings.configure(HORIZON_CONFIG={})
+
+from django import forms  # noqa
+
+from horizon import workflows  # noqa
+
+SIZES = (2, 5, 10, 20)
+HANDLERS = 5
+RUNS = 1000
+
+
+def handler(request, context):
+    pass
+
+
+class FakeUser(object):
+    def has_perms(self, perms):
+        return True
+
+
+class FakeRequest(object):
+    method = 'GET'
+
+    def __init__(self):
+        self.user = FakeUser()
+
+
+def make_workflow(size):
+    steps = []
+    for i in range(size):
+        action = type(str('Action%d' % i), (workflows.Action,), {
+            'field': forms.CharField(),
+            'Meta': type(str('Meta'), (), {'name': 'Action %d' % i,
+                                            'slug': 'action_%d' % i})})
+        connections = dict(
+            ('key%d' % j, ('self.handle_key', '__main__.handler'))
+            for j in range(HANDLERS))
+        steps.append(type(str('Step%d' % i), (workflows.Step,), {
+            'action_class': action,
+            'depends_on': ('key%d' % i,),
+            'contributes': ('key%d' % (i + 1),),
+            'connections': connections,
+            'handle_key': lambda self, request, context: None}))
+    return type(str('Workflow%d' % size), (workflows.Workflow,), {
+        'slug': 'workflow_%d' % size,
+        'default_steps': tuple(steps)})
+
+
+def uncompiled(workflow_class, request):
+    # Drop the compiled metadata, as if it was worked out for each instance.
+    for step_class in workflow_class.default_steps:
+        if '_handler_specs' in step_class.__dict__:
+            del step_class._handler_specs
+    for name in ('_step_orders', '_context_keys'):
+        workflow_class.__dict__.get(name, {}).clear()
+    return workflow_class(request)
+
+
+def per_instance(func, *args):
+    # Microseconds per call, best of three runs.
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(3, RUNS)) / RUNS * 1e6
+
+
+def main():
+    request = FakeRequest()
+    print('%8s %16s %16s' % ('steps', 'uncompiled (us)', 'compiled (us)'))
+    for size in SIZES:
+        workflow_class = make_workflow(size)
+        cold = per_instance(uncompiled, workflow_class, request)
+        warm = per_instance(workflow_class, request)
+        print('%8d %16.2f %16.2f' % (size, cold, warm))
+
+
+if __name__ == '__main__':
+    main()